@@ -0,0 +1,307 @@
+"""Precomputed Artefact Store for the Streamlit App
+====================================================
+
+Everything the app's District Comparison and Data Explorer pages show is
+computed ahead of time, once per dataset version, and written to a local
+store. Pages then only read small files (through `st.cache_data` /
+`st.cache_resource`), so clicks never trigger Reddit calls, sentiment
+scoring or word-cloud rendering.
+
+Per district, `artefacts/<District>/` holds:
+
+- ``posts.parquet`` - title, num_comments, sentiment_score, sentiment_label
+  and cleaned_comments (for token statistics and n-grams on the District
+  Comparison page, see district_comparison.py)
+- ``words.parquet`` - most frequent cleaned words (word, count)
+- ``wordcloud.npy`` - rendered word-cloud image (uint8 RGB array)
+- ``summary.json`` - the summary-table row and sentiment label counts
+- ``manifest.json`` - dataset name, dataset version (content hash), build
+  time; written last, so a half-built district is never listed
+
+Usage:
+    $ python artefact_store.py build              # every cleaned dataset
+    $ python artefact_store.py build --force      # rebuild unchanged ones too
+
+    >>> index = list_artefacts()                  # {district: manifest}
+    >>> posts = load_table("Palo Alto", "posts")
+
+Author: ADS 509 Team"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timer
+from notebook_modules import text_processing
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# Where artefacts are written (override with ADS509_ARTEFACT_DIR)
+ARTEFACT_DIR = Path(os.environ.get("ADS509_ARTEFACT_DIR", PROJECT_ROOT / "artefacts"))
+
+DATASET_DIR = PROJECT_ROOT / "datasets"
+
+# Cleaned datasets look like <District>_cleaned_<timestamp|pipeline>_reddit
+CLEANED_PATTERN = re.compile(r"^(?P<district>.+?)_cleaned_.+_reddit\.(parquet|pkl)$")
+
+# Rows kept in words.parquet (also the word-cloud vocabulary)
+TOP_WORDS = 200
+
+# Word-cloud rendering, matching the app's previous live rendering
+WORDCLOUD_OPTIONS = {"width": 500, "height": 300, "background_color": "black",
+                     "colormap": "cool"}
+
+# Bump when artefact contents change; older builds are rebuilt
+ARTEFACT_VERSION = 2
+
+TABLES = ("posts", "words")
+
+
+# --------------------------------------------
+# ✅ Paths and Versions
+# --------------------------------------------
+def district_slug(district):
+    """Folder-name form of a district (spaces -> underscores)."""
+    return district.replace(" ", "_")
+
+
+def district_dir(district, root=None):
+    return Path(root or ARTEFACT_DIR) / district_slug(district)
+
+
+def dataset_version(path):
+    """Content hash of a dataset file; changes whenever the data does."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"artefacts:v{ARTEFACT_VERSION}\0".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discover_datasets(folder=None):
+    """
+    Find the newest cleaned dataset of every district.
+
+    Returns:
+        Dict of district name -> dataset path
+    """
+    latest = {}
+    for path in Path(folder or DATASET_DIR).iterdir():
+        match = CLEANED_PATTERN.match(path.name)
+        if not match:
+            continue
+        district = match.group("district").replace("_", " ")
+        if district not in latest or path.stat().st_mtime > latest[district].stat().st_mtime:
+            latest[district] = path
+    return dict(sorted(latest.items()))
+
+
+# --------------------------------------------
+# ✅ Building Artefacts
+# --------------------------------------------
+def _word_frequencies(texts, top_n=TOP_WORDS):
+    """Top words of already-cleaned texts as a (word, count) frame."""
+    return text_processing().get_word_counts(texts, top_n=top_n)
+
+
+@timer("wordcloud.render")
+def _render_wordcloud(words):
+    """Render a word cloud from a (word, count) frame; None when empty."""
+    if words.empty:
+        return None
+    from wordcloud import WordCloud
+
+    frequencies = dict(zip(words["word"], words["count"]))
+    return WordCloud(**WORDCLOUD_OPTIONS).generate_from_frequencies(frequencies).to_array()
+
+
+def summarize(posts, district):
+    """Summary-table row and label counts for one district's posts."""
+    labels = posts["sentiment_label"]
+    return {
+        "District": district,
+        "# Posts": int(len(posts)),
+        "Avg Sentiment": round(float(posts["sentiment_score"].mean()), 2) if len(posts) else 0.0,
+        "% Positive": round(float((labels == "Positive").mean() * 100), 1) if len(posts) else 0.0,
+        "% Negative": round(float((labels == "Negative").mean() * 100), 1) if len(posts) else 0.0,
+        "label_counts": {k: int(v) for k, v in labels.value_counts().items()},
+    }
+
+
+@timer("artefacts.compute")
+def compute_artefacts(posts, texts, district):
+    """
+    Compute every artefact for one district in memory.
+
+    Args:
+        posts: Frame with title and num_comments per post (and optionally
+            cleaned_comments, which is kept)
+        texts: Iterable of cleaned texts for word frequencies
+        district: District name
+
+    Returns:
+        Dict with posts, words (DataFrames), wordcloud (array or None) and
+        summary (dict)
+    """
+    from sentiment import score_many
+
+    columns = [c for c in ("title", "num_comments", "cleaned_comments") if c in posts]
+    posts = posts[columns].reset_index(drop=True)
+    posts["sentiment_score"], posts["sentiment_label"] = score_many(posts["title"], cache=True)
+    words = _word_frequencies(texts)
+    return {
+        "posts": posts,
+        "words": words,
+        "wordcloud": _render_wordcloud(words),
+        "summary": summarize(posts, district),
+    }
+
+
+def save_artefacts(artefacts, district, version, dataset=None, root=None):
+    """
+    Write a district's artefacts, replacing the previous build.
+
+    Files are written to a temporary folder that is swapped in at the end,
+    so readers never see a mix of two builds.
+
+    Returns:
+        Path of the district folder
+    """
+    target = district_dir(district, root)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    for name in TABLES:
+        artefacts[name].to_parquet(tmp / f"{name}.parquet", index=False)
+    if artefacts["wordcloud"] is not None:
+        np.save(tmp / "wordcloud.npy", artefacts["wordcloud"])
+    (tmp / "summary.json").write_text(json.dumps(artefacts["summary"], indent=2))
+    manifest = {
+        "district": district,
+        "dataset": dataset,
+        "version": version,
+        "built_at": time.time(),
+        "has_wordcloud": artefacts["wordcloud"] is not None,
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    old = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        target.rename(old)
+    tmp.rename(target)
+    shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def build_from_dataset(district, path, root=None, force=False):
+    """
+    Precompute one district's artefacts from its cleaned dataset.
+
+    Skipped when the stored build already matches the dataset version.
+
+    Returns:
+        True when artefacts were (re)built
+    """
+    version = dataset_version(path)
+    current = read_manifest(district, root)
+    if not force and current and current.get("version") == version:
+        return False
+
+    from dataset_store import load_dataset
+
+    df = load_dataset(path, columns=["topic", "num_comments", "cleaned_comments"])
+    posts = df.rename(columns={"topic": "title"})
+    if "num_comments" not in posts:
+        posts["num_comments"] = df["cleaned_comments"].map(len)
+    texts = (comment for comments in df["cleaned_comments"] for comment in comments)
+
+    artefacts = compute_artefacts(posts, texts, district)
+    save_artefacts(artefacts, district, version, dataset=Path(path).name, root=root)
+    return True
+
+
+def build_live(df, district, root=None):
+    """
+    Store artefacts for posts fetched live (`reddit_utils.fetch_reddit_posts`).
+
+    The version is a hash of the fetched titles, so re-fetching unchanged
+    results does not invalidate the app's caches.
+    """
+    posts = df.rename(columns={"comments": "num_comments"})
+    digest = hashlib.blake2b("\0".join(posts["title"]).encode(), digest_size=16)
+    texts = text_processing().clean_corpus(list(posts["title"]), cache=True)
+    posts["cleaned_comments"] = [[text] for text in texts]
+    artefacts = compute_artefacts(posts, texts, district)
+    return save_artefacts(artefacts, district, f"live:{digest.hexdigest()}",
+                          dataset="reddit (live)", root=root)
+
+
+# --------------------------------------------
+# ✅ Reading Artefacts
+# --------------------------------------------
+def read_manifest(district, root=None):
+    """Manifest of a district's current build, or None."""
+    path = district_dir(district, root) / "manifest.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def list_artefacts(root=None):
+    """Return {district: manifest} for every complete build in the store."""
+    root = Path(root or ARTEFACT_DIR)
+    if not root.exists():
+        return {}
+    index = {}
+    for path in sorted(root.glob("*/manifest.json")):
+        if ".tmp-" in path.parent.name or ".old-" in path.parent.name:
+            continue  # a build in progress
+        manifest = json.loads(path.read_text())
+        index[manifest["district"]] = manifest
+    return index
+
+
+def load_table(district, name, root=None):
+    """Load the `posts` or `words` table of a district."""
+    if name not in TABLES:
+        raise ValueError(f"Unknown artefact table: {name!r} (use one of {TABLES})")
+    return pd.read_parquet(district_dir(district, root) / f"{name}.parquet")
+
+
+def load_summary(district, root=None):
+    return json.loads((district_dir(district, root) / "summary.json").read_text())
+
+
+def load_wordcloud(district, root=None):
+    """Rendered word-cloud array of a district, or None."""
+    path = district_dir(district, root) / "wordcloud.npy"
+    return np.load(path) if path.exists() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute Streamlit app artefacts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build artefacts from the cleaned datasets")
+    build.add_argument("--datasets", type=Path, default=DATASET_DIR)
+    build.add_argument("--force", action="store_true", help="rebuild unchanged datasets too")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        for district, path in discover_datasets(args.datasets).items():
+            start = time.perf_counter()
+            built = build_from_dataset(district, path, force=args.force)
+            status = f"built in {time.perf_counter() - start:.1f}s" if built else "up to date"
+            print(f"✅ {district} ({path.name}): {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark: review classifier throughput and latency
+====================================================================
+
+Uses the comments of the cleaned district datasets and the saved model
+(`python review_classifier.py train`):
+
+- batch: one `predict_many` call over every comment, against VADER
+  scoring the same comments one by one
+- serving: `--clients` threads (like concurrent app sessions) each send
+  `--requests` single reviews, either calling the classifier directly or
+  going through the shared `MicroBatcher`; reports throughput and
+  p50 / p95 request latency
+
+Usage:
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --clients 32 --requests 100
+
+Author: ADS 509 Team"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from review_classifier import MicroBatcher, get_classifier, training_data  # noqa: E402
+from sentiment import score_many  # noqa: E402
+
+
+def best_of(func, repeat):
+    """Run `func` `repeat` times and return the best seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def serve(predict, texts, clients, requests):
+    """
+    Send `requests` single texts from each of `clients` threads.
+
+    Returns:
+        Tuple (total seconds, NumPy array of per-request latencies)
+    """
+    latencies = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def client(i):
+        rng = np.random.default_rng(i)
+        picks = rng.integers(len(texts), size=requests)
+        barrier.wait()
+        for j in picks:
+            start = time.perf_counter()
+            predict(texts[j])
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.concatenate([np.array(x) for x in latencies])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs of the batch measurement (best is reported)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    args = parser.parse_args()
+
+    classifier = get_classifier()
+    texts, _, names = training_data()
+    print(f"Loaded {len(texts):,} comments from {len(names)} dataset(s)")
+
+    classifier.predict_many(texts[:100])  # warm-up (imports, cleaner)
+    batch_time = best_of(lambda: classifier.predict_many(texts), args.repeat)
+    vader_time = best_of(lambda: score_many(texts), 1)
+    print(f"\n{'batch scoring':<34}{'seconds':>10}{'texts/s':>12}")
+    for name, seconds in [("VADER score_many", vader_time),
+                          ("classifier predict_many", batch_time)]:
+        print(f"{name:<34}{seconds:>10.3f}{len(texts) / seconds:>12,.0f}")
+
+    batcher = MicroBatcher(classifier)
+    total = args.clients * args.requests
+    print(f"\n{args.clients} clients x {args.requests} single requests")
+    print(f"{'serving':<34}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, predict in [("direct predict per request", classifier.predict),
+                          ("micro-batched", batcher.predict)]:
+        seconds, latencies = serve(predict, texts, args.clients, args.requests)
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        print(f"{name:<34}{total / seconds:>10,.0f}{p50:>10.2f}{p95:>10.2f}")
+    batcher.close()
+    print(f"✅ mean micro-batch size {batcher.stats()['mean_batch']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
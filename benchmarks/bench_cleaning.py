@@ -0,0 +1,101 @@
+"""Benchmark: TextCleaner vs. the original per-comment clean_text
+====================================================================
+
+Runs the original `clean_text` implementation (which rebuilds the stopword
+set, translate table and regexes on every call) and the batched
+`TextCleaner.clean_many` over every comment in the pipeline datasets,
+checks that both produce identical output, and prints the timings.
+
+Usage:
+    python benchmarks/bench_cleaning.py
+    python benchmarks/bench_cleaning.py --repeat 5 --datasets datasets/Palo_Alto_pipeline_reddit.pkl
+
+Author: ADS 509 Team"""
+import argparse
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from nltk.corpus import stopwords
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "notebooks"))
+
+from text_processing import TextCleaner  # noqa: E402
+
+
+def legacy_clean_text(text, remove_stopwords=True, lowercase=True):
+    """Copy of `clean_text` before the compiled cleaner, kept as the baseline."""
+    if not isinstance(text, str):
+        return ""
+    if lowercase:
+        text = text.lower()
+    text = re.sub(r'http\S+|www\S+', '', text)
+    text = re.sub(r'@\w+|#\w+', '', text)
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    text = ' '.join(text.split())
+    if remove_stopwords:
+        stop_words = set(stopwords.words('english'))
+        words = text.split()
+        text = ' '.join([w for w in words if w not in stop_words])
+    return text
+
+
+def load_comments(paths):
+    """Flatten `comments_flat` from each pickle into one list of comments."""
+    comments = []
+    for path in paths:
+        df = pd.read_pickle(path)
+        for post_comments in df["comments_flat"]:
+            comments.extend(post_comments)
+    return comments
+
+
+def best_of(func, repeat):
+    """Run `func` `repeat` times and return (best seconds, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per implementation (best is reported)")
+    parser.add_argument("--datasets", nargs="*", type=Path,
+                        help="pickles to load (default: raw *_pipeline_reddit.pkl)")
+    args = parser.parse_args()
+
+    paths = args.datasets or sorted(
+        p for p in (PROJECT_ROOT / "datasets").glob("*_pipeline_reddit.pkl")
+        if "_cleaned_" not in p.name
+    )
+    comments = load_comments(paths)
+    print(f"Loaded {len(comments):,} comments from {len(paths)} dataset(s)")
+
+    # built first: it also makes the NLTK stopwords available to the legacy code
+    cleaner = TextCleaner()
+    legacy_time, legacy_out = best_of(
+        lambda: [legacy_clean_text(c) for c in comments], args.repeat
+    )
+    batch_time, batch_out = best_of(lambda: cleaner.clean_many(comments), args.repeat)
+
+    if legacy_out != batch_out:
+        mismatches = sum(a != b for a, b in zip(legacy_out, batch_out))
+        raise SystemExit(f"❌ Outputs differ on {mismatches} comment(s)")
+
+    print(f"{'implementation':<28}{'seconds':>10}{'comments/s':>14}")
+    for name, seconds in [("legacy clean_text", legacy_time),
+                          ("TextCleaner.clean_many", batch_time)]:
+        print(f"{name:<28}{seconds:>10.3f}{len(comments) / seconds:>14,.0f}")
+    print(f"✅ Identical output, speedup x{legacy_time / batch_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark: cold-start and per-rerun import cost of the app modules
+====================================================================
+
+Every measurement runs in a fresh interpreter, so nothing is shared with
+earlier runs (apart from the OS file cache):
+
+- cold import: `import <module>` as the first thing a process does, which
+  is what the Streamlit server (or a notebook kernel) pays on startup
+- first use: import plus the first sentiment score, i.e. the point where
+  NLTK and the VADER lexicon are actually needed
+- per rerun: the app's old pattern of loading reddit_utils.py with
+  `importlib.util.spec_from_file_location` on every button click, against
+  a plain import, which later reruns take from `sys.modules`
+
+With `--baseline REF` the same measurements are repeated on a checkout of
+an older commit (extracted with `git archive`) and printed side by side.
+
+Usage:
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --repeat 7 --baseline 6976a5e
+
+Author: ADS 509 Team"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# label -> statement timed as the first thing a new interpreter runs
+COLD_CASES = {
+    "import sentiment": "import sentiment",
+    "import reddit_utils": "import reddit_utils",
+    "import text_processing": "import text_processing",
+    "import artefact_store": "import artefact_store",
+    "first sentiment score": "import sentiment; sentiment.analyze_sentiment('great teachers')",
+}
+
+# Both run `reps` times in one process; the first call pays the cold import
+RERUN_CASES = {
+    "spec_from_file_location": """
+import importlib.util
+spec = importlib.util.spec_from_file_location("reddit_utils", "reddit_utils.py")
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+""",
+    "cached import": "import reddit_utils",
+}
+
+_TIMER = """
+import json, sys, time
+sys.path[:0] = [".", "notebooks"]
+start = time.perf_counter()
+exec(compile({code!r}, "<bench>", "exec"))
+first = time.perf_counter() - start
+times = []
+for _ in range({reps}):
+    start = time.perf_counter()
+    exec(compile({code!r}, "<bench>", "exec"))
+    times.append(time.perf_counter() - start)
+print(json.dumps({{"first": first, "rest": times}}))
+"""
+
+
+def run_timed(tree, code, reps=0):
+    """Time `code` in a new interpreter run from `tree`; returns (first, later runs)."""
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMER.format(code=code, reps=reps)],
+        cwd=tree, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings["first"], timings["rest"]
+
+
+def measure(tree, repeat, reruns):
+    """
+    Median cold timings and mean per-rerun timings for one source tree.
+
+    Cases that fail (e.g. a module an older tree does not have) map to None.
+    """
+    results = {}
+    for label, code in COLD_CASES.items():
+        try:
+            firsts = [run_timed(tree, code)[0] for _ in range(repeat)]
+            results[label] = statistics.median(firsts)
+        except subprocess.CalledProcessError:
+            results[label] = None
+    for label, code in RERUN_CASES.items():
+        _, rest = run_timed(tree, code, reps=reruns)
+        results[f"rerun: {label}"] = statistics.mean(rest)
+    return results
+
+
+def extract_tree(ref, folder):
+    """Write the files of git revision `ref` into `folder`."""
+    archive = Path(folder) / "tree.tar"
+    with open(archive, "wb") as f:
+        subprocess.run(["git", "archive", ref], cwd=PROJECT_ROOT, stdout=f, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(folder, filter="data")
+    return Path(folder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="fresh interpreters per cold measurement (median is reported)")
+    parser.add_argument("--reruns", type=int, default=20,
+                        help="simulated app reruns per rerun measurement")
+    parser.add_argument("--baseline", metavar="REF",
+                        help="git revision to compare against (e.g. a commit before the change)")
+    args = parser.parse_args()
+
+    current = measure(PROJECT_ROOT, args.repeat, args.reruns)
+    baseline = None
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as folder:
+            tree = extract_tree(args.baseline, folder)
+            baseline = measure(tree, args.repeat, args.reruns)
+
+    header = f"{'measurement':<38}{'ms':>10}"
+    if baseline:
+        header += f"{args.baseline + ' ms':>16}{'speedup':>10}"
+    print(header)
+    for label, seconds in current.items():
+        line = f"{label:<38}{seconds * 1000:>10.2f}"
+        if baseline:
+            before = baseline.get(label)
+            if before is None:
+                line += f"{'-':>16}{'-':>10}"
+            else:
+                line += f"{before * 1000:>16.2f}{before / seconds:>9.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Benchmark: text pipeline stages on synthetic corpora, with a saved baseline
+====================================================================
+
+Times each analysis stage on synthetic corpora (`synthetic_corpus.py`)
+at several sizes relative to the current districts, and measures each
+stage's peak traced memory (tracemalloc, in a separate untimed run):
+
+- clean_corpus: `clean_corpus` over every raw comment
+- word_counts / bigram_counts: `get_word_counts` / `get_bigram_counts`
+  over the cleaned comments
+- post_statistics: `get_post_statistics` on the cleaned frame
+- vader: `sentiment.score_many` over every raw comment
+- lda_fit: `build_dtm` plus the 5-topic batch LDA of 04_topic_modeling
+
+No caches are used and nothing touches the network. With `--save` the
+results become the baseline in `benchmarks/baseline.json`; later runs
+are compared against it and exit with status 1 when a stage got slower
+or used more memory than the tolerances allow. Timings depend on the
+machine, so keep one baseline per machine (e.g. the deploy host) and
+re-save it after intended changes.
+
+Usage:
+    python benchmarks/bench_pipeline.py                     # compare with baseline
+    python benchmarks/bench_pipeline.py --scales 1 10 100 --repeat 1
+    python benchmarks/bench_pipeline.py --save              # write a new baseline
+
+Author: ADS 509 Team"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "notebooks"))
+
+from sentiment import score_many  # noqa: E402
+from synthetic_corpus import make_corpus  # noqa: E402
+from text_processing import (  # noqa: E402
+    clean_corpus,
+    get_bigram_counts,
+    get_post_statistics,
+    get_word_counts,
+)
+from topic_models import build_dtm  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Allowed slowdown / memory growth against the baseline before a stage fails
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+
+# Timings shorter than this are too noisy to judge
+MIN_COMPARED_SECONDS = 0.05
+
+
+def _lda_fit(df):
+    from sklearn.decomposition import LatentDirichletAllocation
+
+    dtm = build_dtm(df["cleaned_comments"].map(" ".join).tolist(),
+                    min_df=2, max_df=0.9, stop_words="english")
+    LatentDirichletAllocation(n_components=5, random_state=42,
+                              learning_method="batch").fit(dtm.counts)
+
+
+# name -> function of (raw comments, cleaned comments, cleaned frame)
+STAGES = {
+    "clean_corpus": lambda raw, cleaned, df: clean_corpus(raw),
+    "word_counts": lambda raw, cleaned, df: get_word_counts(cleaned),
+    "bigram_counts": lambda raw, cleaned, df: get_bigram_counts(cleaned),
+    "post_statistics": lambda raw, cleaned, df: get_post_statistics(df),
+    "vader": lambda raw, cleaned, df: score_many(raw),
+    "lda_fit": lambda raw, cleaned, df: _lda_fit(df),
+}
+
+
+def measure(func, repeat):
+    """
+    Best wall time of `repeat` runs, then peak traced memory of one more.
+
+    Returns:
+        Dict with seconds and peak_mb
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+def run(scales, stages, repeat):
+    """Benchmark `stages` at every scale; returns {stage: {scale: result}}."""
+    results = {name: {} for name in stages}
+    for scale in scales:
+        start = time.perf_counter()
+        df = make_corpus(scale)
+        raw = [c for post in df["comments_flat"] for c in post]
+        df["cleaned_comments"] = [clean_corpus(post) for post in df["comments_flat"]]
+        cleaned = [c for post in df["cleaned_comments"] for c in post]
+        print(f"\n{scale:g}x: {len(df):,} posts, {len(raw):,} comments "
+              f"(generated in {time.perf_counter() - start:.1f}s)")
+        for name in stages:
+            STAGES[name](raw[:50], cleaned[:50], df.head(5))  # warm-up (lazy imports)
+            result = measure(lambda: STAGES[name](raw, cleaned, df), repeat)
+            results[name][f"{scale:g}"] = result
+            print(f"  {name:<18}{result['seconds']:>9.3f}s{result['peak_mb']:>10.1f} MB")
+    return results
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """
+    Print each result against the baseline.
+
+    Returns:
+        List of "stage @ scale: reason" strings for every regression
+    """
+    regressions = []
+    print(f"\n{'stage':<18}{'scale':>6}{'seconds':>10}{'vs base':>9}"
+          f"{'peak MB':>10}{'vs base':>9}")
+    for name, by_scale in results.items():
+        for scale, result in by_scale.items():
+            base = baseline["results"].get(name, {}).get(scale)
+            if base is None:
+                print(f"{name:<18}{scale + 'x':>6}{result['seconds']:>10.3f}{'new':>9}"
+                      f"{result['peak_mb']:>10.1f}{'new':>9}")
+                continue
+            time_change = result["seconds"] / base["seconds"] - 1
+            memory_change = result["peak_mb"] / max(base["peak_mb"], 1e-9) - 1
+            print(f"{name:<18}{scale + 'x':>6}{result['seconds']:>10.3f}{time_change:>+9.0%}"
+                  f"{result['peak_mb']:>10.1f}{memory_change:>+9.0%}")
+            if time_change > time_tolerance and base["seconds"] >= MIN_COMPARED_SECONDS:
+                regressions.append(f"{name} @ {scale}x: {time_change:+.0%} time")
+            if memory_change > memory_tolerance:
+                regressions.append(f"{name} @ {scale}x: {memory_change:+.0%} peak memory")
+    return regressions
+
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="corpus sizes relative to the current districts")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per stage (best is reported)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true",
+                        help="save the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run(args.scales, args.stages, args.repeat)
+
+    if args.save:
+        baseline = {"machine": machine(), "repeat": args.repeat,
+                    "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\n✅ Baseline saved → {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("machine") != machine():
+        print(f"\n⚠️ Baseline was saved on a different machine ({baseline.get('machine')}); "
+              "timings may not be comparable")
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\n❌ Regressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
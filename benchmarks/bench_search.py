@@ -0,0 +1,97 @@
+"""Benchmark: inverted-index search vs. scanning every comment
+====================================================================
+
+Runs a few Query Builder style queries against the stored search index
+(`python search_index.py build`) and against a plain scan that evaluates
+the same parsed query on every cleaned comment, checks that both return
+the same documents, and prints the timings.
+
+Usage:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --repeat 10 --query '"high school" -homework'
+
+Author: ADS 509 Team"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from search_index import _district_docs, get_search_index, parse_query  # noqa: E402
+
+QUERIES = [
+    'teachers',
+    '"Palo Alto" (schools OR teachers)',
+    '(homework OR tests) -teachers',
+    '"high school" students',
+]
+
+
+def scan_match(node, words, clean):
+    """Evaluate a parsed query on one document's cleaned words."""
+    kind = node[0]
+    if kind == "all":
+        return True
+    if kind in ("term", "phrase"):
+        phrase = clean(node[1])
+        k = len(phrase)
+        return any(words[i:i + k] == phrase for i in range(len(words) - k + 1)) or not k
+    if kind == "not":
+        return not scan_match(node[1], words, clean)
+    if kind == "and":
+        return scan_match(node[1], words, clean) and scan_match(node[2], words, clean)
+    return scan_match(node[1], words, clean) or scan_match(node[2], words, clean)
+
+
+def best_of(func, repeat):
+    """Run `func` `repeat` times and return (best seconds, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per query (best is reported)")
+    parser.add_argument("--query", action="append", help="query to run (repeatable)")
+    args = parser.parse_args()
+
+    index = get_search_index()
+    if index is None:
+        raise SystemExit("❌ No search index; run `python search_index.py build`")
+
+    documents = []
+    for district, path in index.meta["sources"].items():
+        _, cleaned = _district_docs(district, PROJECT_ROOT / "datasets" / path["name"])
+        documents.extend(doc.split() for post in cleaned for doc in post)
+    print(f"Loaded {len(documents):,} documents")
+
+    print(f"{'query':<40}{'matches':>9}{'scan ms':>10}{'index ms':>10}{'speedup':>9}")
+    for query in args.query or QUERIES:
+        tree = parse_query(query)
+        clean_cache = {}
+
+        def clean(text):
+            if text not in clean_cache:
+                clean_cache[text] = index._clean(text)
+            return clean_cache[text]
+
+        scan_time, scanned = best_of(
+            lambda: [i for i, words in enumerate(documents) if scan_match(tree, words, clean)],
+            args.repeat)
+        index_time, found = best_of(lambda: index.match(query), args.repeat)
+        if list(found) != scanned:
+            raise SystemExit(f"❌ Results differ for {query!r}")
+        print(f"{query:<40}{len(found):>9,}{scan_time * 1000:>10.1f}"
+              f"{index_time * 1000:>10.2f}{scan_time / index_time:>8.0f}x")
+    print("✅ Identical results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Synthetic Reddit-like corpus for offline benchmarks
+====================================================================
+
+Generates district frames with the schema of the scraped pickles in
+`datasets/` (source, query, topic, comments_nested, comments_flat,
+num_comments, total_words), sized relative to the current districts, so
+the text pipeline can be benchmarked at 1x-100x without Reddit access.
+
+Shape parameters were fitted to the two pipeline datasets
+(Palo Alto + Oklahoma City = 1x):
+
+- posts: 218 in total, split evenly over `n_districts`
+- comments per post: lognormal, median ~27, long tail to a few hundred
+- words per comment: lognormal, median ~30
+- words: Zipf-distributed over common English and school words (with
+  stopwords and sentiment words, so cleaning and VADER do real work)
+  followed by a long tail of made-up words; ~5% of comments contain a
+  URL, a few contain @mentions, and sentences carry punctuation and
+  capitals
+
+The output is deterministic for a given `scale`, `n_districts` and `seed`.
+
+Usage:
+    python benchmarks/synthetic_corpus.py --scale 10 --output /tmp/synthetic_10x.pkl
+
+    >>> from synthetic_corpus import make_corpus
+    >>> df = make_corpus(scale=10)
+
+Author: ADS 509 Team"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from reddit_scraper import query_builder, total_word_count  # noqa: E402
+
+# Fitted to datasets/*_pipeline_reddit.pkl (both districts together)
+BASE_POSTS = 218
+COMMENTS_LOG_MEAN, COMMENTS_LOG_STD, MAX_COMMENTS = 3.30, 1.46, 500
+WORDS_LOG_MEAN, WORDS_LOG_STD, MAX_WORDS = 3.40, 0.83, 2000
+TITLE_LOG_MEAN, TITLE_LOG_STD = 2.80, 0.40
+URL_RATE = 0.05
+MENTION_RATE = 0.002
+ZIPF_EXPONENT = 1.05
+VOCAB_SIZE = 30_000
+
+QUERY_OPTIONS = ["school", "schools", "district", "education", "homework",
+                 "teacher", "teachers", "student", "students"]
+
+# Head of the vocabulary, most frequent first
+COMMON_WORDS = """
+the to and a of i is that in it you for they be are this not have was on with
+but my do if as at so just their what about would we all he can there an or
+school like more people from get your kids one she if them by will were out
+no been how when than up who which has because only teachers students his her
+think know some did had even time also much any then schools any want good
+parents teacher district education student class year high really other
+should could these our need most those going very well never make over way
+years public kids me back many said great still money its being same pay
+through state where work learn better since bad before why take every here
+homework city too while new lot private best help school's doesn't child
+children test tests grade grades college love teach teaching taught board
+funding budget hate terrible awesome amazing worst happy sad safe unsafe
+support problem problems free community local tax taxes vote policy family
+""".split()
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "ten", "dus", "vel", "or", "an", "pe",
+             "sto", "ric", "ba", "zu", "nel", "tri", "om", "gar", "fi", "len"]
+
+URLS = ["https://example.com/news/2025/school-board",
+        "https://www.example.org/district/report?id=42"]
+PUNCTUATION = np.array(["", "", "", "", ",", ".", "!", "?", ";", ":"], dtype=object)
+
+
+def vocabulary(size=VOCAB_SIZE, seed=0):
+    """Common words followed by distinct made-up words, `size` in total."""
+    rng = np.random.default_rng(seed)
+    words = list(dict.fromkeys(COMMON_WORDS))
+    seen = set(words)
+    while len(words) < size:
+        n = rng.integers(2, 5)
+        word = "".join(rng.choice(SYLLABLES, size=n))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return np.array(words[:size], dtype=object)
+
+
+def _lognormal_counts(rng, n, log_mean, log_std, upper):
+    counts = np.rint(rng.lognormal(log_mean, log_std, size=n)).astype(np.int64)
+    return np.clip(counts, 1, upper)
+
+
+def _texts(rng, words, lengths, probabilities):
+    """One text per entry of `lengths`, words drawn from the Zipf vocabulary."""
+    ids = rng.choice(len(words), size=int(lengths.sum()), p=probabilities)
+    tokens = words[ids]
+    # sentence punctuation and capitals, as in real comments
+    tokens = tokens + PUNCTUATION[rng.integers(len(PUNCTUATION), size=len(tokens))]
+    starts = np.cumsum(lengths) - lengths
+    capital = np.zeros(len(tokens), dtype=bool)
+    capital[starts] = True
+    capital |= rng.random(len(tokens)) < 0.03
+    tokens[capital] = [t.capitalize() for t in tokens[capital]]
+
+    texts = [" ".join(tokens[a:a + n]) for a, n in zip(starts, lengths)]
+    for i in np.flatnonzero(rng.random(len(texts)) < URL_RATE):
+        texts[i] += f"\n\n{URLS[i % len(URLS)]}"
+    for i in np.flatnonzero(rng.random(len(texts)) < MENTION_RATE):
+        texts[i] = f"@user{i} {texts[i]}"
+    return texts
+
+
+def make_corpus(scale=1.0, n_districts=2, seed=0):
+    """
+    Generate a synthetic corpus `scale` times the size of the current districts.
+
+    Args:
+        scale: Size relative to Palo Alto + Oklahoma City (1.0 = 218 posts,
+            ~13k comments)
+        n_districts: Districts the posts are split over ("Synthetic 1", ...)
+        seed: Random seed
+
+    Returns:
+        DataFrame with one row per post, in the column layout of the
+        scraped pickles; the district of each row is in `query`
+    """
+    rng = np.random.default_rng(seed)
+    words = vocabulary(seed=seed)
+    ranks = np.arange(1, len(words) + 1, dtype=float)
+    probabilities = ranks ** -ZIPF_EXPONENT
+    probabilities /= probabilities.sum()
+
+    n_posts = max(n_districts, int(round(BASE_POSTS * scale)))
+    n_comments = _lognormal_counts(rng, n_posts, COMMENTS_LOG_MEAN, COMMENTS_LOG_STD,
+                                   MAX_COMMENTS)
+    comment_words = _lognormal_counts(rng, int(n_comments.sum()), WORDS_LOG_MEAN,
+                                      WORDS_LOG_STD, MAX_WORDS)
+    title_words = _lognormal_counts(rng, n_posts, TITLE_LOG_MEAN, TITLE_LOG_STD, 60)
+
+    comments = _texts(rng, words, comment_words, probabilities)
+    titles = _texts(rng, words, title_words, probabilities)
+    bounds = np.cumsum(n_comments)
+    flat = [comments[b - n:b] for b, n in zip(bounds, n_comments)]
+
+    districts = [f"Synthetic {i + 1}" for i in range(n_districts)]
+    queries = [query_builder(d, QUERY_OPTIONS) for d in districts]
+    return pd.DataFrame({
+        "source": "reddit",
+        "query": [queries[i * n_districts // n_posts] for i in range(n_posts)],
+        "topic": titles,
+        "comments_nested": [[[c] for c in post] for post in flat],
+        "comments_flat": flat,
+        "num_comments": n_comments,
+        "total_words": [total_word_count(post) for post in flat],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="size relative to the current districts")
+    parser.add_argument("--districts", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, required=True, help="pickle to write")
+    args = parser.parse_args()
+
+    df = make_corpus(args.scale, args.districts, args.seed)
+    df.to_pickle(args.output)
+    print(f"✅ {len(df):,} posts, {df['num_comments'].sum():,} comments, "
+          f"{df['total_words'].sum():,} words → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""pytest setup: project and notebooks modules importable, caches in a temp folder."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "notebooks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# modules read these at import time; keep test runs out of .cache/ and artefacts/
+_scratch = Path(tempfile.mkdtemp(prefix="ads509-tests-"))
+os.environ.setdefault("ADS509_CACHE_DIR", str(_scratch / "cache"))
+os.environ.setdefault("ADS509_ARTEFACT_DIR", str(_scratch / "artefacts"))
+
+# live check against the real Reddit API (needs praw.ini); run it by hand
+collect_ignore = ["test_reddit_api.py"]
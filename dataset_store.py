@@ -0,0 +1,331 @@
+"""Columnar Dataset Storage (Parquet)
+====================================================
+
+Storage layer for the district datasets. Instead of pickling a frame whose
+`comments_*` columns hold Python lists, datasets are written as Parquet in
+an exploded, one-row-per-comment layout:
+
+- ``post_id`` / ``comment_idx`` - position of the post in the dataset and
+  of the comment within the post (-1 for a post with no comments)
+- post-level columns (``topic``, ``query``, ``num_comments``, ...) repeated
+  per comment; strings are dictionary-encoded, so repeats cost almost nothing
+- comment-level columns: ``comment`` (from ``comments_flat``),
+  ``cleaned_comment`` (from ``cleaned_comments``), ``comment_id``
+  (from ``comment_ids``) and, for streamed datasets, ``comment_score`` /
+  ``comment_label`` (per-comment sentiment); ``comments_nested`` is
+  rebuilt from ``comment``
+
+Loading supports column projection (only the requested columns are read)
+and predicate pushdown (`filters`, evaluated against Parquet row-group
+statistics), and returns either the familiar one-row-per-post frame or the
+long per-comment frame.
+
+Usage:
+    >>> save_dataset(df, dataset_folder / "Palo_Alto_pipeline_reddit")
+    >>> df = load_dataset(dataset_folder / "Palo_Alto_pipeline_reddit",
+    ...                   columns=["topic", "cleaned_comments"],
+    ...                   filters=[("num_comments", ">=", 10)])
+
+    $ python dataset_store.py convert datasets/*.pkl
+
+Author: ADS 509 Team"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Formats understood by save_dataset / load_dataset, in lookup order
+DATASET_FORMATS = ("parquet", "pkl")
+
+# Default format for newly saved datasets
+DEFAULT_FORMAT = "parquet"
+
+# Per-post list columns stored one value per comment, and their long names
+COMMENT_COLUMNS = {
+    "comments_flat": "comment",
+    "cleaned_comments": "cleaned_comment",
+    "comment_ids": "comment_id",
+    "comment_scores": "comment_score",
+    "comment_labels": "comment_label",
+}
+
+# Rebuilt on load from `comments_flat` instead of being stored
+DERIVED_COLUMNS = {"comments_nested": "comments_flat"}
+
+KEY_COLUMNS = ["post_id", "comment_idx"]
+
+# Rows per Parquet row group; smaller groups make filters skip more data
+ROW_GROUP_SIZE = 64_000
+
+_METADATA_KEY = b"ads509_dataset"
+
+
+# --------------------------------------------
+# ✅ Path Helpers
+# --------------------------------------------
+def resolve_dataset_path(path):
+    """
+    Find the file for a dataset path.
+
+    `path` may name a file directly or be a stem without suffix (e.g.
+    datasets/Palo_Alto_pipeline_reddit); a stem resolves to the Parquet
+    file when present, else the pickle.
+
+    Raises:
+        FileNotFoundError: When no matching file exists
+    """
+    path = Path(path)
+    if path.suffix in (".parquet", ".pkl"):
+        if path.exists():
+            return path
+        path = path.with_suffix("")
+
+    for fmt in DATASET_FORMATS:
+        candidate = path.with_name(f"{path.name}.{fmt}")
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"❌ Dataset not found at: {path}(.parquet|.pkl)")
+
+
+def dataset_exists(path):
+    """True if `resolve_dataset_path` would find the dataset."""
+    try:
+        resolve_dataset_path(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# --------------------------------------------
+# ✅ Post <-> Comment Layout
+# --------------------------------------------
+def _comment_columns(df):
+    """List columns of `df` stored at comment level."""
+    return [c for c in COMMENT_COLUMNS if c in df.columns]
+
+
+def to_long(df):
+    """
+    Explode a one-row-per-post frame into one row per comment.
+
+    Args:
+        df: Dataset frame (e.g. from the scraper or cleaning notebook)
+
+    Returns:
+        Long DataFrame with post_id, comment_idx, the post-level columns and
+        one column per comment-level list column
+    """
+    comment_cols = _comment_columns(df)
+    post_cols = [c for c in df.columns
+                 if c not in comment_cols and c not in DERIVED_COLUMNS]
+
+    if comment_cols:
+        lengths = df[comment_cols[0]].map(len).to_numpy()
+    else:
+        lengths = np.zeros(len(df), dtype=np.int64)
+    reps = np.maximum(lengths, 1)  # posts without comments keep one row
+
+    post_id = np.repeat(np.arange(len(df), dtype=np.int32), reps)
+    starts = np.repeat(np.cumsum(reps) - reps, reps)
+    comment_idx = (np.arange(len(post_id)) - starts).astype(np.int32)
+    comment_idx[np.repeat(lengths == 0, reps)] = -1
+
+    long = {"post_id": post_id, "comment_idx": comment_idx}
+    for col in post_cols:
+        long[col] = df[col].to_numpy()[post_id]
+    for col in comment_cols:
+        values = []
+        for comments in df[col]:
+            values.extend(comments if len(comments) else [None])
+        long[COMMENT_COLUMNS[col]] = values
+
+    return pd.DataFrame(long)
+
+
+def to_posts(long, columns=None):
+    """
+    Regroup a long per-comment frame into one row per post.
+
+    Args:
+        long: Frame produced by `to_long` (or read with `as_posts=False`)
+        columns: Original column order to restore (default: as found)
+
+    Returns:
+        DataFrame in the pickle layout, with list-valued comment columns
+    """
+    long = long.sort_values(KEY_COLUMNS, kind="stable")
+    post_ids = long["post_id"].to_numpy()
+    if len(post_ids):
+        starts = np.flatnonzero(np.r_[True, post_ids[1:] != post_ids[:-1]])
+    else:
+        starts = np.array([], dtype=np.int64)
+    has_comments = long["comment_idx"].to_numpy()[starts] >= 0
+
+    long_to_wide = {v: k for k, v in COMMENT_COLUMNS.items()}
+    posts = {}
+    for col in long.columns:
+        if col in KEY_COLUMNS:
+            continue
+        values = long[col]
+        if col in long_to_wide:
+            chunks = np.split(values.to_numpy(dtype=object), starts[1:])
+            posts[long_to_wide[col]] = [
+                list(chunk) if keep else [] for chunk, keep in zip(chunks, has_comments)
+            ]
+        else:
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(values.cat.categories.dtype)
+            posts[col] = values.iloc[starts].to_numpy()
+
+    df = pd.DataFrame(posts)
+    for derived, source in DERIVED_COLUMNS.items():
+        wanted = columns is None or derived in columns
+        if wanted and source in df.columns:
+            df[derived] = [[[c] for c in comments] for comments in df[source]]
+
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+# --------------------------------------------
+# ✅ Save / Load
+# --------------------------------------------
+def _to_table(long, columns):
+    """Build an Arrow table with dictionary-encoded post-level strings."""
+    table = pa.Table.from_pandas(long, preserve_index=False)
+    comment_names = set(COMMENT_COLUMNS.values())
+
+    fields = []
+    arrays = []
+    for field, array in zip(table.schema, table.columns):
+        is_text = pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+        if is_text and field.name not in comment_names:
+            array = array.dictionary_encode()
+            field = pa.field(field.name, array.type)
+        fields.append(field)
+        arrays.append(array)
+
+    metadata = {_METADATA_KEY: json.dumps({"columns": list(columns)}).encode()}
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=metadata))
+
+
+def save_dataset(df, path, fmt=DEFAULT_FORMAT):
+    """
+    Save a dataset frame.
+
+    Args:
+        df: One-row-per-post dataset frame
+        path: Target path, with or without suffix (the suffix is set from `fmt`)
+        fmt: "parquet" (columnar layout, default) or "pkl" (pandas pickle)
+
+    Returns:
+        Path of the written file
+    """
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"Unknown dataset format: {fmt!r} (use one of {DATASET_FORMATS})")
+
+    path = Path(path)
+    if path.suffix in (".parquet", ".pkl"):
+        path = path.with_suffix("")
+    path = path.with_name(f"{path.name}.{fmt}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "pkl":
+        df.to_pickle(path)
+    else:
+        table = _to_table(to_long(df), df.columns)
+        pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE,
+                       compression="zstd")
+    return path
+
+
+def _stored_columns(path, columns):
+    """Map requested dataset columns to the Parquet columns to read."""
+    if columns is None:
+        return None
+    wanted = set(KEY_COLUMNS)
+    for col in columns:
+        col = DERIVED_COLUMNS.get(col, col)
+        wanted.add(COMMENT_COLUMNS.get(col, col))
+    return [c for c in pq.read_schema(path).names if c in wanted]
+
+
+def load_dataset(path, columns=None, filters=None, as_posts=True):
+    """
+    Load a dataset saved by `save_dataset` (Parquet) or a legacy pickle.
+
+    Args:
+        path: Dataset file or stem (see `resolve_dataset_path`)
+        columns: Dataset columns to load (default: all); with Parquet only
+            these columns are read from disk
+        filters: Parquet predicate(s) pushed down to the reader, e.g.
+            [("num_comments", ">=", 10)] - see `pyarrow.parquet.read_table`;
+            column names refer to the stored layout
+        as_posts: Return one row per post (default) or, when False, the
+            long one-row-per-comment frame (dictionary columns stay
+            categorical there)
+
+    Returns:
+        pandas.DataFrame
+    """
+    path = resolve_dataset_path(path)
+
+    if path.suffix == ".pkl":
+        df = pd.read_pickle(path)
+        if filters:
+            raise ValueError("filters are only supported for Parquet datasets")
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return to_long(df) if not as_posts else df
+
+    stored = _stored_columns(path, columns)
+    schema = pq.read_schema(path)
+    dictionary_cols = [f.name for f in schema
+                       if pa.types.is_dictionary(f.type)
+                       and (stored is None or f.name in stored)]
+    table = pq.read_table(path, columns=stored, filters=filters,
+                          read_dictionary=dictionary_cols)
+    long = table.to_pandas()
+    if not as_posts:
+        return long
+
+    metadata = json.loads((table.schema.metadata or {}).get(_METADATA_KEY, b"{}"))
+    order = metadata.get("columns")
+    if columns is not None:
+        order = [c for c in (order or columns) if c in columns]
+    return to_posts(long, columns=order)
+
+
+def convert_pickle(pkl_path, fmt=DEFAULT_FORMAT):
+    """
+    Convert a legacy pickle dataset to the columnar format alongside it.
+
+    Returns:
+        Path of the new file
+    """
+    pkl_path = Path(pkl_path)
+    return save_dataset(pd.read_pickle(pkl_path), pkl_path.with_suffix(""), fmt=fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="District dataset storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="convert pickles to Parquet")
+    convert.add_argument("paths", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for pkl_path in args.paths:
+            out = convert_pickle(pkl_path)
+            before, after = pkl_path.stat().st_size, out.stat().st_size
+            print(f"✅ {pkl_path.name} → {out.name} "
+                  f"({before / 1e6:.1f} MB → {after / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""N-District Comparison
+====================================================
+
+Per-district aggregates for comparing any number of districts at once.
+The input is one long frame with one row per post and a ``district``
+column (see `combine`). Every statistic is a grouped NumPy reduction
+(`np.bincount` / `np.unique`) over the district codes, so each extra
+district adds rows, not another pass over the data:
+
+- `sentiment_summary`: posts, mean and spread of the sentiment score,
+  % positive / neutral / negative
+- `label_counts` / `score_histogram`: sentiment distribution per district
+- `token_stats`: comments, tokens, unique words and average lengths
+- `top_ngrams`: most common words / bigrams per district, with the same
+  counts and tie order as `token_corpus.word_counts` / `bigram_counts`
+  run on each district alone
+- `topic_shares`: share of posts (or of topic weight) per topic
+
+`compare_districts` computes all of them from one tokenisation of the
+text. The app's District Comparison page and the notebooks use it.
+
+Expected columns (all but ``district`` optional; missing ones skip the
+aggregates that need them):
+
+- ``sentiment_score`` (and ``sentiment_label``, derived from the score
+  when absent)
+- ``cleaned_comments``: list of cleaned comments per post
+- ``dominant_topic``: topic index per post from a model shared by all
+  districts
+
+Usage:
+    >>> long = combine({"Palo Alto": df1, "Oklahoma City": df2, "Austin": df3})
+    >>> result = compare_districts(long, top_n=10)
+    >>> result["summary"]          # one row per district
+    >>> result["top_words"]        # District, rank, word, count
+
+Author: ADS 509 Team"""
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, timer
+from notebook_modules import text_processing
+
+DISTRICT_COLUMN = "district"
+
+# Label order used for every sentiment table
+SENTIMENT_LABELS = ("Positive", "Neutral", "Negative")
+
+# Bin edges of the sentiment-score histogram (VADER compound scores lie in [-1, 1])
+SCORE_BINS = np.linspace(-1.0, 1.0, 11)
+
+# Default number of n-grams kept per district
+TOP_N = 10
+
+# Column names of `top_ngrams` results, by n
+NGRAM_COLUMNS = {1: "word", 2: "bigram"}
+
+
+# --------------------------------------------
+# ✅ Long Frame
+# --------------------------------------------
+def combine(frames, district_col=DISTRICT_COLUMN):
+    """
+    Stack per-district frames into one long frame.
+
+    Args:
+        frames: Dict of district name -> frame with one row per post
+        district_col: Name of the district column to add
+
+    Returns:
+        DataFrame with a categorical district column first; categories
+        keep the order of `frames`, including districts without posts
+    """
+    names = list(frames)
+    if not names:
+        return pd.DataFrame({district_col: pd.Categorical([])})
+    long = pd.concat([df.drop(columns=district_col, errors="ignore")
+                      for df in frames.values()], ignore_index=True)
+    codes = np.repeat(np.arange(len(names)), [len(df) for df in frames.values()])
+    long.insert(0, district_col, pd.Categorical.from_codes(codes, categories=names))
+    return long
+
+
+def district_codes(long, district_col=DISTRICT_COLUMN):
+    """
+    Integer district code of every row, and the district names.
+
+    Returns:
+        Tuple (int64 array of codes, list of names in code order)
+    """
+    districts = long[district_col]
+    if not isinstance(districts.dtype, pd.CategoricalDtype):
+        districts = districts.astype("category")
+    codes = districts.cat.codes.to_numpy(np.int64)
+    if (codes < 0).any():
+        raise ValueError(f"Rows without a district in column {district_col!r}")
+    return codes, list(districts.cat.categories)
+
+
+def _index(names):
+    return pd.Index(names, name="District")
+
+
+def _ratio(numerator, denominator):
+    """Element-wise division with 0 where the denominator is 0."""
+    numerator = np.asarray(numerator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator),
+                     where=np.asarray(denominator) > 0)
+
+
+# --------------------------------------------
+# ✅ Sentiment
+# --------------------------------------------
+def _label_codes(long):
+    """Index of each row's label in SENTIMENT_LABELS."""
+    if "sentiment_label" in long:
+        labels = long["sentiment_label"]
+    else:
+        from sentiment import label_scores
+
+        labels = label_scores(long["sentiment_score"])
+    codes = pd.Categorical(labels, categories=SENTIMENT_LABELS).codes
+    if (codes < 0).any():
+        raise ValueError(f"Unknown sentiment labels (expected {SENTIMENT_LABELS})")
+    return codes.astype(np.int64)
+
+
+def label_counts(long):
+    """
+    Posts per sentiment label and district.
+
+    Returns:
+        DataFrame (district x label) of counts
+    """
+    codes, names = district_codes(long)
+    n_labels = len(SENTIMENT_LABELS)
+    counts = np.bincount(codes * n_labels + _label_codes(long),
+                         minlength=len(names) * n_labels)
+    return pd.DataFrame(counts.reshape(len(names), n_labels),
+                        index=_index(names), columns=list(SENTIMENT_LABELS))
+
+
+def score_histogram(long, bins=SCORE_BINS):
+    """
+    Posts per sentiment-score bin and district.
+
+    Returns:
+        DataFrame (district x bin) of counts; columns name the bin ranges
+    """
+    codes, names = district_codes(long)
+    n_bins = len(bins) - 1
+    scores = long["sentiment_score"].to_numpy(float)
+    # scores on the last edge (1.0) fall into the last bin
+    bin_idx = np.clip(np.searchsorted(bins, scores, side="right") - 1, 0, n_bins - 1)
+    counts = np.bincount(codes * n_bins + bin_idx, minlength=len(names) * n_bins)
+    columns = [f"{a:+.1f} to {b:+.1f}" for a, b in zip(bins[:-1], bins[1:])]
+    return pd.DataFrame(counts.reshape(len(names), n_bins), index=_index(names),
+                        columns=columns)
+
+
+def sentiment_summary(long, counts=None):
+    """
+    Sentiment summary row per district (the app's summary table).
+
+    Args:
+        long: Long frame with sentiment_score
+        counts: `label_counts(long)` if already computed
+
+    Returns:
+        DataFrame with District, # Posts, Avg Sentiment, Std Sentiment,
+        % Positive, % Neutral, % Negative
+    """
+    codes, names = district_codes(long)
+    scores = long["sentiment_score"].to_numpy(float)
+    n_posts = np.bincount(codes, minlength=len(names))
+    mean = _ratio(np.bincount(codes, weights=scores, minlength=len(names)), n_posts)
+    squares = _ratio(np.bincount(codes, weights=scores ** 2, minlength=len(names)), n_posts)
+    if counts is None:
+        counts = label_counts(long)
+    shares = _ratio(counts.to_numpy(), n_posts[:, None]) * 100
+
+    summary = pd.DataFrame({
+        "District": names,
+        "# Posts": n_posts,
+        "Avg Sentiment": mean.round(2),
+        "Std Sentiment": np.sqrt(np.maximum(squares - mean ** 2, 0)).round(2),
+    })
+    for i, label in enumerate(SENTIMENT_LABELS):
+        summary[f"% {label}"] = shares[:, i].round(1)
+    return summary
+
+
+# --------------------------------------------
+# ✅ Tokens and N-grams
+# --------------------------------------------
+def tokenize(long, text_col="cleaned_comments"):
+    """Tokenise every post's comments once (`TokenizedPosts`, rows in order)."""
+    return text_processing().TokenizedPosts.from_posts(long[text_col])
+
+
+def token_stats(long, tokens=None, text_col="cleaned_comments"):
+    """
+    Token statistics per district.
+
+    Args:
+        long: Long frame
+        tokens: `tokenize(long)` if already computed
+        text_col: Column with each post's cleaned comments
+
+    Returns:
+        DataFrame with District, # Posts, # Comments, Total Tokens,
+        Unique Words, Avg Comment Length (tokens per comment) and
+        Tokens per Post
+    """
+    codes, names = district_codes(long)
+    if tokens is None:
+        tokens = tokenize(long, text_col)
+    n = len(names)
+    n_posts = np.bincount(codes, minlength=n)
+    n_comments = np.bincount(codes, weights=tokens.comments_per_post, minlength=n)
+    n_tokens = np.bincount(codes, weights=tokens.tokens_per_post, minlength=n)
+
+    # one key per (district, word); the distinct keys are each district's vocabulary
+    vocab_size = max(1, len(tokens.vocab))
+    token_district = np.repeat(codes, tokens.tokens_per_post)
+    keys = np.unique(token_district * vocab_size + tokens.token_ids)
+    unique_words = np.bincount(keys // vocab_size, minlength=n)
+
+    return pd.DataFrame({
+        "District": names,
+        "# Posts": n_posts,
+        "# Comments": n_comments.astype(np.int64),
+        "Total Tokens": n_tokens.astype(np.int64),
+        "Unique Words": unique_words,
+        "Avg Comment Length": _ratio(n_tokens, n_comments).round(1),
+        "Tokens per Post": _ratio(n_tokens, n_posts).round(1),
+    })
+
+
+def _ngram_starts(tokens, n):
+    """Start positions of the n-grams that stay inside one comment."""
+    n_tokens = len(tokens.token_ids)
+    if n_tokens < n:
+        return np.array([], dtype=np.int64)
+    comment = np.repeat(np.arange(len(tokens.comment_offsets) - 1), tokens.comment_lengths)
+    return np.flatnonzero(comment[:n_tokens - n + 1] == comment[n - 1:])
+
+
+def top_ngrams(long, n=1, top_n=TOP_N, tokens=None, text_col="cleaned_comments"):
+    """
+    Most common n-grams of every district, counted in one pass.
+
+    N-grams never span two comments. Ties keep first-occurrence order, as
+    in `token_corpus.word_counts` / `bigram_counts`.
+
+    Args:
+        long: Long frame
+        n: N-gram size (1 = words, 2 = bigrams, ...)
+        top_n: N-grams kept per district
+        tokens: `tokenize(long)` if already computed
+        text_col: Column with each post's cleaned comments
+
+    Returns:
+        DataFrame with District, rank (1 = most common), the n-gram
+        (column "word", "bigram" or "ngram") and count
+    """
+    codes, names = district_codes(long)
+    if tokens is None:
+        tokens = tokenize(long, text_col)
+    column = NGRAM_COLUMNS.get(n, "ngram")
+
+    starts = _ngram_starts(tokens, n)
+    ids = np.asarray(tokens.token_ids, dtype=np.int64)
+    vocab_size = max(1, len(tokens.vocab))
+    token_district = np.repeat(codes, tokens.tokens_per_post)
+    parts = [token_district[starts]] + [ids[starts + j] for j in range(n)]
+
+    if len(names) * float(vocab_size) ** n < 2 ** 62:
+        # pack (district, id_1, ..., id_n) into one integer key
+        keys = parts[0]
+        for part in parts[1:]:
+            keys = keys * vocab_size + part
+        unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        rows = np.empty((len(unique), n + 1), dtype=np.int64)
+        for j in range(n, 0, -1):
+            unique, rows[:, j] = np.divmod(unique, vocab_size)
+        rows[:, 0] = unique
+    else:  # too many combinations for one int64 key
+        rows, first, counts = np.unique(np.column_stack(parts), axis=0,
+                                        return_index=True, return_counts=True)
+    if len(rows) == 0:
+        return pd.DataFrame({"District": pd.Categorical([], categories=names),
+                             "rank": [], column: [], "count": []})
+
+    # by district, then count (descending), then first occurrence
+    order = np.lexsort((first, -counts, rows[:, 0]))
+    group = rows[order, 0]
+    rank = np.arange(len(order)) - np.searchsorted(group, group)
+    keep = order[rank < top_n]
+
+    words = tokens.words
+    return pd.DataFrame({
+        "District": pd.Categorical.from_codes(rows[keep, 0], categories=names),
+        "rank": rank[rank < top_n] + 1,
+        column: [" ".join(words[i] for i in row[1:]) for row in rows[keep]],
+        "count": counts[keep],
+    })
+
+
+# --------------------------------------------
+# ✅ Topics
+# --------------------------------------------
+def topic_shares(long, topic_col="dominant_topic", doc_topic=None, n_topics=None):
+    """
+    Share of each topic per district.
+
+    Topics must come from one model fitted on all districts, so that
+    topic k means the same thing everywhere.
+
+    Args:
+        long: Long frame
+        topic_col: Column with each post's dominant topic (0-based)
+        doc_topic: Optional (posts x topics) matrix of topic weights, e.g.
+            `lda.transform(dtm)`; shares are then mean weights instead of
+            dominant-topic counts
+        n_topics: Number of topics (default: from the data)
+
+    Returns:
+        DataFrame (district x "Topic 1", "Topic 2", ...) of shares; rows
+        sum to 1 (0 for districts without posts)
+    """
+    codes, names = district_codes(long)
+    n = len(names)
+    if doc_topic is not None:
+        doc_topic = np.asarray(doc_topic, dtype=float)
+        n_topics = doc_topic.shape[1]
+        totals = np.column_stack([np.bincount(codes, weights=doc_topic[:, k], minlength=n)
+                                  for k in range(n_topics)])
+    else:
+        topics = long[topic_col].to_numpy(np.int64)
+        n_topics = n_topics or (int(topics.max()) + 1 if len(topics) else 0)
+        totals = np.bincount(codes * n_topics + topics,
+                             minlength=n * n_topics).reshape(n, n_topics)
+    shares = _ratio(totals, totals.sum(axis=1, keepdims=True))
+    return pd.DataFrame(shares, index=_index(names),
+                        columns=[f"Topic {k + 1}" for k in range(n_topics)])
+
+
+# --------------------------------------------
+# ✅ Everything at Once
+# --------------------------------------------
+@timer("comparison.compare_districts")
+def compare_districts(long, text_col="cleaned_comments", topic_col="dominant_topic",
+                      doc_topic=None, ngrams=(1, 2), top_n=TOP_N):
+    """
+    Compute every comparison aggregate for all districts in `long`.
+
+    Aggregates whose input columns are missing are left out.
+
+    Args:
+        long: Long frame (see `combine`)
+        text_col: Column with each post's cleaned comments
+        topic_col: Column with each post's dominant topic
+        doc_topic: Optional (posts x topics) weight matrix (see `topic_shares`)
+        ngrams: N-gram sizes to rank (1 -> "top_words", 2 -> "top_bigrams",
+            n -> "top_<n>grams")
+        top_n: N-grams kept per district
+
+    Returns:
+        Dict of DataFrames: summary, label_counts, score_histogram,
+        token_stats, top_words, top_bigrams, topic_shares
+    """
+    _, names = district_codes(long)
+    count("comparison.districts", len(names))
+    result = {}
+    if "sentiment_score" in long:
+        result["label_counts"] = label_counts(long)
+        result["summary"] = sentiment_summary(long, counts=result["label_counts"])
+        result["score_histogram"] = score_histogram(long)
+    if text_col in long:
+        with timer("comparison.tokenize"):
+            tokens = tokenize(long, text_col)
+        result["token_stats"] = token_stats(long, tokens=tokens)
+        for n in ngrams:
+            key = {1: "top_words", 2: "top_bigrams"}.get(n, f"top_{n}grams")
+            result[key] = top_ngrams(long, n=n, top_n=top_n, tokens=tokens)
+    if doc_topic is not None or topic_col in long:
+        result["topic_shares"] = topic_shares(long, topic_col, doc_topic=doc_topic)
+    return result
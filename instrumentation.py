@@ -0,0 +1,418 @@
+"""Timing and Profiling Instrumentation
+====================================================
+
+Lightweight timers and counters that the scraper, cleaner, sentiment,
+vectorisation and word-cloud code report through, so a slow district
+refresh or comparison click can be broken down by stage.
+
+Off by default; set ``ADS509_INSTRUMENT`` to turn it on:
+
+- ``1`` (or ``timers``): timers and counters
+- ``profile``: also a cProfile of each run (top functions in the report,
+  full stats in ``last_run.prof`` for snakeviz / pstats)
+- ``memory``: also tracemalloc peak and top allocation sites
+- combine with commas, e.g. ``ADS509_INSTRUMENT=profile,memory``
+
+Each finished `run` is appended to ``runs.jsonl`` and written to
+``last_run.json`` in ``.cache/instrumentation/`` (override with
+``ADS509_INSTRUMENT_DIR``); the app's Diagnostics page shows them. Timers
+and counts outside any `run` go to a process-wide run that is written
+when the interpreter exits.
+
+When disabled, `timer` and `count` only check a flag. Active runs are
+tracked per thread (in a context variable), so concurrent app sessions
+each get their own report; tasks handed to a thread pool with `bind_run`
+(as the FetchEngine pool does) report into the submitting thread's run.
+With ``memory``, overlapping runs share tracemalloc: it is stopped when
+the last of them finishes, and a run's peak is the process peak since
+the earliest of the overlapping runs started.
+
+Usage:
+    $ ADS509_INSTRUMENT=1 python pipeline.py run
+    $ ADS509_INSTRUMENT=profile,memory streamlit run streamlit_app.py
+    $ python instrumentation.py show
+
+    >>> from instrumentation import count, run, timer
+    >>> with run("refresh", district="Palo Alto"):
+    ...     with timer("reddit.search"):
+    ...         posts = search(...)
+    ...     count("reddit.posts", len(posts))
+    >>> @timer("sentiment.score_many")
+    ... def score_many(texts): ...
+
+Author: ADS 509 Team"""
+import argparse
+import atexit
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# Same default cache folder as result_cache (not imported: it reports here)
+CACHE_DIR = Path(os.environ.get("ADS509_CACHE_DIR", PROJECT_ROOT / ".cache"))
+INSTRUMENT_DIR = Path(os.environ.get("ADS509_INSTRUMENT_DIR", CACHE_DIR / "instrumentation"))
+RUNS_LOG = INSTRUMENT_DIR / "runs.jsonl"
+LAST_RUN = INSTRUMENT_DIR / "last_run.json"
+
+# Rows kept in a report for the profile / allocation tables
+PROFILE_TOP = 25
+MEMORY_TOP = 10
+
+_FEATURE_ALIASES = {"1": "timers", "true": "timers", "on": "timers"}
+
+
+def _parse_features(value):
+    features = set()
+    for item in (value or "").lower().split(","):
+        item = _FEATURE_ALIASES.get(item.strip(), item.strip())
+        if item in ("timers", "profile", "memory"):
+            features.update({"timers", item})
+    return features
+
+
+FEATURES = _parse_features(os.environ.get("ADS509_INSTRUMENT"))
+
+
+def enabled(feature="timers"):
+    """True when `feature` ("timers", "profile" or "memory") is switched on."""
+    return feature in FEATURES
+
+
+def configure(value):
+    """Switch features at runtime (same syntax as ``ADS509_INSTRUMENT``; "" = off)."""
+    FEATURES.clear()
+    FEATURES.update(_parse_features(value))
+
+
+# --------------------------------------------
+# ✅ Runs
+# --------------------------------------------
+# Runs using tracemalloc, and whether tracemalloc was started by them
+_memory_users = 0
+_memory_started = False
+_memory_lock = threading.Lock()
+
+
+class Run:
+    """
+    Timers and counters collected between `start` and `finish`.
+
+    Args:
+        name: Run label, e.g. "app:district_comparison"
+        context: Extra JSON-able details stored with the report
+    """
+
+    def __init__(self, name, **context):
+        self.name = name
+        self.context = context
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._memory = False
+        self.started_at = self._start = None
+
+    def start(self, capture=True):
+        """Start the clock; with `capture`, also cProfile / tracemalloc if enabled."""
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        if capture and enabled("profile"):
+            import cProfile  # only when profiling
+
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # another profiler is active (nested run)
+                self._profiler = None
+        if capture and enabled("memory"):
+            self._memory = True
+            _memory_acquire()
+        return self
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            entry = self.timers.setdefault(name, {"calls": 0, "seconds": 0.0, "max": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+
+    def add_count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _profile_report(self):
+        import pstats
+
+        self._profiler.disable()
+        INSTRUMENT_DIR.mkdir(parents=True, exist_ok=True)
+        self._profiler.dump_stats(INSTRUMENT_DIR / "last_run.prof")
+        stats = pstats.Stats(self._profiler)
+        rows = []
+        for (path, line, func), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({"function": f"{Path(path).name}:{line}({func})", "calls": calls,
+                         "tottime": round(total, 6), "cumtime": round(cumulative, 6)})
+        rows.sort(key=lambda row: row["cumtime"], reverse=True)
+        return rows[:PROFILE_TOP]
+
+    def _memory_report(self):
+        import tracemalloc
+
+        try:
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:MEMORY_TOP]
+        finally:
+            _memory_release()
+        return {
+            "peak_mb": round(peak / 2**20, 3),
+            "top": [{"location": str(stat.traceback[0]), "size_mb": round(stat.size / 2**20, 3),
+                     "count": stat.count} for stat in top],
+        }
+
+    def finish(self, error=None):
+        """Stop profiling, build the report and write it; returns the report."""
+        report = {
+            "name": self.name,
+            "context": self.context,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "error": error,
+            "timers": {k: {"calls": v["calls"], "seconds": round(v["seconds"], 6),
+                           "max": round(v["max"], 6)}
+                       for k, v in sorted(self.timers.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+        if self._profiler is not None:
+            report["profile"] = self._profile_report()
+        if self._memory:
+            report["memory"] = self._memory_report()
+        write_report(report)
+        return report
+
+
+def _memory_acquire():
+    """Start tracemalloc for the first overlapping memory run."""
+    global _memory_users, _memory_started
+    import tracemalloc
+
+    with _memory_lock:
+        if _memory_users == 0:
+            _memory_started = not tracemalloc.is_tracing()
+            if _memory_started:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        _memory_users += 1
+
+
+def _memory_release():
+    """Stop tracemalloc once the last memory run has finished with it."""
+    global _memory_users, _memory_started
+    import tracemalloc
+
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0 and _memory_started:
+            tracemalloc.stop()
+            _memory_started = False
+
+
+# Active runs of the current thread / context, innermost last
+_stack = contextvars.ContextVar("instrumentation_runs", default=())
+_process_lock = threading.Lock()
+_process_run = None
+
+
+def current_run():
+    """The innermost active run, or the process-wide one (None when disabled)."""
+    global _process_run
+    if not FEATURES:
+        return None
+    stack = _stack.get()
+    if stack:
+        return stack[-1]
+    with _process_lock:
+        if _process_run is None:
+            _process_run = Run("process", argv=list(sys.argv)).start(capture=False)
+            atexit.register(_finish_process_run)
+    return _process_run
+
+
+def bind_run(func):
+    """
+    Wrap `func` to run in a copy of the caller's context.
+
+    Use it when handing work to another thread so that the work reports
+    into the caller's active run, e.g. ``pool.submit(bind_run(fetch), subm)``.
+    Each call makes a fresh copy, so bind once per task.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def _finish_process_run():
+    if _process_run is not None and (_process_run.timers or _process_run.counters):
+        _process_run.finish()
+
+
+class run:
+    """
+    Context manager collecting one run's timers and counters.
+
+    On exit the report is written to ``runs.jsonl`` / ``last_run.json`` and
+    kept in `self.report`. Does nothing when instrumentation is off.
+
+    Args:
+        name: Run label
+        **context: Details stored with the report (district, params, ...)
+    """
+
+    def __init__(self, name, **context):
+        self.name = name
+        self.context = context
+        self.report = None
+        self._run = None
+
+    def start(self):
+        """Begin collecting (what ``with`` does); returns self."""
+        if FEATURES and self._run is None:
+            self._run = Run(self.name, **self.context).start()
+            _stack.set(_stack.get() + (self._run,))
+        return self
+
+    def finish(self, error=None):
+        """Stop collecting and write the report; returns it (None when off)."""
+        if self._run is not None:
+            _stack.set(tuple(r for r in _stack.get() if r is not self._run))
+            self.report = self._run.finish(error)
+            self._run = None
+        return self.report
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(f"{exc_type.__name__}: {exc}" if exc_type else None)
+        return False
+
+
+# --------------------------------------------
+# ✅ Timers and Counters
+# --------------------------------------------
+class timer:
+    """
+    Time a block or every call of a function under `name`.
+
+    Calls, total and maximum seconds are kept per name. Usable as
+    ``with timer("x"):`` and as ``@timer("x")``.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._start = None
+
+    def __enter__(self):
+        if FEATURES:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            target = current_run()
+            if target is not None:
+                target.add_time(self.name, time.perf_counter() - self._start)
+            self._start = None
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not FEATURES:
+                return func(*args, **kwargs)
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def count(name, n=1):
+    """Add `n` to counter `name` (posts, comments, api_calls, cache hits, ...)."""
+    if FEATURES:
+        target = current_run()
+        if target is not None:
+            target.add_count(name, int(n))
+
+
+# --------------------------------------------
+# ✅ Reports
+# --------------------------------------------
+def write_report(report):
+    """Append a report to the runs log and replace the last-run file."""
+    INSTRUMENT_DIR.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(report, default=str)
+    with open(RUNS_LOG, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    tmp = LAST_RUN.with_name(f"{LAST_RUN.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    tmp.replace(LAST_RUN)
+
+
+def load_last_run():
+    """The most recent report, or None."""
+    if not LAST_RUN.exists():
+        return None
+    return json.loads(LAST_RUN.read_text(encoding="utf-8"))
+
+
+def load_runs(limit=50):
+    """The latest `limit` reports from the runs log, newest first."""
+    if not RUNS_LOG.exists():
+        return []
+    lines = RUNS_LOG.read_text(encoding="utf-8").splitlines()[-limit:]
+    return [json.loads(line) for line in reversed(lines) if line.strip()]
+
+
+def format_report(report):
+    """Plain-text summary of a report (timers by total time, then counters)."""
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(report["started_at"]))
+    lines = [f"{report['name']}  {report['seconds']:.3f}s  (started {started})"]
+    if report.get("error"):
+        lines.append(f"  error: {report['error']}")
+    timers = sorted(report["timers"].items(), key=lambda kv: kv[1]["seconds"], reverse=True)
+    if timers:
+        lines.append(f"  {'timer':<36}{'calls':>7}{'total s':>10}{'max s':>9}")
+        lines.extend(f"  {name:<36}{t['calls']:>7}{t['seconds']:>10.3f}{t['max']:>9.3f}"
+                     for name, t in timers)
+    if report["counters"]:
+        lines.append(f"  {'counter':<36}{'value':>10}")
+        lines.extend(f"  {name:<36}{value:>10,}" for name, value in report["counters"].items())
+    if report.get("memory"):
+        lines.append(f"  peak traced memory: {report['memory']['peak_mb']:.1f} MB")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instrumentation reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="print the last run")
+    list_cmd = sub.add_parser("list", help="list recent runs")
+    list_cmd.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        report = load_last_run()
+        print(format_report(report) if report else f"No runs recorded in {INSTRUMENT_DIR}")
+    elif args.command == "list":
+        for report in load_runs(args.limit):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(report["started_at"]))
+            print(f"{started}  {report['name']:<32}{report['seconds']:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""NLTK Data Resources
+====================================================
+
+Resolves the NLTK data the project needs (VADER lexicon, stopwords) from
+local directories only, on first use. `nltk.download()` checks the remote
+index on every call, even when the data is already installed; here the
+network is touched only when a resource is genuinely missing, and never
+when ADS509_NLTK_OFFLINE=1.
+
+Resources are looked up in ADS509_NLTK_DATA (default: .nltk_data in the
+project) first, then in NLTK's usual locations (~/nltk_data, ...).
+Missing ones are downloaded into ADS509_NLTK_DATA.
+
+Usage:
+    >>> require("vader_lexicon")                  # path of the lexicon
+
+    $ python nltk_resources.py download           # fetch everything up front
+
+Author: ADS 509 Team"""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# Project-local NLTK data directory (override with ADS509_NLTK_DATA)
+NLTK_DATA_DIR = Path(os.environ.get("ADS509_NLTK_DATA", PROJECT_ROOT / ".nltk_data"))
+
+# Set ADS509_NLTK_OFFLINE=1 to fail instead of downloading missing data
+OFFLINE = os.environ.get("ADS509_NLTK_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# Resource name -> location inside an nltk_data directory
+RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+
+
+def _add_data_dir(nltk):
+    data_dir = str(NLTK_DATA_DIR)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+
+@lru_cache(maxsize=None)
+def require(name):
+    """
+    Make an NLTK resource available and return its location.
+
+    Resolved once per process; later calls return the cached result.
+
+    Args:
+        name: Key of RESOURCES (e.g. "vader_lexicon")
+
+    Raises:
+        LookupError: When the resource is missing and downloads are
+            disabled (ADS509_NLTK_OFFLINE=1) or fail
+    """
+    import nltk
+
+    _add_data_dir(nltk)
+    try:
+        return nltk.data.find(RESOURCES[name])
+    except LookupError:
+        if OFFLINE:
+            raise LookupError(
+                f"❌ NLTK resource {name!r} not found and ADS509_NLTK_OFFLINE is set; "
+                f"run `python nltk_resources.py download` to install it into {NLTK_DATA_DIR}"
+            ) from None
+
+    NLTK_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if not nltk.download(name, download_dir=str(NLTK_DATA_DIR), quiet=True):
+        raise LookupError(f"❌ Could not download NLTK resource {name!r}")
+    return nltk.data.find(RESOURCES[name])
+
+
+def main():
+    import nltk
+
+    for name in RESOURCES:
+        nltk.download(name, download_dir=str(NLTK_DATA_DIR), quiet=True)
+        print(f"✅ {name} → {NLTK_DATA_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Lazy Imports from notebooks/
+====================================================
+
+The text-processing code shared with the notebooks lives in ``notebooks/``
+(text_processing.py, near_duplicates.py, ...), which is not on
+``sys.path`` for root modules. The app, the artefact and search index
+builders, the classifier and the stream ingester import it through here,
+on first use, so importing them stays cheap until cleaning is needed.
+
+Usage:
+    >>> from notebook_modules import get_cleaner, text_processing
+    >>> get_cleaner().clean_many(["Great teachers!"])
+    >>> text_processing().clean_corpus(titles, cache=True)
+
+Author: ADS 509 Team"""
+import importlib
+import sys
+from pathlib import Path
+
+NOTEBOOKS_DIR = Path(__file__).resolve().parent / "notebooks"
+
+
+def import_notebook_module(name):
+    """Import a module from notebooks/ by name, adding the folder to sys.path."""
+    notebooks = str(NOTEBOOKS_DIR)
+    if notebooks not in sys.path:
+        sys.path.append(notebooks)
+    return importlib.import_module(name)
+
+
+def text_processing():
+    """Return the notebooks/text_processing.py module."""
+    return import_notebook_module("text_processing")
+
+
+def get_cleaner():
+    """Return the shared default `text_processing.TextCleaner`."""
+    return text_processing().get_cleaner()
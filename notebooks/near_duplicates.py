@@ -0,0 +1,473 @@
+"""Near-Duplicate Comment Detection (MinHash + LSH)
+====================================================
+
+Cross-posts and quoted replies leave many near-copies in `comments_flat`,
+which inflate word/bigram counts and topic models. This stage runs after
+`clean_dataframe_column` and drops near-duplicate comments:
+
+1. each cleaned comment becomes a set of word shingles (3 consecutive
+   words by default), hashed to 32-bit integers
+2. a MinHash signature (`num_perm` minimum hash values) estimates the
+   Jaccard similarity of two shingle sets as the share of equal values
+3. LSH banding splits signatures into bands; comments sharing a band
+   bucket become candidate pairs, so only a small fraction of all pairs
+   is ever compared
+4. candidates with estimated similarity >= `threshold` are linked into
+   clusters; the first comment of a cluster (earliest indexed, then in
+   frame order) is kept, the others are removed and reported
+
+A `SignatureIndex` keeps the signatures of every kept comment. Persisted
+with `folder=` (e.g. `SIGNATURE_DIR`), it lets a later scrape be checked
+against everything seen before without recomputing old signatures.
+
+Usage:
+    >>> index = SignatureIndex(SIGNATURE_DIR)          # or SignatureIndex() in memory
+    >>> df = clean_dataframe_column(df, cache=True)
+    >>> df, removed = drop_near_duplicates(df, district="Palo Alto", index=index)
+    >>> cluster_report(removed)
+
+    $ python notebooks/near_duplicates.py report datasets/*_cleaned_pipeline_reddit.pkl
+
+Author: ADS 509 Team"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from text_processing import PROJECT_ROOT
+
+# Default folder of the persisted signature index
+SIGNATURE_DIR = PROJECT_ROOT / "datasets" / "minhash_index"
+
+# Bump when shingling or hashing changes; older indexes are not loaded
+SIGNATURE_VERSION = 1
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+
+# Weight of missed pairs vs. spurious candidates when choosing LSH bands;
+# candidates are verified, so a spurious one only costs a comparison
+FALSE_NEGATIVE_WEIGHT = 0.9
+
+# Shingle x permutation products are computed this many shingles at a time
+_HASH_BLOCK = 16_384
+
+# Per-comment list columns kept aligned when comments are dropped
+COMMENT_LIST_COLUMNS = ("comments_flat", "cleaned_comments", "comment_ids", "comments_nested")
+
+_MAX_HASH = np.uint32(np.iinfo(np.uint32).max)
+
+# numpy < 2.0 only has the older name
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+# =============================================================================
+# MINHASH SIGNATURES
+# =============================================================================
+
+def _stable_hash(text):
+    """64-bit hash of a string that does not change between processes."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+def _shingle_hashes(comments, shingle_size):
+    """
+    32-bit hashes of the word shingles of each comment.
+
+    Returns:
+        Tuple (uint64 array of shingle hashes, int64 offsets of length
+        n_comments + 1); comments shorter than `shingle_size` words form a
+        single shingle, empty comments have none
+    """
+    word_hash = {}
+    hashes, offsets = [], [0]
+    for comment in comments:
+        words = comment.split() if isinstance(comment, str) else []
+        ids = np.array([word_hash.get(w) or word_hash.setdefault(w, _stable_hash(w))
+                        for w in words], dtype=np.uint64)
+        k = min(shingle_size, len(ids))
+        if k:
+            # rolling combination of k consecutive word hashes (wraps mod 2**64)
+            n = len(ids) - k + 1
+            combined = np.zeros(n, dtype=np.uint64)
+            for j in range(k):
+                combined = combined * np.uint64(1_000_003) + ids[j:j + n]
+            hashes.append(combined >> np.uint64(32))
+        offsets.append(offsets[-1] + (len(ids) - k + 1 if k else 0))
+    values = np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64)
+    return values, np.asarray(offsets, dtype=np.int64)
+
+
+def _permutations(num_perm, seed):
+    """Odd 64-bit multipliers and offsets of the multiply-shift hash family."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(comments, num_perm=DEFAULT_NUM_PERM,
+                       shingle_size=DEFAULT_SHINGLE_SIZE, seed=42):
+    """
+    MinHash signatures of cleaned comments.
+
+    Args:
+        comments: Sequence of cleaned comment strings
+        num_perm: Hash functions per signature (more = better estimates)
+        shingle_size: Words per shingle
+        seed: Seed of the hash functions; signatures are only comparable
+            when computed with the same seed, num_perm and shingle_size
+
+    Returns:
+        uint32 array (n_comments, num_perm); rows of empty comments are all
+        the maximum value
+
+    Example:
+        >>> sig = minhash_signatures(["great school great teachers",
+        ...                           "great school great teachers here"])
+        >>> (sig[0] == sig[1]).mean()      # estimated Jaccard similarity
+    """
+    shingles, offsets = _shingle_hashes(comments, shingle_size)
+    a, b = _permutations(num_perm, seed)
+    signatures = np.full((len(offsets) - 1, num_perm), _MAX_HASH, dtype=np.uint32)
+
+    owner = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    for start in range(0, len(shingles), _HASH_BLOCK):
+        block = shingles[start:start + _HASH_BLOCK]
+        hashed = ((block[:, None] * a + b) >> np.uint64(32)).astype(np.uint32)
+        np.minimum.at(signatures, owner[start:start + _HASH_BLOCK], hashed)
+    return signatures
+
+
+def lsh_params(threshold, num_perm):
+    """
+    Bands and rows per band for a similarity threshold.
+
+    Picks the split minimising the weighted area of missed pairs above
+    `threshold` and spurious candidates below it under the LSH S-curve
+    1 - (1 - s ** rows) ** bands (see FALSE_NEGATIVE_WEIGHT).
+
+    Returns:
+        Tuple (bands, rows) with bands * rows <= num_perm
+    """
+    s = np.linspace(0, 1, 201)
+    below, above = s <= threshold, s >= threshold
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        candidate = 1 - (1 - s ** rows) ** bands
+        false_pos = _trapezoid(candidate[below], s[below])
+        false_neg = _trapezoid(1 - candidate[above], s[above])
+        error = (1 - FALSE_NEGATIVE_WEIGHT) * false_pos + FALSE_NEGATIVE_WEIGHT * false_neg
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def band_keys(signatures, bands, rows):
+    """64-bit bucket key of every band of every signature, shape (n, bands)."""
+    keys = np.empty((len(signatures), bands), dtype=np.uint64)
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        key = np.full(len(signatures), band, dtype=np.uint64)
+        for column in block.T:
+            key = key * np.uint64(0x100000001B3) ^ column
+        keys[:, band] = key
+    return keys
+
+
+def candidate_pairs(keys, min_new=0):
+    """
+    Pairs of rows sharing at least one band bucket.
+
+    Args:
+        keys: Band keys from `band_keys`
+        min_new: Only pairs with at least one row >= min_new are returned
+            (rows below it were already checked against each other)
+
+    Returns:
+        int64 array (n_pairs, 2) with i < j, without repeats
+    """
+    pairs = []
+    for band in range(keys.shape[1]):
+        column = keys[:, band]
+        order = np.argsort(column, kind="stable")
+        sorted_keys = column[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = np.sort(order[start:start + size])
+            i, j = np.triu_indices(size, k=1)
+            pairs.append(np.column_stack([members[i], members[j]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.unique(np.concatenate(pairs), axis=0)
+    return pairs[pairs[:, 1] >= min_new]
+
+
+# =============================================================================
+# SIGNATURE INDEX
+# =============================================================================
+
+class SignatureIndex:
+    """
+    Signatures and band keys of every comment kept so far.
+
+    Args:
+        folder: Folder to load from and `save` to; None keeps the index in
+            memory only
+        threshold: Estimated Jaccard similarity at which two comments are
+            near-duplicates
+        num_perm: MinHash functions per signature
+        shingle_size: Words per shingle
+
+    An existing index in `folder` is loaded when it was built with the same
+    settings; otherwise the index starts empty (and replaces it on save).
+    """
+
+    def __init__(self, folder=None, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                 shingle_size=DEFAULT_SHINGLE_SIZE, seed=42):
+        self.folder = Path(folder) if folder is not None else None
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self.keys = np.empty((0, self.bands), dtype=np.uint64)
+        self.entries = pd.DataFrame({"key": pd.Series(dtype=object),
+                                     "district": pd.Series(dtype=object),
+                                     "post_id": pd.Series(dtype=np.int64),
+                                     "comment_idx": pd.Series(dtype=np.int64)})
+        if self.folder is not None:
+            self._load()
+
+    @property
+    def settings(self):
+        return {"version": SIGNATURE_VERSION, "num_perm": self.num_perm,
+                "shingle_size": self.shingle_size, "seed": self.seed,
+                "bands": self.bands, "rows": self.rows}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _load(self):
+        meta_path = self.folder / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        if {k: meta.get(k) for k in self.settings} != self.settings:
+            return
+        self.signatures = np.load(self.folder / "signatures.npy")
+        self.keys = np.load(self.folder / "band_keys.npy")
+        self.entries = pd.read_parquet(self.folder / "entries.parquet")
+
+    def save(self):
+        """Write the index to its folder (meta.json last)."""
+        if self.folder is None:
+            raise ValueError("In-memory SignatureIndex; pass folder= to persist it")
+        self.folder.mkdir(parents=True, exist_ok=True)
+        for name, array in (("signatures", self.signatures), ("band_keys", self.keys)):
+            tmp = self.folder / f"{name}.tmp-{os.getpid()}.npy"
+            np.save(tmp, array)
+            tmp.replace(self.folder / f"{name}.npy")
+        self.entries.to_parquet(self.folder / "entries.parquet", index=False)
+        meta = dict(self.settings, n_entries=len(self))
+        (self.folder / "meta.json").write_text(json.dumps(meta, indent=2))
+        return self.folder
+
+    def signatures_for(self, comments):
+        return minhash_signatures(comments, self.num_perm, self.shingle_size, self.seed)
+
+    def deduplicate(self, comments, entries):
+        """
+        Find near-duplicates among new comments and against the index.
+
+        Comments whose key is already indexed were kept by an earlier run and
+        are kept again. The kept new comments are added to the index.
+
+        Args:
+            comments: Cleaned comment strings
+            entries: DataFrame with key, district, post_id and comment_idx
+                per comment (same order)
+
+        Returns:
+            DataFrame with one row per removed comment: its position in
+            `comments`, district / post_id / comment_idx, estimated
+            similarity to the kept comment, cluster and the kept comment's
+            district / post_id / comment_idx
+        """
+        entries = entries.reset_index(drop=True)
+        known = entries["key"].isin(set(self.entries["key"])).to_numpy()
+        empty = np.array([not (isinstance(c, str) and c.split()) for c in comments], dtype=bool)
+        new = np.flatnonzero(~known & ~empty)
+
+        signatures = self.signatures_for([comments[i] for i in new])
+        keys = band_keys(signatures, self.bands, self.rows)
+        n_old = len(self.signatures)
+        all_signatures = np.vstack([self.signatures, signatures])
+        pairs = candidate_pairs(np.vstack([self.keys, keys]), min_new=n_old)
+
+        similarity = (all_signatures[pairs[:, 0]] == all_signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[similarity >= self.threshold]
+
+        # clusters = connected components; the lowest row (oldest) represents each
+        n = len(all_signatures)
+        graph = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        representative = np.full(labels.max() + 1 if n else 0, n, dtype=np.int64)
+        np.minimum.at(representative, labels, np.arange(n))
+        rep_of = representative[labels]
+        removed = np.flatnonzero((rep_of != np.arange(n)) & (np.arange(n) >= n_old))
+
+        all_entries = pd.concat([self.entries, entries.iloc[new]], ignore_index=True)
+        kept_entries = all_entries.iloc[rep_of[removed]].reset_index(drop=True)
+        report = pd.DataFrame({
+            "position": new[removed - n_old],
+            "district": entries["district"].to_numpy()[new[removed - n_old]],
+            "post_id": entries["post_id"].to_numpy()[new[removed - n_old]],
+            "comment_idx": entries["comment_idx"].to_numpy()[new[removed - n_old]],
+            "similarity": (all_signatures[removed] == all_signatures[rep_of[removed]]).mean(axis=1),
+            "cluster": rep_of[removed],
+            "kept_district": kept_entries["district"],
+            "kept_post_id": kept_entries["post_id"],
+            "kept_comment_idx": kept_entries["comment_idx"],
+        })
+
+        keep = np.ones(len(new), dtype=bool)
+        keep[removed - n_old] = False
+        self.signatures = np.vstack([self.signatures, signatures[keep]])
+        self.keys = np.vstack([self.keys, keys[keep]])
+        self.entries = pd.concat([self.entries, entries.iloc[new[keep]]], ignore_index=True)
+        return report
+
+
+# =============================================================================
+# DATAFRAME STAGE
+# =============================================================================
+
+def _comment_keys(df, district, column):
+    """
+    Stable identity of every comment, used to recognise already indexed ones.
+
+    Reddit comment IDs when the frame has them, else a hash of district,
+    post title, position and cleaned text.
+    """
+    keys = []
+    for post_id, row in enumerate(df.itertuples(index=False)):
+        comments = getattr(row, column)
+        ids = getattr(row, "comment_ids", None)
+        for idx, comment in enumerate(comments):
+            if ids is not None and idx < len(ids):
+                keys.append(f"id:{ids[idx]}")
+            else:
+                title = getattr(row, "topic", "")
+                digest = hashlib.blake2b(f"{district}\0{title}\0{idx}\0{comment}".encode(),
+                                         digest_size=12)
+                keys.append(f"h:{digest.hexdigest()}")
+    return keys
+
+
+def drop_near_duplicates(df, column='cleaned_comments', district=None, index=None,
+                         threshold=DEFAULT_THRESHOLD, save=True):
+    """
+    Remove near-duplicate comments from a cleaned dataset frame.
+
+    Args:
+        df: Frame after `clean_dataframe_column`
+        column: Cleaned comment column compared (default: 'cleaned_comments')
+        district: District name recorded in the index and report
+        index: SignatureIndex to check against and extend (default: a new
+            in-memory one with `threshold`); share one index across
+            districts to dedupe across them
+        threshold: Similarity threshold when no index is given
+        save: Save a persisted index after adding the kept comments
+
+    Returns:
+        Tuple (frame with the duplicates removed from every per-comment list
+        column, report DataFrame with one row per removed comment)
+    """
+    index = index if index is not None else SignatureIndex(threshold=threshold)
+    comments = [c for post in df[column] for c in post]
+    lengths = df[column].map(len).to_numpy()
+    post_id = np.repeat(np.arange(len(df)), lengths)
+    comment_idx = np.arange(len(comments)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    entries = pd.DataFrame({"key": _comment_keys(df, district, column), "district": district,
+                            "post_id": post_id, "comment_idx": comment_idx})
+
+    report = index.deduplicate(comments, entries)
+    if save and index.folder is not None:
+        index.save()
+
+    drop = np.zeros(len(comments), dtype=bool)
+    drop[report["position"].to_numpy()] = True
+    keep_per_post = np.split(~drop, np.cumsum(lengths)[:-1]) if len(df) else []
+
+    df = df.copy()
+    for col in COMMENT_LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.Series(
+                [[c for c, k in zip(values, mask) if k] if len(values) == len(mask) else values
+                 for values, mask in zip(df[col], keep_per_post)],
+                index=df.index, dtype=object)
+
+    report["text"] = [comments[i] for i in report["position"]]
+    return df, report.drop(columns="position")
+
+
+def cluster_report(report):
+    """
+    One row per duplicate cluster: the kept comment and how many copies went.
+
+    Args:
+        report: Removed-comment report(s) from `drop_near_duplicates`
+            (concatenate several to summarise districts together)
+    """
+    if report.empty:
+        return pd.DataFrame(columns=["kept_district", "kept_post_id", "kept_comment_idx",
+                                     "removed", "districts", "min_similarity", "example"])
+    grouped = report.groupby(["kept_district", "kept_post_id", "kept_comment_idx"], sort=False)
+    summary = grouped.agg(
+        removed=("text", "size"),
+        districts=("district", lambda d: ", ".join(sorted(set(d)))),
+        min_similarity=("similarity", "min"),
+        example=("text", "first"),
+    ).reset_index()
+    return summary.sort_values("removed", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate comment detection")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("report", help="show duplicate clusters in cleaned datasets")
+    report_cmd.add_argument("paths", nargs="+", type=Path)
+    report_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    report_cmd.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "report":
+        from dataset_store import load_dataset
+
+        index = SignatureIndex(threshold=args.threshold)
+        reports = []
+        for path in args.paths:
+            df = load_dataset(path, columns=["topic", "cleaned_comments"])
+            district = path.name.split("_cleaned_")[0].replace("_", " ")
+            before = df["cleaned_comments"].map(len).sum()
+            _, removed = drop_near_duplicates(df, district=district, index=index)
+            reports.append(removed)
+            print(f"✅ {district}: {len(removed):,} of {before:,} comments are near-duplicates")
+        clusters = cluster_report(pd.concat(reports, ignore_index=True))
+        clusters["example"] = clusters["example"].str.slice(0, 60)
+        print(clusters.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
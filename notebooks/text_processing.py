@@ -5,23 +5,163 @@ This module provides reusable functions for cleaning, analyzing,
 and extracting insights from Reddit comment data.
 
 Author: ADS 509 Team"""
+import hashlib
+import heapq
 import re
 import string
+from array import array
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, repeat
+from operator import itemgetter
+
+import sys
+from pathlib import Path
 
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import NMF
-from nltk.corpus import stopwords
-import nltk
 
-nltk.download('stopwords')
+# project-level helpers (result_cache.py, ...) live in the repo root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from instrumentation import count, timer  # noqa: E402
+from nltk_resources import require  # noqa: E402
+from parallel import resolve_n_jobs  # noqa: E402
+from result_cache import resolve_cache  # noqa: E402
 
 # =============================================================================
 # CLEANING PIPELINE FUNCTIONS
 # =============================================================================
-def clean_text(text, remove_stopwords=True, lowercase=True):
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+MENTION_PATTERN = re.compile(r'@\w+|#\w+')
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Bump when the cleaning rules change so cached results are not reused
+CLEANER_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def english_stopwords():
+    """NLTK's English stopword list, loaded on first use from local data."""
+    require('stopwords')
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words('english'))
+
+
+class TextCleaner:
+    """
+    Reusable comment cleaner with everything built once up front.
+
+    The URL/mention patterns and the punctuation table are compiled at
+    import time and the stopword list is frozen when the cleaner is created,
+    so cleaning many comments only pays for the string work itself. Output
+    is identical to calling `clean_text` with the same options.
+
+    Args:
+        remove_stopwords: Remove common words
+        lowercase: Convert everything to lowercase
+        stop_words: Optional custom stopword list (default: NLTK english)
+
+    Example:
+        >>> cleaner = TextCleaner()
+        >>> cleaner.clean_many(["Check https://x.com NOW!", "@bob hi"])
+        ['check', 'hi']
+    """
+
+    def __init__(self, remove_stopwords=True, lowercase=True, stop_words=None):
+        self.remove_stopwords = remove_stopwords
+        self.lowercase = lowercase
+
+        if not remove_stopwords:
+            self.stop_words = frozenset()
+        elif stop_words is None:
+            self.stop_words = english_stopwords()
+        else:
+            self.stop_words = frozenset(stop_words)
+
+    @property
+    def cache_namespace(self):
+        """Result-cache namespace identifying these cleaning options."""
+        stop_hash = hashlib.sha1(
+            '\n'.join(sorted(self.stop_words)).encode('utf-8')
+        ).hexdigest()[:12]
+        return (f"clean:v{CLEANER_VERSION}:lower={int(self.lowercase)}"
+                f":stop={int(self.remove_stopwords)}:{stop_hash}")
+
+    def clean(self, text):
+        """
+        Clean a single comment.
+
+        Args:
+            text: The comment text to clean
+
+        Returns:
+            Cleaned text as a string
+        """
+        if not isinstance(text, str):
+            return ""
+
+        if self.lowercase:
+            text = text.lower()
+
+        text = URL_PATTERN.sub('', text)
+        text = MENTION_PATTERN.sub('', text)
+        text = text.translate(PUNCTUATION_TABLE)
+
+        # split once: collapses whitespace and feeds the stopword filter
+        words = text.split()
+        if self.remove_stopwords:
+            stop_words = self.stop_words
+            words = [w for w in words if w not in stop_words]
+
+        return ' '.join(words)
+
+    def clean_many(self, comments, cache=None):
+        """
+        Clean a whole batch of comments in one pass.
+
+        Args:
+            comments: List of comment texts or a pandas Series
+            cache: Optional persistent result cache - True for the shared
+                on-disk cache, or a `result_cache.ResultCache`
+
+        Returns:
+            List of cleaned comments, or a Series with the same index
+            when a Series was passed in
+        """
+        clean = self.clean
+        cache = resolve_cache(cache, self.cache_namespace)
+        if cache is None:
+            cleaned = [clean(c) for c in comments]
+        else:
+            cleaned = cache.map(
+                [c if isinstance(c, str) else "" for c in comments],
+                lambda missing: [clean(c) for c in missing],
+            )
+
+        if isinstance(comments, pd.Series):
+            return pd.Series(cleaned, index=comments.index, name=comments.name)
+        return cleaned
+
+    __call__ = clean
+
+
+@lru_cache(maxsize=None)
+def get_cleaner(remove_stopwords=True, lowercase=True):
+    """
+    Get a shared `TextCleaner` for the given options.
+
+    Cleaners are cached per option combination so the stopword set is only
+    loaded once per process.
+    """
+    return TextCleaner(remove_stopwords=remove_stopwords, lowercase=lowercase)
+
+
+def clean_text(text, remove_stopwords=True, lowercase=True, cache=None):
     """
     Clean a single comment by removing noise and formatting.
     
@@ -29,40 +169,20 @@ def clean_text(text, remove_stopwords=True, lowercase=True):
         text: The comment text to clean
         remove_stopwords: Remove common words 
         lowercase: Convert everything to lowercase
+        cache: Optional persistent result cache (True or a ResultCache)
         
     Returns:
         Cleaned text as a string
         
     """ 
-    if not isinstance(text, str):
-        return ""
-    
-    # Lowercase
-    if lowercase:
-        text = text.lower()
-    
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+', '', text)
-    
-    # Remove mentions and hashtags
-    text = re.sub(r'@\w+|#\w+', '', text)
-    
-    # Remove punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    
-    # Remove stopwords
-    if remove_stopwords:
-        stop_words = set(stopwords.words('english'))
-        words = text.split()
-        text = ' '.join([w for w in words if w not in stop_words])
-    
-    return text
+    cleaner = get_cleaner(remove_stopwords, lowercase)
+    if cache:
+        return cleaner.clean_many([text], cache=cache)[0]
+    return cleaner.clean(text)
 
 
-def clean_corpus(comments, remove_stopwords=True, lowercase=True):
+@timer("clean.clean_corpus")
+def clean_corpus(comments, remove_stopwords=True, lowercase=True, cache=None):
     """
    Clean a list of comments.
     
@@ -70,15 +190,101 @@ def clean_corpus(comments, remove_stopwords=True, lowercase=True):
         comments: List of comment texts
         remove_stopwords: Remove common words like 'the', 'is', 'and'
         lowercase: Convert everything to lowercase
+        cache: Optional persistent result cache (True or a ResultCache)
         
     Returns:
         List of cleaned comments
     """
-    return [clean_text(c, remove_stopwords, lowercase) for c in comments]
+    cleaner = get_cleaner(remove_stopwords, lowercase)
+    return list(cleaner.clean_many(comments, cache=cache))
+
+
+# Frames with fewer comments than this are always cleaned serially: below it
+# the cost of starting workers and pickling chunks outweighs the speedup.
+PARALLEL_MIN_COMMENTS = 20_000
+
+# Number of chunks handed to each worker; a few per worker keeps the pool
+# balanced when some posts have far more comments than others.
+CHUNKS_PER_WORKER = 4
+
+
+def _clean_post_chunk(posts, remove_stopwords, lowercase):
+    """Worker task: clean a chunk of posts (each a list of comments)."""
+    cleaner = get_cleaner(remove_stopwords, lowercase)
+    return [cleaner.clean_many(comments) for comments in posts]
+
+
+def _chunk_posts(posts, n_chunks):
+    """
+    Split posts into contiguous chunks holding roughly equal comment counts.
+
+    Chunks are contiguous so concatenating the results preserves row order.
+    """
+    sizes = [len(comments) for comments in posts]
+    target = max(1, sum(sizes) // max(1, n_chunks))
+
+    chunks, current, current_size = [], [], 0
+    for comments, size in zip(posts, sizes):
+        current.append(comments)
+        current_size += size
+        if current_size >= target:
+            chunks.append(current)
+            current, current_size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _clean_posts(posts, remove_stopwords, lowercase, n_jobs=1, executor=None):
+    """Clean a list of posts serially or on a process pool, in row order."""
+    total_comments = sum(len(comments) for comments in posts)
+    n_workers = resolve_n_jobs(n_jobs)
+
+    if (executor is None and n_workers == 1) or total_comments < PARALLEL_MIN_COMMENTS:
+        return _clean_post_chunk(posts, remove_stopwords, lowercase)
+
+    chunks = _chunk_posts(posts, n_workers * CHUNKS_PER_WORKER)
+    pool = executor or ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        results = pool.map(
+            _clean_post_chunk, chunks,
+            repeat(remove_stopwords), repeat(lowercase),
+        )
+        return [post for chunk in results for post in chunk]
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+
+# Unseen comments are regrouped into pseudo-posts of this size so the
+# parallel cleaner can still shard them
+_CACHE_MISS_CHUNK = 1_000
+
 
+def _clean_posts_cached(posts, cache, remove_stopwords, lowercase,
+                        n_jobs=1, executor=None):
+    """
+    Clean posts through the result cache, sending only unseen comments to
+    the (possibly parallel) cleaner, and regroup them per post.
+    """
+    flat = [c if isinstance(c, str) else "" for comments in posts for c in comments]
+
+    def clean_missing(missing):
+        batches = [missing[i:i + _CACHE_MISS_CHUNK]
+                   for i in range(0, len(missing), _CACHE_MISS_CHUNK)]
+        cleaned = _clean_posts(batches, remove_stopwords, lowercase,
+                               n_jobs=n_jobs, executor=executor)
+        return [c for batch in cleaned for c in batch]
+
+    cleaned = iter(cache.map(flat, clean_missing))
+    return [[next(cleaned) for _ in comments] for comments in posts]
+
+
+@timer("clean.clean_dataframe_column")
 def clean_dataframe_column(df, column='comments_flat', 
                            new_column='cleaned_comments',
-                           remove_stopwords=True, lowercase=True):
+                           remove_stopwords=True, lowercase=True,
+                           n_jobs=1, executor=None, cache=None):
     """
     Clean comments in a DataFrame column.
     
@@ -88,31 +294,270 @@ def clean_dataframe_column(df, column='comments_flat',
         new_column: Name for the new cleaned column (default: 'cleaned_comments')
         remove_stopwords: Remove common words
         lowercase: Convert everything to lowercase
+        n_jobs: Number of worker processes (default: 1 = serial, -1 = all
+            cores); with `executor`, the number of workers it has (sets the
+            number of chunks)
+        executor: Optional existing `concurrent.futures.Executor` to reuse
+            across calls (e.g. one pool for every district); it is not shut down
+        cache: Optional persistent result cache (True for the shared on-disk
+            cache, or a ResultCache); only comments not seen before are cleaned
         
     Returns:
         DataFrame with a new cleaned comments column
         
+    Notes:
+        Posts are sharded into contiguous chunks so each task carries many
+        comments, and results are stitched back in row order, so the parallel
+        result is identical to the serial one. Frames with fewer than
+        `PARALLEL_MIN_COMMENTS` comments are cleaned serially.
     """
+    posts = list(df[column])
+    count("clean.posts", len(posts))
+    count("clean.comments", sum(len(comments) for comments in posts))
+    namespace = get_cleaner(remove_stopwords, lowercase).cache_namespace
+    cache = resolve_cache(cache, namespace)
+
+    if cache is None:
+        cleaned = _clean_posts(posts, remove_stopwords, lowercase,
+                               n_jobs=n_jobs, executor=executor)
+    else:
+        cleaned = _clean_posts_cached(posts, cache, remove_stopwords, lowercase,
+                                      n_jobs=n_jobs, executor=executor)
+
     df = df.copy()
-    df[new_column] = df[column].apply(
-        lambda comments: clean_corpus(comments, remove_stopwords, lowercase)
-    )
+    df[new_column] = pd.Series(cleaned, index=df.index, dtype=object)
     return df
 
+
 # =============================================================================
 # EDA FUNCTIONS
 # =============================================================================
 
-def get_word_counts(comments, top_n=20):
+def iter_ngrams(comment, n=1):
+    """
+    Yield the n-grams of one comment as space-joined strings.
+
+    Args:
+        comment: A (cleaned) comment string
+        n: Size of the n-gram (1 = words, 2 = bigrams, ...)
+
+    Returns:
+        Iterator of n-gram strings, e.g. "school district" for n=2
+    """
+    return _ngrams_from_words(comment.split(), n)
+
+
+def _ngrams_from_words(words, n):
+    """Yield space-joined n-grams from an already split comment."""
+    if n == 1:
+        return iter(words)
+    return map(' '.join, zip(*(words[i:] for i in range(n))))
+
+
+class NgramCounter:
+    """
+    Streaming n-gram counter for an iterator of comments.
+
+    Comments are consumed one at a time, so memory only grows with the
+    number of distinct n-grams, never with the corpus size. Counters built
+    on separate shards (or in separate processes - they pickle) can be
+    combined with `merge`.
+
+    With `max_terms` set, the counter keeps a bounded Space-Saving summary
+    instead of exact counts: exact counts are collected for up to
+    `max_terms` new n-grams at a time and then folded into a summary of at
+    most `max_terms` n-grams. Every kept count is an upper bound, over by at
+    most `error(gram)` (itself at most `error_bound`), every n-gram occurring
+    more than `error_bound` times is kept, and `most_common` ranks by the
+    upper bound. Use it for top-N queries on corpora too large to count
+    exactly; a `max_terms` well above the N you need keeps the errors small.
+
+    Args:
+        n: Size of the n-gram (default: 1)
+        max_terms: Bound for the Space-Saving summary (default: None = exact)
+
+    Example:
+        >>> counter = NgramCounter(n=2)
+        >>> counter.update(["great school district", "school district funding"])
+        >>> counter.most_common(1)
+        [('school district', 2)]
+    """
+
+    def __init__(self, n=1, max_terms=None):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        if max_terms is not None and max_terms < 1:
+            raise ValueError("max_terms must be at least 1")
+        self.n = n
+        self.max_terms = max_terms
+        self.counts = Counter()  # exact counts, or the summary's upper bounds
+        self.errors = {}  # summary only: how far each upper bound may be over
+        self.total = 0
+        self.error_bound = 0  # upper bound for any n-gram not in the summary
+        self._pending = Counter()  # summary only: exact counts not folded in yet
+
+    def update(self, comments):
+        """
+        Count the n-grams of every comment in an iterable.
+
+        Args:
+            comments: Iterable of comment strings (list, Series, generator)
+
+        Returns:
+            self, so calls can be chained
+        """
+        n, limit = self.n, self.max_terms
+        counts = self._pending if limit else self.counts
+
+        for comment in comments:
+            words = comment.split()
+            counts.update(_ngrams_from_words(words, n))
+            self.total += max(0, len(words) - n + 1)
+            if limit and len(counts) > limit:
+                self._flush()
+                counts = self._pending
+        return self
+
+    def update_posts(self, posts):
+        """
+        Count n-grams for an iterable of posts, each a list of comments.
+
+        Args:
+            posts: Iterable of comment lists, e.g. df['cleaned_comments']
+
+        Returns:
+            self, so calls can be chained
+        """
+        return self.update(chain.from_iterable(posts))
+
+    def merge(self, other):
+        """
+        Fold another counter (e.g. from another shard or process) into this one.
+
+        Merging into or from a bounded counter gives a bounded counter.
+
+        Args:
+            other: NgramCounter with the same `n`
+
+        Returns:
+            self, so calls can be chained
+        """
+        if other.n != self.n:
+            raise ValueError(f"Cannot merge {other.n}-gram counts into {self.n}-gram counts")
+        self._flush()
+        other._flush()
+        self.total += other.total
+        if not self.max_terms and not other.max_terms:
+            self.counts.update(other.counts)
+            return self
+
+        self.max_terms = self.max_terms or other.max_terms
+        self._fold(other.counts, other.errors, other.error_bound)
+        return self
+
+    def _flush(self):
+        """Fold the pending exact counts into the summary."""
+        if self._pending:
+            pending, self._pending = self._pending, Counter()
+            self._fold(pending, {}, 0)
+
+    def _fold(self, counts, errors, floor):
+        """
+        Combine another summary into this one and keep the `max_terms` largest.
+
+        An n-gram missing from a summary may still have occurred up to that
+        summary's floor (`error_bound`) times, so it is counted at the floor
+        with an equal error. N-grams dropped here can have occurred at most
+        as often as the largest dropped upper bound, which becomes the new
+        floor.
+        """
+        own, own_errors, own_floor = self.counts, self.errors, self.error_bound
+        merged, merged_errors = {}, {}
+        for gram in own.keys() | counts.keys():
+            if gram in own:
+                upper, error = own[gram], own_errors.get(gram, 0)
+            else:
+                upper, error = own_floor, own_floor
+            if gram in counts:
+                upper, error = upper + counts[gram], error + errors.get(gram, 0)
+            else:
+                upper, error = upper + floor, error + floor
+            merged[gram] = upper
+            merged_errors[gram] = error
+
+        self.error_bound = own_floor + floor
+        if len(merged) > self.max_terms:
+            kept = heapq.nlargest(self.max_terms + 1, merged.items(), key=itemgetter(1))
+            self.error_bound = max(self.error_bound, kept.pop()[1])
+            merged = dict(kept)
+        self.counts = Counter(merged)
+        self.errors = {gram: merged_errors[gram] for gram in merged}
+
+    def error(self, gram):
+        """How far the count of `gram` may be over its true count (0 when exact)."""
+        self._flush()
+        if gram in self.counts:
+            return self.errors.get(gram, 0)
+        return self.error_bound
+
+    def most_common(self, top_n=20):
+        """
+        Return the `top_n` most frequent (n-gram, count) pairs.
+
+        With `max_terms`, counts are upper bounds; see `error`.
+        """
+        self._flush()
+        return self.counts.most_common(top_n)
+
+    def to_frame(self, top_n=20, column=None):
+        """
+        Return the top n-grams as a DataFrame.
+
+        Args:
+            top_n: How many n-grams to return (default: 20)
+            column: Name of the n-gram column (default: 'word', 'bigram'
+                or 'ngram' depending on `n`)
+
+        Returns:
+            DataFrame with columns: <column>, count (plus error, the
+            possible overcount of each upper bound, with `max_terms`)
+        """
+        if column is None:
+            column = {1: 'word', 2: 'bigram'}.get(self.n, 'ngram')
+        frame = pd.DataFrame(self.most_common(top_n), columns=[column, 'count'])
+        if self.max_terms:
+            frame['error'] = [self.error(gram) for gram in frame[column]]
+        return frame
+
+
+def count_ngrams(comments, n=1, max_terms=None):
+    """
+    Count n-grams over an iterable of comments in a single streaming pass.
+
+    Args:
+        comments: Iterable of comment strings
+        n: Size of the n-gram (default: 1)
+        max_terms: Bound memory with a Space-Saving summary (default: exact)
+
+    Returns:
+        NgramCounter
+    """
+    return NgramCounter(n=n, max_terms=max_terms).update(comments)
+
+
+def get_word_counts(comments, top_n=20, max_terms=None):
     """
     Get most common words from a list of comments.
     
     Args:
     ----------
-    comments : list of str
-        List of comment texts
+    comments : iterable of str
+        Comment texts (list, Series or generator; consumed once)
     top_n : int, default=20
         Number of top words to return
+    max_terms : int, optional
+        Bound memory with a Space-Saving summary instead of exact counts
+        (counts become upper bounds; an error column is added)
         
     Returns:
     -------
@@ -120,45 +565,22 @@ def get_word_counts(comments, top_n=20):
         DataFrame with columns: word, count
         
     """
-    # Combine all comments into one string
-    all_text = ' '.join(comments)
-    words = all_text.split()
-    
-    # Count words
-    word_freq = Counter(words)
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(word_freq.most_common(top_n), 
-                     columns=['word', 'count'])
-    return df
+    return count_ngrams(comments, n=1, max_terms=max_terms).to_frame(top_n, 'word')
 
-def get_bigram_counts(comments, top_n=20):
+def get_bigram_counts(comments, top_n=20, max_terms=None):
     """
     Get the most common two-word phrases.
     
     Args:
-        comments: List of cleaned comments
+        comments: Iterable of cleaned comments (consumed once)
         top_n: How many top phrases to return (default: 20)
+        max_terms: Bound memory with a Space-Saving summary (default: exact;
+            counts become upper bounds and an error column is added)
         
     Returns:
         DataFrame with columns: bigram, count
     """
-    bigram_list = []
-    
-    for comment in comments:
-        words = comment.split()
-        # Create bigrams
-        bigrams = [f"{words[i]} {words[i+1]}" 
-                  for i in range(len(words)-1)]
-        bigram_list.extend(bigrams)
-    
-    # Count bigrams
-    bigram_freq = Counter(bigram_list)
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(bigram_freq.most_common(top_n), 
-                     columns=['bigram', 'count'])
-    return df
+    return count_ngrams(comments, n=2, max_terms=max_terms).to_frame(top_n, 'bigram')
 
 def get_comment_lengths(comments):
     """
@@ -172,31 +594,178 @@ def get_comment_lengths(comments):
     """
     return [len(comment.split()) for comment in comments]
 
-def get_post_statistics(df, comments_col='cleaned_comments'):
+class TokenizedPosts:
+    """
+    Every comment of every post tokenised once into flat NumPy arrays.
+
+    Tokens are interned into integer IDs and stored back to back in
+    `token_ids`; offset arrays map comments to token ranges and posts to
+    comment ranges, so per-post metrics become vectorised reductions over
+    the flat arrays instead of repeated Python splits.
+
+    Attributes:
+        vocab: Dict mapping word -> token ID
+        token_ids: int32 array of every token, comment after comment
+        comment_offsets: int64 array (n_comments + 1); comment i spans
+            token_ids[comment_offsets[i]:comment_offsets[i + 1]]
+        post_offsets: int64 array (n_posts + 1); post j spans comments
+            post_offsets[j] to post_offsets[j + 1]
+    """
+
+    def __init__(self, vocab, token_ids, comment_offsets, post_offsets):
+        self.vocab = vocab
+        self.token_ids = token_ids
+        self.comment_offsets = comment_offsets
+        self.post_offsets = post_offsets
+        self._words = None
+
+    @classmethod
+    def from_words(cls, words, token_ids, comment_offsets, post_offsets):
+        """
+        Rebuild from an ID-ordered word list and existing arrays.
+
+        Used by token_corpus.load_token_corpus; the arrays may be
+        memory-mapped.
+        """
+        tokens = cls({w: i for i, w in enumerate(words)},
+                     token_ids, comment_offsets, post_offsets)
+        tokens._words = list(words)
+        return tokens
+
+    @classmethod
+    def from_posts(cls, posts):
+        """
+        Tokenise posts in a single pass.
+
+        Args:
+            posts: Iterable of comment lists, e.g. df['cleaned_comments']
+
+        Returns:
+            TokenizedPosts
+        """
+        vocab = {}
+        intern = vocab.setdefault
+        token_ids = array('i')
+        comment_offsets = array('q', [0])
+        post_offsets = array('q', [0])
+
+        with timer("tokenize.from_posts"):
+            for comments in posts:
+                for comment in comments:
+                    token_ids.extend([intern(w, len(vocab)) for w in comment.split()])
+                    comment_offsets.append(len(token_ids))
+                post_offsets.append(len(comment_offsets) - 1)
+        count("tokens", len(token_ids))
+
+        return cls(
+            vocab,
+            np.frombuffer(token_ids, dtype=np.int32),
+            np.frombuffer(comment_offsets, dtype=np.int64),
+            np.frombuffer(post_offsets, dtype=np.int64),
+        )
+
+    @property
+    def words(self):
+        """Words indexed by token ID (inverse of `vocab`)."""
+        if self._words is None or len(self._words) != len(self.vocab):
+            self._words = list(self.vocab)
+        return self._words
+
+    @property
+    def n_posts(self):
+        return len(self.post_offsets) - 1
+
+    @property
+    def comment_lengths(self):
+        """Number of tokens in each comment."""
+        return np.diff(self.comment_offsets)
+
+    @property
+    def comments_per_post(self):
+        """Number of comments in each post."""
+        return np.diff(self.post_offsets)
+
+    @property
+    def tokens_per_post(self):
+        """Number of tokens in each post."""
+        return np.diff(self.comment_offsets[self.post_offsets])
+
+    @property
+    def token_post(self):
+        """Post index of every token (same length as `token_ids`)."""
+        return np.repeat(np.arange(self.n_posts), self.tokens_per_post)
+
+
+# Registry of per-post metrics computed by `get_post_statistics`.
+# Each function takes a TokenizedPosts and returns one value per post.
+POST_METRICS = {}
+
+
+def register_post_metric(name):
+    """
+    Register a per-post metric for `get_post_statistics`.
+
+    The metric is computed from the shared TokenizedPosts, so adding one
+    does not cost another pass over the comment text.
+
+    Example:
+        >>> @register_post_metric('max_comment_length')
+        ... def max_comment_length(tokens):
+        ...     lengths = tokens.comment_lengths
+        ...     starts = tokens.post_offsets[:-1]
+        ...     return [lengths[a:b].max(initial=0)
+        ...             for a, b in zip(starts, tokens.post_offsets[1:])]
+    """
+    def decorator(func):
+        POST_METRICS[name] = func
+        return func
+    return decorator
+
+
+@register_post_metric('avg_comment_length')
+def _avg_comment_length(tokens):
+    n_comments = tokens.comments_per_post
+    totals = tokens.tokens_per_post
+    return np.divide(totals, n_comments, out=np.zeros(len(totals)),
+                     where=n_comments > 0)
+
+
+@register_post_metric('total_tokens')
+def _total_tokens(tokens):
+    return tokens.tokens_per_post
+
+
+@register_post_metric('unique_words')
+def _unique_words(tokens):
+    # one key per (post, token) pair; the distinct keys per post are its
+    # unique words
+    keys = tokens.token_post.astype(np.int64) * len(tokens.vocab) + tokens.token_ids
+    unique_posts = np.unique(keys) // max(1, len(tokens.vocab))
+    return np.bincount(unique_posts, minlength=tokens.n_posts)
+
+
+def get_post_statistics(df, comments_col='cleaned_comments', metrics=None,
+                        tokens=None):
     """
     Add statistics columns for each post's comments.
     
     Args:
         df: DataFrame with your posts
         comments_col: Column with cleaned comments (default: 'cleaned_comments')
+        metrics: Names of registered metrics to compute
+            (default: every metric in POST_METRICS)
+        tokens: Existing TokenizedPosts for `df` (e.g. a memory-mapped
+            corpus from token_corpus.py); built from `comments_col` if None
         
     Returns:
-        DataFrame with new columns: avg_comment_length, total_tokens, unique_words
+        DataFrame with new columns: avg_comment_length, total_tokens,
+        unique_words (plus any other registered metrics)
     """
     df = df.copy()
-    
-    # Calculate statistics for each post
-    df['avg_comment_length'] = df[comments_col].apply(
-        lambda comments: np.mean(get_comment_lengths(comments)) if comments else 0
-    )
-    
-    df['total_tokens'] = df[comments_col].apply(
-        lambda comments: sum(get_comment_lengths(comments))
-    )
-    
-    df['unique_words'] = df[comments_col].apply(
-        lambda comments: len(set(' '.join(comments).split()))
-    )
-    
-    return df
+    if tokens is None:
+        tokens = TokenizedPosts.from_posts(df[comments_col])
 
+    for name in (metrics or list(POST_METRICS)):
+        df[name] = np.asarray(POST_METRICS[name](tokens))
+
+    return df
@@ -0,0 +1,354 @@
+"""Memory-Mapped Token Corpus
+====================================================
+
+Persists a `TokenizedPosts` (every comment tokenised once into integer IDs)
+beside its dataset, so later notebooks and the app open the token arrays
+with `numpy.load(mmap_mode='r')` instead of re-splitting the comment text.
+Several districts can be open at once without copying their arrays into
+each process - the OS page cache is shared.
+
+Layout of `<dataset stem>.<column>.tokens/`:
+
+- ``vocab.txt`` - one word per line, line number = token ID
+- ``token_ids.npy`` / ``comment_offsets.npy`` / ``post_offsets.npy``
+- ``meta.json`` - source dataset size/mtime, used to detect stale corpora
+
+Adapters compute the EDA tables (`word_counts`, `bigram_counts`,
+`post_statistics`) and a CountVectorizer-style document-term matrix
+(`document_term_matrix`) straight from the token IDs.
+
+Usage:
+    >>> tokens = token_corpus_for(df, dataset_path)   # load or build + save
+    >>> word_counts(tokens, top_n=10)
+    >>> dtm, feature_names = document_term_matrix(tokens, min_df=2, max_df=0.9,
+    ...                                           stop_words="english")
+
+Author: ADS 509 Team"""
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from text_processing import TokenizedPosts, get_post_statistics
+
+CORPUS_SUFFIX = ".tokens"
+
+# Bump when the on-disk layout changes; older corpora are rebuilt
+CORPUS_VERSION = 1
+
+_ARRAYS = ("token_ids", "comment_offsets", "post_offsets")
+
+# CountVectorizer's default token_pattern
+_VECTORIZER_TOKEN = re.compile(r"(?u)\b\w\w+\b")
+
+
+# =============================================================================
+# PERSISTENCE
+# =============================================================================
+
+def corpus_path(dataset_path, column='cleaned_comments'):
+    """
+    Folder holding the token corpus of one dataset column.
+
+    Args:
+        dataset_path: Dataset file or stem (suffix is ignored)
+        column: Tokenised comment column (default: 'cleaned_comments')
+
+    Returns:
+        Path such as datasets/Palo_Alto_cleaned_reddit.cleaned_comments.tokens
+    """
+    path = Path(dataset_path)
+    if path.suffix in (".parquet", ".pkl"):
+        path = path.with_suffix("")
+    return path.with_name(f"{path.name}.{column}{CORPUS_SUFFIX}")
+
+
+def _source_signature(dataset_path):
+    """Size and mtime of the dataset file, or None for a bare stem."""
+    path = Path(dataset_path)
+    if not path.is_file():
+        return None
+    stat = path.stat()
+    return {"name": path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def save_token_corpus(tokens, folder, source=None):
+    """
+    Write a TokenizedPosts as .npy arrays plus a vocabulary file.
+
+    Args:
+        tokens: TokenizedPosts to store
+        folder: Target folder (see `corpus_path`), created if missing
+        source: Dataset file the tokens were built from; its size/mtime are
+            recorded so `load_token_corpus` can tell when it changed
+
+    Returns:
+        Path of the folder
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    for name in _ARRAYS:
+        np.save(folder / f"{name}.npy", np.ascontiguousarray(getattr(tokens, name)))
+    (folder / "vocab.txt").write_text("\n".join(tokens.words), encoding="utf-8")
+
+    # meta.json is written last: a corpus without it is never loaded
+    meta = {
+        "version": CORPUS_VERSION,
+        "n_posts": int(tokens.n_posts),
+        "n_tokens": int(len(tokens.token_ids)),
+        "vocab_size": len(tokens.vocab),
+        "source": _source_signature(source) if source is not None else None,
+    }
+    (folder / "meta.json").write_text(json.dumps(meta, indent=2))
+    return folder
+
+
+def load_token_corpus(folder, source=None, mmap_mode='r'):
+    """
+    Open a stored token corpus.
+
+    Args:
+        folder: Corpus folder written by `save_token_corpus`
+        source: Dataset file the corpus should match; when given and the
+            file changed since the corpus was saved, None is returned
+        mmap_mode: Passed to `numpy.load` (default: 'r', read-only
+            memory map; None reads the arrays into memory)
+
+    Returns:
+        TokenizedPosts backed by the stored arrays, or None when the corpus
+        is missing, from an older layout or stale
+    """
+    folder = Path(folder)
+    meta_path = folder / "meta.json"
+    if not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text())
+    if meta.get("version") != CORPUS_VERSION:
+        return None
+    if source is not None and meta.get("source") != _source_signature(source):
+        return None
+
+    words = (folder / "vocab.txt").read_text(encoding="utf-8").split("\n")
+    if not meta["vocab_size"]:
+        words = []
+    arrays = {name: np.load(folder / f"{name}.npy", mmap_mode=mmap_mode)
+              for name in _ARRAYS}
+    return TokenizedPosts.from_words(words, **arrays)
+
+
+def token_corpus_for(df, dataset_path, column='cleaned_comments', save=True):
+    """
+    Return the token corpus of a dataset, building it only when needed.
+
+    Loads `corpus_path(dataset_path, column)` when it matches the dataset
+    file; otherwise tokenises `df[column]` once and (with `save=True`)
+    stores the result for the next caller.
+
+    Args:
+        df: The dataset frame, loaded from `dataset_path` (all posts, in file
+            order - column projection is fine, row filters are not)
+        dataset_path: Dataset file the frame was loaded from
+        column: Comment column to tokenise (default: 'cleaned_comments')
+        save: Persist a freshly built corpus (default: True)
+
+    Returns:
+        TokenizedPosts
+    """
+    folder = corpus_path(dataset_path, column)
+    tokens = load_token_corpus(folder, source=dataset_path)
+    if tokens is not None and tokens.n_posts == len(df):
+        return tokens
+
+    tokens = TokenizedPosts.from_posts(df[column])
+    if save:
+        save_token_corpus(tokens, folder, source=dataset_path)
+    return tokens
+
+
+# =============================================================================
+# EDA ADAPTERS
+# =============================================================================
+
+def _top_counts(keys, top_n):
+    """
+    Most common keys with Counter.most_common ordering.
+
+    Ties keep first-occurrence order, exactly like counting the tokens one by
+    one into a Counter.
+    """
+    if len(keys) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))[:top_n]
+    return unique[order], counts[order]
+
+
+def word_counts(tokens, top_n=20):
+    """
+    Most common words, computed from token IDs.
+
+    Same result as `get_word_counts` over the tokenised comments.
+
+    Returns:
+        DataFrame with columns: word, count
+    """
+    ids, counts = _top_counts(tokens.token_ids, top_n)
+    words = tokens.words
+    return pd.DataFrame({"word": [words[i] for i in ids], "count": counts})
+
+
+def bigram_counts(tokens, top_n=20):
+    """
+    Most common two-word phrases, computed from token IDs.
+
+    Pairs never span two comments; same result as `get_bigram_counts`.
+
+    Returns:
+        DataFrame with columns: bigram, count
+    """
+    ids = np.asarray(tokens.token_ids, dtype=np.int64)
+    if len(ids) < 2:
+        return pd.DataFrame({"bigram": [], "count": []})
+
+    # a pair (i, i + 1) is valid unless token i + 1 starts a new comment
+    valid = np.ones(len(ids) - 1, dtype=bool)
+    starts = np.asarray(tokens.comment_offsets[1:-1])
+    starts = starts[(starts > 0) & (starts < len(ids))]
+    valid[starts - 1] = False
+
+    vocab_size = max(1, len(tokens.vocab))
+    keys = ids[:-1][valid] * vocab_size + ids[1:][valid]
+    keys, counts = _top_counts(keys, top_n)
+
+    words = tokens.words
+    bigrams = [f"{words[k // vocab_size]} {words[k % vocab_size]}" for k in keys]
+    return pd.DataFrame({"bigram": bigrams, "count": counts})
+
+
+def post_statistics(df, tokens, metrics=None):
+    """
+    `get_post_statistics` using an existing token corpus.
+
+    Args:
+        df: DataFrame the corpus was built from (same posts, same order)
+        tokens: TokenizedPosts
+        metrics: Names of registered metrics (default: all)
+    """
+    return get_post_statistics(df, metrics=metrics, tokens=tokens)
+
+
+# =============================================================================
+# TOPIC MODELLING ADAPTER
+# =============================================================================
+
+def _doc_count_limit(value, n_docs):
+    """CountVectorizer semantics: float = proportion, int = absolute count."""
+    return value if isinstance(value, (int, np.integer)) else value * n_docs
+
+
+def _vectorizer_terms(words):
+    """
+    Map corpus words onto CountVectorizer's default tokens.
+
+    Returns:
+        Tuple (sparse matrix words x terms holding how often each term occurs
+        in each word, NumPy array of the terms)
+    """
+    term_ids = {}
+    rows, cols = [], []
+    for word_id, word in enumerate(words):
+        for term in _VECTORIZER_TOKEN.findall(word.lower()):
+            rows.append(word_id)
+            cols.append(term_ids.setdefault(term, len(term_ids)))
+
+    mapping = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+        shape=(len(words), len(term_ids)),
+    )
+    return mapping, np.array(list(term_ids), dtype=object)
+
+
+def document_term_matrix(tokens, rows=None, min_df=1, max_df=1.0, stop_words=None,
+                         vocabulary=None):
+    """
+    Bag-of-words matrix of the posts, built from token IDs.
+
+    Gives the same matrix and features as
+    `CountVectorizer(min_df=..., max_df=..., stop_words=...)` on the joined
+    post text (`" ".join(comments)`) without re-tokenising the text: each
+    vocabulary word is mapped once onto the vectorizer's tokens and the
+    per-post word counts are multiplied through that mapping.
+
+    Args:
+        tokens: TokenizedPosts
+        rows: Optional boolean mask or index array selecting posts (e.g.
+            `tokens.tokens_per_post > 0` to skip empty posts)
+        min_df: Ignore terms in fewer documents (int) / a smaller share of
+            documents (float)
+        max_df: Ignore terms in more documents (int) / a larger share (float)
+        stop_words: None, "english" or a collection of words to drop
+        vocabulary: Fixed, ordered feature names (like CountVectorizer's
+            `vocabulary=`); when given, min_df/max_df/stop_words are not
+            applied and terms outside it are ignored
+
+    Returns:
+        Tuple (scipy.sparse.csr_matrix of shape (n_docs, n_features),
+        NumPy array of feature names, sorted like `get_feature_names_out`
+        unless `vocabulary` is given)
+
+    Raises:
+        ValueError: Like CountVectorizer, when no term is left, or when
+            max_df amounts to fewer documents than min_df
+    """
+    counts = sparse.csr_matrix(
+        (np.ones(len(tokens.token_ids), dtype=np.int64),
+         (tokens.token_post, np.asarray(tokens.token_ids))),
+        shape=(tokens.n_posts, len(tokens.vocab)),
+    )
+    if rows is not None:
+        counts = counts[rows]
+
+    mapping, terms = _vectorizer_terms(tokens.words)
+    dtm = (counts @ mapping).tocsr()
+    dtm.sum_duplicates()
+    dtm.eliminate_zeros()
+
+    if vocabulary is not None:
+        vocabulary = np.asarray(vocabulary, dtype=object)
+        term_ids = {t: i for i, t in enumerate(terms)}
+        found = [(term_ids[t], pos) for pos, t in enumerate(vocabulary) if t in term_ids]
+        src, dst = zip(*found) if found else ((), ())
+        select = sparse.csr_matrix(
+            (np.ones(len(src), dtype=np.int64), (src, dst)),
+            shape=(len(terms), len(vocabulary)),
+        )
+        return (dtm @ select).tocsr(), vocabulary
+
+    if stop_words == "english":
+        stop_words = ENGLISH_STOP_WORDS
+    stop_words = frozenset(stop_words or ())
+    keep = np.fromiter((t not in stop_words for t in terms), dtype=bool,
+                       count=len(terms))
+
+    n_docs = dtm.shape[0]
+    doc_freq = np.bincount(dtm.indices, minlength=len(terms))
+    # same checks and messages as CountVectorizer.fit
+    if not (keep & (doc_freq > 0)).any():
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    min_count = _doc_count_limit(min_df, n_docs)
+    max_count = _doc_count_limit(max_df, n_docs)
+    if max_count < min_count:
+        raise ValueError("max_df corresponds to < documents than min_df")
+    keep &= (doc_freq >= min_count) & (doc_freq <= max_count)
+    if not keep.any():
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+    features = np.flatnonzero(keep)
+    features = features[np.argsort(terms[features].astype(str), kind="stable")]
+    return dtm[:, features].tocsr(), terms[features]
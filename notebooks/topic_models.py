@@ -0,0 +1,909 @@
+"""Topic Modeling Helpers
+====================================================
+
+Document-term matrices (DTMs) for LDA and NMF, built once per corpus and
+vectorizer settings and cached on disk, so the single-district run, the
+district comparison and later notebook runs all reuse the same sparse
+matrix instead of re-fitting a `CountVectorizer` each time.
+
+- `build_dtm` - CSR count matrix + vocabulary from a token corpus
+  (`token_corpus.py`) or plain document texts; cached under
+  .cache/dtm/ keyed by a hash of the documents and vectorizer parameters
+- `DocumentTermMatrix.tfidf` - TF-IDF weighting of the same counts (the
+  `TfidfVectorizer` input NMF expects), without re-tokenising
+- `DocumentTermMatrix.append` - add new documents against the fitted
+  vocabulary, no vocabulary refit
+- `sweep_topic_models` - fit LDA/NMF over a grid of topic counts and
+  priors on a process pool, prune poor configurations after a short first
+  round and save the best model to models/
+- `OnlineTopicModel` - LDA updated with `partial_fit` on new posts only,
+  with per-update topic drift; its JSON summary feeds the app's Topics page
+
+Usage:
+    >>> dtm = build_dtm(tokens, rows=tokens.tokens_per_post > 0,
+    ...                 min_df=2, max_df=0.9, stop_words="english", cache=True)
+    >>> LatentDirichletAllocation(n_components=5).fit(dtm.counts)
+    >>> NMF(n_components=5).fit(dtm.tfidf())
+    >>> results, best = sweep_topic_models(dtm, topic_grid(), save_as="palo_alto")
+
+    $ python notebooks/topic_models.py update "Palo Alto" "Oklahoma City"
+
+Author: ADS 509 Team"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import product
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import NMF, LatentDirichletAllocation
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from threadpoolctl import threadpool_limits
+
+from text_processing import PROJECT_ROOT, TokenizedPosts, clean_dataframe_column
+from token_corpus import document_term_matrix
+
+# text_processing puts the project root on sys.path
+from instrumentation import count, timer  # noqa: E402
+from parallel import resolve_n_jobs  # noqa: E402
+from result_cache import CACHE_DIR  # noqa: E402
+
+# =============================================================================
+# DOCUMENT-TERM MATRIX CACHE
+# =============================================================================
+
+# Where cached DTMs are written (one .npz + .json pair per entry)
+DTM_CACHE_DIR = CACHE_DIR / "dtm"
+
+# Least-recently-used entries beyond this count are deleted
+DTM_CACHE_MAX_ENTRIES = 32
+
+# Bump when the DTM construction changes; older entries are never served
+DTM_VERSION = 1
+
+
+def _hash_docs(docs):
+    """Content hash of a token corpus or a sequence of document texts."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(docs, TokenizedPosts):
+        digest.update(b"tokens\0")
+        for name in ("token_ids", "comment_offsets", "post_offsets"):
+            digest.update(np.ascontiguousarray(getattr(docs, name)).tobytes())
+        digest.update("\n".join(docs.words).encode("utf-8", "surrogatepass"))
+    else:
+        digest.update(b"texts\0")
+        for text in docs:
+            digest.update(str(text).encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _hash_rows(rows):
+    """Hash of a row selection (boolean mask or index array), or None."""
+    if rows is None:
+        return None
+    rows = np.asarray(rows)
+    if rows.dtype == bool:
+        rows = np.flatnonzero(rows)
+    return hashlib.blake2b(rows.astype(np.int64).tobytes(), digest_size=16).hexdigest()
+
+
+def _vectorizer_params(min_df, max_df, stop_words):
+    """JSON-friendly vectorizer parameters, part of every cache key."""
+    if stop_words is not None and not isinstance(stop_words, str):
+        stop_words = sorted(stop_words)
+    return {"min_df": min_df, "max_df": max_df, "stop_words": stop_words}
+
+
+def _make_key(*parts):
+    data = json.dumps([DTM_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+class DocumentTermMatrix:
+    """
+    Sparse bag-of-words counts with their vocabulary.
+
+    Args:
+        counts: scipy.sparse CSR matrix (n_docs, n_features) of term counts
+        feature_names: Array of terms, one per column
+        params: Vectorizer parameters the matrix was built with
+        key: Cache key (None for matrices that were never cached)
+
+    Attributes:
+        counts: The count matrix (input for LatentDirichletAllocation)
+        feature_names: Terms in column order, like `get_feature_names_out()`
+    """
+
+    def __init__(self, counts, feature_names, params, key=None):
+        self.counts = sparse.csr_matrix(counts)
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self.params = params
+        self.key = key
+        self._tfidf = {}
+
+    @property
+    def shape(self):
+        return self.counts.shape
+
+    @property
+    def vocabulary(self):
+        """Dict mapping term -> column index."""
+        return {term: i for i, term in enumerate(self.feature_names)}
+
+    def tfidf(self, norm="l2", use_idf=True, smooth_idf=True, sublinear_tf=False):
+        """
+        TF-IDF weighted copy of the counts (input for NMF).
+
+        Same values as a `TfidfVectorizer` with the same vectorizer
+        parameters; computed once per setting and kept on the object.
+        """
+        setting = (norm, use_idf, smooth_idf, sublinear_tf)
+        if setting not in self._tfidf:
+            transformer = TfidfTransformer(norm=norm, use_idf=use_idf,
+                                           smooth_idf=smooth_idf,
+                                           sublinear_tf=sublinear_tf)
+            self._tfidf[setting] = transformer.fit_transform(self.counts)
+        return self._tfidf[setting]
+
+    def transform(self, docs, rows=None):
+        """
+        Count matrix of new documents over this vocabulary.
+
+        Terms outside the vocabulary are ignored, as with a fitted
+        `CountVectorizer.transform`.
+
+        Args:
+            docs: TokenizedPosts or a sequence of document texts
+            rows: Optional selection of posts/documents
+        """
+        if isinstance(docs, TokenizedPosts):
+            counts, _ = document_term_matrix(docs, rows=rows,
+                                             vocabulary=self.feature_names)
+            return counts
+
+        texts = np.asarray(list(docs), dtype=object)
+        if rows is not None:
+            texts = texts[rows]
+        vectorizer = CountVectorizer(vocabulary=list(self.feature_names))
+        return vectorizer.transform(texts).astype(np.int64)
+
+    def append(self, docs, rows=None, cache=None):
+        """
+        Add documents as new rows, keeping the vocabulary fixed.
+
+        min_df/max_df are not re-evaluated, so the columns stay comparable
+        with models already fitted on this matrix.
+
+        Args:
+            docs: TokenizedPosts or a sequence of document texts
+            rows: Optional selection of posts/documents
+            cache: Optional DTM cache (True for the shared one, see
+                `build_dtm`); appending the same documents again is a hit
+
+        Returns:
+            New DocumentTermMatrix
+        """
+        if not isinstance(docs, TokenizedPosts):
+            docs = list(docs)
+        cache = resolve_dtm_cache(cache)
+        key = None
+        if self.key is not None:
+            key = _make_key("append", self.key, _hash_docs(docs), _hash_rows(rows))
+            if cache is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+
+        counts = sparse.vstack([self.counts, self.transform(docs, rows=rows)], format="csr")
+        dtm = DocumentTermMatrix(counts, self.feature_names, self.params, key=key)
+        if cache is not None and key is not None:
+            cache.put(dtm)
+        return dtm
+
+
+class DTMCache:
+    """
+    Folder of cached DocumentTermMatrix objects with LRU eviction.
+
+    Each entry is `<key>.npz` (the CSR counts) plus `<key>.json`
+    (vocabulary and parameters); the JSON file is written last, so a
+    half-written entry is never loaded.
+
+    Args:
+        folder: Cache folder (default: .cache/dtm in the project)
+        max_entries: Keep at most this many entries
+
+    Attributes:
+        hits: Number of lookups served from disk
+        misses: Number of lookups that had to be built
+    """
+
+    def __init__(self, folder=None, max_entries=DTM_CACHE_MAX_ENTRIES):
+        self.folder = Path(folder or DTM_CACHE_DIR)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        return self.folder / f"{key}.npz", self.folder / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached matrix for `key`, or None."""
+        matrix_path, meta_path = self._paths(key)
+        with self._lock:
+            if not meta_path.exists():
+                self.misses += 1
+                return None
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            counts = sparse.load_npz(matrix_path)
+            os.utime(meta_path)  # mark as recently used
+            self.hits += 1
+        return DocumentTermMatrix(counts, meta["feature_names"], meta["params"], key=key)
+
+    def put(self, dtm):
+        """Store a matrix under its key and evict old entries."""
+        matrix_path, meta_path = self._paths(dtm.key)
+        meta = {"params": dtm.params, "shape": list(dtm.shape),
+                "feature_names": [str(t) for t in dtm.feature_names]}
+        with self._lock:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            tmp = matrix_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                sparse.save_npz(f, dtm.counts)
+            tmp.replace(matrix_path)
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self.folder.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for meta_path in entries[:max(0, len(entries) - self.max_entries)]:
+            meta_path.unlink(missing_ok=True)
+            meta_path.with_suffix(".npz").unlink(missing_ok=True)
+
+    def stats(self):
+        """Return hit/miss counters and the number of stored entries."""
+        entries = len(list(self.folder.glob("*.json"))) if self.folder.exists() else 0
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def clear(self):
+        """Delete every cached matrix."""
+        with self._lock:
+            shutil.rmtree(self.folder, ignore_errors=True)
+
+
+@lru_cache(maxsize=None)
+def get_dtm_cache():
+    """Return the process-wide DTM cache in the default folder."""
+    return DTMCache()
+
+
+def resolve_dtm_cache(cache):
+    """Normalise a `cache=` argument: None/False, True or a DTMCache."""
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return get_dtm_cache()
+    return cache
+
+
+@timer("vectorise.build_dtm")
+def build_dtm(docs, rows=None, min_df=1, max_df=1.0, stop_words=None, cache=None):
+    """
+    Build (or load) the document-term matrix of a corpus.
+
+    Args:
+        docs: TokenizedPosts (one document per post, see token_corpus.py)
+            or a sequence of document texts
+        rows: Optional boolean mask or index array selecting documents
+        min_df, max_df, stop_words: As for `CountVectorizer`
+        cache: Optional DTM cache - True for the shared one under
+            .cache/dtm, or a DTMCache; the key covers the document content,
+            `rows` and the vectorizer parameters, so any change rebuilds
+
+    Returns:
+        DocumentTermMatrix (use `.counts` for LDA, `.tfidf()` for NMF)
+    """
+    if not isinstance(docs, TokenizedPosts):
+        docs = list(docs)
+
+    params = _vectorizer_params(min_df, max_df, stop_words)
+    key = _make_key(_hash_docs(docs), _hash_rows(rows), params)
+
+    cache = resolve_dtm_cache(cache)
+    if cache is not None:
+        cached = cache.get(key)
+        count("cache.dtm.hits" if cached is not None else "cache.dtm.misses")
+        if cached is not None:
+            return cached
+
+    if isinstance(docs, TokenizedPosts):
+        counts, feature_names = document_term_matrix(
+            docs, rows=rows, min_df=min_df, max_df=max_df, stop_words=stop_words
+        )
+    else:
+        texts = np.asarray(docs, dtype=object)
+        if rows is not None:
+            texts = texts[rows]
+        vectorizer = CountVectorizer(min_df=min_df, max_df=max_df,
+                                     stop_words=params["stop_words"])
+        counts = vectorizer.fit_transform(texts).astype(np.int64)
+        feature_names = vectorizer.get_feature_names_out()
+
+    dtm = DocumentTermMatrix(counts, feature_names, params, key=key)
+    if cache is not None:
+        cache.put(dtm)
+    return dtm
+
+
+# =============================================================================
+# TOPIC-COUNT / HYPERPARAMETER SWEEP
+# =============================================================================
+
+TOPIC_MODELS = {"lda": LatentDirichletAllocation, "nmf": NMF}
+
+# Settings shared by every configuration of a model; a config overrides them
+MODEL_DEFAULTS = {
+    "lda": {"learning_method": "batch", "max_iter": 10, "random_state": 42},
+    "nmf": {"init": "nndsvda", "max_iter": 200, "random_state": 42},
+}
+
+# Direction of each metric: +1 = higher is better, -1 = lower is better
+SWEEP_METRICS = {"coherence": 1, "perplexity": -1, "reconstruction_err": -1}
+
+# Where `sweep_topic_models(save_as=...)` writes the best model
+MODELS_DIR = PROJECT_ROOT / "models"
+
+# Data of the running sweep, set once per worker process
+_SWEEP_DATA = {}
+
+
+def topic_grid(models=("lda", "nmf"), n_topics=(3, 5, 8, 10, 15),
+               doc_topic_priors=(None,), topic_word_priors=(None,),
+               nmf_alphas=(0.0,)):
+    """
+    Every combination of topic count and prior to try.
+
+    Args:
+        models: Model names from TOPIC_MODELS
+        n_topics: Topic counts
+        doc_topic_priors: LDA `doc_topic_prior` values (None = 1 / k)
+        topic_word_priors: LDA `topic_word_prior` values (None = 1 / k)
+        nmf_alphas: NMF `alpha_W` regularisation values
+
+    Returns:
+        List of config dicts, e.g. {"model": "lda", "n_components": 5,
+        "doc_topic_prior": None, "topic_word_prior": None}
+    """
+    configs = []
+    for name in models:
+        if name == "lda":
+            grid = product(n_topics, doc_topic_priors, topic_word_priors)
+            configs += [{"model": "lda", "n_components": k, "doc_topic_prior": a,
+                         "topic_word_prior": b} for k, a, b in grid]
+        elif name == "nmf":
+            configs += [{"model": "nmf", "n_components": k, "alpha_W": a}
+                        for k, a in product(n_topics, nmf_alphas)]
+        else:
+            raise ValueError(f"Unknown topic model: {name!r} (use one of {list(TOPIC_MODELS)})")
+    return configs
+
+
+def umass_coherence(components, counts, top_n=10):
+    """
+    Mean UMass coherence of the topics' top words.
+
+    For each topic, sums log((D(w_i, w_j) + 1) / D(w_j)) over pairs of its
+    `top_n` words, where D counts documents containing the words. Values
+    are negative; closer to zero means more coherent topics.
+
+    Args:
+        components: Topic-word weights (model.components_)
+        counts: Document-term count matrix the model was fitted on
+        top_n: Words per topic (default: 10)
+    """
+    present = sparse.csc_matrix(counts, dtype=np.float64, copy=True)
+    present.data[:] = 1.0
+    doc_freq = np.maximum(np.asarray(present.sum(axis=0)).ravel(), 1.0)
+
+    scores = []
+    for topic in components:
+        top = np.argsort(topic)[::-1][:top_n]
+        cols = present[:, top]
+        co_docs = (cols.T @ cols).toarray()
+        later, earlier = np.tril_indices(len(top), -1)
+        scores.append(np.log((co_docs[later, earlier] + 1) / doc_freq[top[earlier]]).sum())
+    return float(np.mean(scores))
+
+
+def _init_sweep_worker(train, heldout, single_thread=False):
+    """Pool initializer: receive the shared matrices once per process."""
+    if single_thread:
+        # one BLAS thread per worker, or n_jobs processes oversubscribe cores
+        threadpool_limits(limits=1)
+    _SWEEP_DATA.clear()
+    _SWEEP_DATA.update(train=train, heldout=heldout)
+
+
+def _sweep_tfidf():
+    if "tfidf" not in _SWEEP_DATA:
+        _SWEEP_DATA["tfidf"] = TfidfTransformer().fit_transform(_SWEEP_DATA["train"])
+    return _SWEEP_DATA["tfidf"]
+
+
+def _fit_config(config, budget, keep_model):
+    """Worker task: fit one configuration and score it."""
+    name = config["model"]
+    params = {**MODEL_DEFAULTS[name],
+              **{k: v for k, v in config.items() if k != "model" and v is not None}}
+    params["max_iter"] = max(1, round(params["max_iter"] * budget))
+
+    train, heldout = _SWEEP_DATA["train"], _SWEEP_DATA["heldout"]
+    X = train if name == "lda" else _sweep_tfidf()
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # short early rounds stop before convergence on purpose
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model = TOPIC_MODELS[name](**params).fit(X)
+    result = {"max_iter": params["max_iter"],
+              "fit_seconds": time.perf_counter() - start,
+              "coherence": umass_coherence(model.components_, train)}
+
+    if name == "lda":
+        result["perplexity"] = model.perplexity(heldout if heldout.shape[0] else train)
+    else:
+        result["reconstruction_err"] = model.reconstruction_err_
+    result["model"] = model if keep_model else None
+    return result
+
+
+def _split_rows(n_docs, holdout, random_state):
+    """Shuffle document indices into (train, heldout)."""
+    order = np.random.default_rng(random_state).permutation(n_docs)
+    n_heldout = int(round(holdout * n_docs))
+    if n_docs - n_heldout < 2:
+        n_heldout = 0
+    return np.sort(order[n_heldout:]), np.sort(order[:n_heldout])
+
+
+def _metric_rank(result, metric):
+    """Sort key (higher = better); configs without the metric rank last."""
+    value = result.get(metric)
+    if value is None or not np.isfinite(value):
+        return -np.inf
+    return SWEEP_METRICS[metric] * value
+
+
+def sweep_topic_models(dtm, configs, n_jobs=-1, budgets=(0.3, 1.0), keep=0.5,
+                       metric="coherence", holdout=0.1, random_state=42,
+                       save_as=None):
+    """
+    Fit many LDA/NMF configurations in parallel and keep the best.
+
+    Runs successive rounds: every configuration is first fitted with a
+    fraction of its iterations (`budgets[0]` x max_iter); only the best
+    `keep` share by `metric` goes on to the next, larger budget, so poor
+    configurations are terminated early. The matrices are sent to each
+    worker process once (pool initializer), not once per configuration.
+
+    LDA perplexity is measured on a held-out share of the documents; UMass
+    coherence (both models) and NMF reconstruction error on the rest.
+
+    Args:
+        dtm: DocumentTermMatrix (from `build_dtm`) or a sparse count matrix
+        configs: Configurations from `topic_grid`
+        n_jobs: Worker processes (default: -1 = all cores; 1 = serial)
+        budgets: Increasing fractions of max_iter, one per round; the last
+            should be 1.0
+        keep: Share of configurations kept after each non-final round
+        metric: "coherence" (default), "perplexity" (LDA only) or
+            "reconstruction_err" (NMF only) - used for pruning and for
+            picking the best model
+        holdout: Share of documents held out for perplexity (default: 0.1)
+        random_state: Seed of the held-out split
+        save_as: Optional file name or path; the best model is saved there
+            with `save_topic_model` (bare names go to MODELS_DIR)
+
+    Returns:
+        Tuple (DataFrame with one row per config and round: parameters,
+        metrics, fit_seconds and `pruned`; dict describing the best model
+        with keys model, config, metrics and feature_names)
+    """
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown metric: {metric!r} (use one of {list(SWEEP_METRICS)})")
+    if not configs:
+        raise ValueError("No configurations to sweep")
+
+    counts = sparse.csr_matrix(dtm.counts if isinstance(dtm, DocumentTermMatrix) else dtm)
+    train_rows, heldout_rows = _split_rows(counts.shape[0], holdout, random_state)
+    shared = (counts[train_rows], counts[heldout_rows])
+
+    n_workers = min(resolve_n_jobs(n_jobs), len(configs))
+    pool = None
+    if n_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_sweep_worker,
+                                   initargs=(*shared, True))
+    else:
+        _init_sweep_worker(*shared)
+
+    records = []
+    alive = list(range(len(configs)))
+    try:
+        for round_idx, budget in enumerate(budgets):
+            final = round_idx == len(budgets) - 1
+            tasks = [(configs[i], budget, final) for i in alive]
+            if pool is None:
+                results = [_fit_config(*task) for task in tasks]
+            else:
+                results = list(pool.map(_fit_config, *zip(*tasks)))
+            results = dict(zip(alive, results))
+
+            survivors = alive
+            if not final:
+                ranked = sorted(alive, key=lambda i: _metric_rank(results[i], metric),
+                                reverse=True)
+                survivors = ranked[:max(1, math.ceil(len(alive) * keep))]
+
+            for i in alive:
+                metrics = {k: v for k, v in results[i].items() if k != "model"}
+                records.append({**configs[i], "round": round_idx, "budget": budget,
+                                **metrics, "pruned": i not in survivors})
+            alive = survivors
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _SWEEP_DATA.clear()
+
+    best_idx = max(alive, key=lambda i: _metric_rank(results[i], metric))
+    best = {
+        "model": results[best_idx]["model"],
+        "config": configs[best_idx],
+        "metrics": {k: v for k, v in results[best_idx].items() if k != "model"},
+        "feature_names": (dtm.feature_names if isinstance(dtm, DocumentTermMatrix)
+                          else None),
+        "n_docs": len(train_rows),
+    }
+    if save_as is not None:
+        best["path"] = save_topic_model(best, save_as)
+    return pd.DataFrame(records), best
+
+
+def _model_path(path):
+    """Resolve a model name or path: bare names live in MODELS_DIR."""
+    path = Path(path)
+    if path.parent == Path("."):
+        path = MODELS_DIR / path
+    if not path.suffix:
+        path = path.with_suffix(".joblib")
+    return path
+
+
+def save_topic_model(best, path):
+    """
+    Persist a fitted topic model with its vocabulary and sweep metrics.
+
+    Args:
+        best: Dict as returned by `sweep_topic_models` (model, config,
+            metrics, feature_names, n_docs)
+        path: Target file; a bare name is placed in MODELS_DIR and gets a
+            .joblib suffix
+
+    Returns:
+        Path of the written file
+    """
+    path = _model_path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump({k: best[k] for k in ("model", "config", "metrics", "feature_names", "n_docs")
+                 if k in best}, path)
+    return path
+
+
+def load_topic_model(path):
+    """Load a model saved by `save_topic_model` (dict with model, config, ...)."""
+    return joblib.load(_model_path(path))
+
+
+# =============================================================================
+# ONLINE (INCREMENTAL) LDA
+# =============================================================================
+
+# Top words per topic written to the summary the Streamlit app reads
+SUMMARY_TOP_WORDS = 10
+
+# Suffix of the JSON summary written next to each online model
+SUMMARY_SUFFIX = ".topics.json"
+
+
+def _hellinger(p, q):
+    """Row-wise Hellinger distance between two sets of distributions."""
+    return np.sqrt(0.5 * ((np.sqrt(p) - np.sqrt(q)) ** 2).sum(axis=1))
+
+
+class OnlineTopicModel:
+    """
+    LDA kept up to date with `partial_fit` on newly scraped posts.
+
+    New documents are vectorized against the model's fixed vocabulary, the
+    topics are updated with one online variational step per pass, and each
+    update records how far every topic moved (Hellinger distance between
+    its word distributions before and after) so drift can be watched over
+    many refreshes.
+
+    Args:
+        model: Fitted LatentDirichletAllocation (batch or online)
+        feature_names: Vocabulary the model was fitted on
+        n_docs_seen: Documents the model has been trained on so far
+        district: District name shown in the app
+        topic_counts: Documents assigned to each topic so far
+        history: Update records (see `drift_frame`)
+        sources: Names of delta files already applied
+
+    Example:
+        >>> online = OnlineTopicModel.fit(dtm, n_components=5, district="Palo Alto")
+        >>> online.save("Palo_Alto_online_lda")
+        >>> new_topics = online.update(new_tokens)
+    """
+
+    def __init__(self, model, feature_names, n_docs_seen, district=None,
+                 topic_counts=None, history=None, sources=None):
+        self.model = model
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self.n_docs_seen = int(n_docs_seen)
+        self.district = district
+        n_topics = model.components_.shape[0]
+        self.topic_counts = np.zeros(n_topics, dtype=np.int64) if topic_counts is None \
+            else np.asarray(topic_counts, dtype=np.int64)
+        self.history = list(history or [])
+        self.sources = list(sources or [])
+
+    @classmethod
+    def fit(cls, dtm, n_components=5, passes=10, batch_size=128, random_state=42,
+            district=None, **lda_params):
+        """
+        Fit a new online LDA on a DocumentTermMatrix.
+
+        Args:
+            dtm: DocumentTermMatrix from `build_dtm`
+            n_components: Number of topics
+            passes: Passes over `dtm` for the initial fit
+            batch_size: Documents per online mini-batch
+            **lda_params: Other `LatentDirichletAllocation` parameters
+        """
+        counts = dtm.counts
+        model = LatentDirichletAllocation(
+            n_components=n_components, learning_method="online", max_iter=passes,
+            batch_size=batch_size, total_samples=counts.shape[0],
+            random_state=random_state, **lda_params,
+        ).fit(counts)
+        online = cls(model, dtm.feature_names, counts.shape[0], district=district)
+        online.topic_counts += np.bincount(online.assign(counts), minlength=n_components)
+        return online
+
+    @classmethod
+    def from_sweep(cls, best, dtm=None, district=None):
+        """
+        Continue from an LDA chosen by `sweep_topic_models`.
+
+        Args:
+            best: Dict from `sweep_topic_models` or `load_topic_model`
+            dtm: The matrix it was swept on, used to count topic shares
+        """
+        if not isinstance(best["model"], LatentDirichletAllocation):
+            raise ValueError("Online updates need an LDA model; the sweep picked "
+                             f"{type(best['model']).__name__}")
+        model = best["model"]
+        model.set_params(learning_method="online")
+        n_docs = best.get("n_docs") or (dtm.shape[0] if dtm is not None else 0)
+        online = cls(model, best["feature_names"], n_docs, district=district)
+        if dtm is not None:
+            online.topic_counts += np.bincount(online.assign(dtm.counts),
+                                               minlength=online.n_topics)
+        return online
+
+    @property
+    def n_topics(self):
+        return self.model.components_.shape[0]
+
+    def topic_word(self):
+        """Topic-word distributions (rows sum to 1)."""
+        components = self.model.components_
+        return components / components.sum(axis=1, keepdims=True)
+
+    def vectorize(self, docs, rows=None):
+        """Count matrix of documents over the model's vocabulary."""
+        if sparse.issparse(docs):
+            return docs if rows is None else docs[rows]
+        empty = sparse.csr_matrix((0, len(self.feature_names)), dtype=np.int64)
+        return DocumentTermMatrix(empty, self.feature_names, {}).transform(docs, rows=rows)
+
+    def assign(self, docs, rows=None):
+        """Dominant topic (0-based) of each document."""
+        counts = self.vectorize(docs, rows=rows)
+        if counts.shape[0] == 0:
+            return np.array([], dtype=np.int64)
+        return self.model.transform(counts).argmax(axis=1)
+
+    def update(self, docs, rows=None, passes=1, source=None):
+        """
+        Train on new documents only and assign them topics.
+
+        Args:
+            docs: TokenizedPosts, document texts or a count matrix over
+                `feature_names`
+            rows: Optional selection of documents
+            passes: Online passes over the new documents (default: 1)
+            source: Name of the file the documents came from (recorded so
+                it is not applied twice; see `sources`)
+
+        Returns:
+            Array with the dominant topic (0-based) of each new document
+        """
+        counts = self.vectorize(docs, rows=rows)
+        if source is not None:
+            self.sources.append(source)
+        if counts.shape[0] == 0:
+            return np.array([], dtype=np.int64)
+
+        before = self.topic_word()
+        self.n_docs_seen += counts.shape[0]
+        # the online step weighs a batch by total_samples / batch size
+        self.model.set_params(learning_method="online", total_samples=self.n_docs_seen)
+        for _ in range(passes):
+            self.model.partial_fit(counts)
+
+        drift = _hellinger(before, self.topic_word())
+        topics = self.assign(counts)
+        new_counts = np.bincount(topics, minlength=self.n_topics)
+        self.topic_counts += new_counts
+        self.history.append({
+            "updated_at": time.time(),
+            "source": source,
+            "new_docs": int(counts.shape[0]),
+            "n_docs_seen": self.n_docs_seen,
+            "drift_mean": float(drift.mean()),
+            "drift_max": float(drift.max()),
+            "topic_drift": drift.round(6).tolist(),
+            "new_topic_counts": new_counts.tolist(),
+        })
+        return topics
+
+    def top_words(self, n=10):
+        """DataFrame with the top `n` words and document share of each topic."""
+        order = np.argsort(self.model.components_, axis=1)[:, ::-1][:, :n]
+        total = max(1, self.topic_counts.sum())
+        return pd.DataFrame({
+            "Topic": np.arange(1, self.n_topics + 1),
+            "Top Words": [", ".join(self.feature_names[idx]) for idx in order],
+            "Share": self.topic_counts / total,
+        })
+
+    def drift_frame(self):
+        """One row per update: new documents, mean/max drift, per-topic drift."""
+        return pd.DataFrame(self.history)
+
+    def save(self, path):
+        """
+        Save the model and its JSON summary (top words, shares, drift).
+
+        Args:
+            path: Target file; bare names go to MODELS_DIR
+
+        Returns:
+            Path of the .joblib file; the summary is written next to it
+            with the `.topics.json` suffix
+        """
+        path = _model_path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({
+            "model": self.model,
+            "config": {"model": "lda", "online": True, "n_components": self.n_topics},
+            "feature_names": self.feature_names,
+            "n_docs": self.n_docs_seen,
+            "district": self.district,
+            "topic_counts": self.topic_counts,
+            "history": self.history,
+            "sources": self.sources,
+        }, path)
+
+        summary = {
+            "district": self.district,
+            "updated_at": time.time(),
+            "n_docs_seen": self.n_docs_seen,
+            "topics": self.top_words(SUMMARY_TOP_WORDS).to_dict("records"),
+            "history": [{k: v for k, v in h.items() if k != "topic_drift"}
+                        for h in self.history],
+        }
+        path.with_name(path.stem + SUMMARY_SUFFIX).write_text(
+            json.dumps(summary, indent=2, default=float), encoding="utf-8"
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load a model written by `save`."""
+        bundle = load_topic_model(path)
+        return cls(bundle["model"], bundle["feature_names"], bundle["n_docs"],
+                   district=bundle.get("district"),
+                   topic_counts=bundle.get("topic_counts"),
+                   history=bundle.get("history"), sources=bundle.get("sources"))
+
+
+def online_model_name(district):
+    """Model file name of a district's online LDA (e.g. Palo_Alto_online_lda)."""
+    return f"{district.replace(' ', '_')}_online_lda"
+
+
+def update_from_deltas(district, dataset_folder, passes=1):
+    """
+    Apply a district's new delta datasets to its online LDA.
+
+    Deltas are the files written by `scrape_index.scrape_incremental`;
+    ones already applied are skipped. Comments are cleaned with the shared
+    result cache, so only new text is processed.
+
+    Returns:
+        Tuple (OnlineTopicModel, DataFrame with submission_id, source and
+        dominant_topic of every new post)
+    """
+    # imported here: scrape_index pulls in praw via reddit_scraper
+    from scrape_index import delta_paths
+
+    online = OnlineTopicModel.load(online_model_name(district))
+    assigned = []
+    for path in delta_paths(dataset_folder, district):
+        if path.name in online.sources:
+            continue
+        delta = clean_dataframe_column(pd.read_pickle(path), column="comments_flat",
+                                       cache=True)
+        tokens = TokenizedPosts.from_posts(delta["cleaned_comments"])
+        has_text = tokens.tokens_per_post > 0
+        topics = online.update(tokens, rows=has_text, passes=passes, source=path.name)
+        assigned.append(pd.DataFrame({
+            "submission_id": delta["submission_id"].to_numpy()[has_text],
+            "source": path.name,
+            "dominant_topic": topics,
+        }))
+
+    online.save(online_model_name(district))
+    columns = ["submission_id", "source", "dominant_topic"]
+    return online, (pd.concat(assigned, ignore_index=True) if assigned
+                    else pd.DataFrame(columns=columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Topic model maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    update = sub.add_parser("update", help="apply new delta datasets to online LDA models")
+    update.add_argument("districts", nargs="+")
+    update.add_argument("--datasets", type=Path, default=PROJECT_ROOT / "datasets")
+    update.add_argument("--passes", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "update":
+        for district in args.districts:
+            try:
+                online, assigned = update_from_deltas(district, args.datasets, args.passes)
+            except FileNotFoundError:
+                print(f"⚠️ {district}: no online model yet (fit one in 04_topic_modeling)")
+                continue
+            drift = online.history[-1]["drift_mean"] if len(assigned) else 0.0
+            print(f"✅ {district}: {len(assigned)} new posts, "
+                  f"{online.n_docs_seen} total, mean topic drift {drift:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Worker Counts for Process Pools
+====================================================
+
+One definition of the ``n_jobs`` convention used by cleaning, sentiment
+scoring, the topic-model sweep and the pipeline runner:
+
+- ``None`` or ``1``: serial
+- a positive count: that many workers
+- a negative value: all cores plus one plus ``n_jobs`` (``-1`` = all
+  cores, ``-2`` = all but one), as in scikit-learn / joblib
+
+Functions that also accept an existing ``executor`` take the pool's
+worker count through ``n_jobs`` as well; executors do not expose it
+publicly, so it is never read back from the pool.
+
+Usage:
+    >>> from parallel import resolve_n_jobs
+    >>> resolve_n_jobs(-1)                    # os.cpu_count()
+
+Author: ADS 509 Team"""
+import os
+
+
+def resolve_n_jobs(n_jobs):
+    """Turn an `n_jobs` value (None, -1, or a count) into a worker count."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
@@ -0,0 +1,167 @@
+"""Shared Reddit Client
+====================================================
+
+Process-wide manager for authenticated `praw.Reddit` clients. The
+credentials file is parsed once and one client (with its OAuth token and
+HTTP connection pool) is created on first use, then shared by every thread
+and every app session in the process. praw is not thread-safe, so callers
+hold the manager's lock while they use the shared client - `reddit_session()`
+does both. Code that needs several clients at once (the worker threads of
+`reddit_scraper.FetchEngine`) builds its own with `RedditClientManager.create()`.
+
+Tokens are refreshed lazily: praw only requests a new read-only token
+when the current one has expired, on the next API call.
+
+Usage:
+    >>> from reddit_client import get_reddit
+    >>> reddit = get_reddit()                 # same object on every call
+    >>> with reddit_session() as reddit:      # exclusive use of that client
+    ...     posts = list(reddit.subreddit("education").search("schools"))
+
+    # against a local stub of the Reddit API
+    >>> manager = RedditClientManager(oauth_url="http://127.0.0.1:8080",
+    ...                               reddit_url="http://127.0.0.1:8080")
+
+Author: ADS 509 Team"""
+import configparser
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# Default credentials file (see notebooks/praw.ini.template)
+DEFAULT_PRAW_PATH = PROJECT_ROOT / "praw.ini"
+
+# Keys read from the [default] section of praw.ini
+CREDENTIAL_KEYS = ("client_id", "client_secret", "user_agent")
+
+
+class RedditClientManager:
+    """
+    Create one shared authenticated Reddit client lazily.
+
+    Args:
+        praw_path: Credentials file (default: praw.ini in the project root)
+        section: Section of the ini file to read (default: "default")
+        factory: Optional callable(credentials dict) -> client, used instead
+            of `praw.Reddit` (e.g. to return a stub in tests)
+        **reddit_kwargs: Extra keyword arguments for `praw.Reddit`, such as
+            `oauth_url` / `reddit_url` to point at a local stub server
+
+    Example:
+        >>> manager = RedditClientManager()
+        >>> manager.get() is manager.get()
+        True
+    """
+
+    def __init__(self, praw_path=None, section="default", factory=None,
+                 **reddit_kwargs):
+        self.praw_path = Path(praw_path or DEFAULT_PRAW_PATH)
+        self.section = section
+        self.factory = factory
+        self.reddit_kwargs = reddit_kwargs
+        self.created = 0  # how many clients were built
+        # bumped by reset(); lets owners of extra clients retire them
+        self.generation = 0
+        # held while the shared client is in use (see `session`)
+        self.lock = threading.RLock()
+
+        self._client = None
+        self._credentials = None
+        self._lock = threading.Lock()
+
+    def credentials(self):
+        """Read and cache the client credentials from the ini file."""
+        with self._lock:
+            return self._read_credentials()
+
+    def _read_credentials(self):
+        if self._credentials is None:
+            if not self.praw_path.exists():
+                raise FileNotFoundError(f"❌ praw.ini not found at: {self.praw_path}")
+
+            config = configparser.ConfigParser()
+            config.read(self.praw_path)
+            section = config[self.section]
+            self._credentials = {key: section[key] for key in CREDENTIAL_KEYS}
+        return self._credentials
+
+    def get(self):
+        """Return the shared client, creating it on the first call."""
+        client = self._client
+        if client is not None:
+            return client
+
+        with self._lock:
+            if self._client is None:
+                self._client = self._build()
+            return self._client
+
+    @contextmanager
+    def session(self):
+        """Hold `lock` and yield the shared client for exclusive use."""
+        with self.lock:
+            yield self.get()
+
+    def create(self):
+        """
+        Build a new client that is not shared (e.g. for a worker thread).
+
+        The caller owns it; compare `generation` to notice a `reset()`.
+        """
+        with self._lock:
+            return self._build()
+
+    def _build(self):
+        client = self._create(self._read_credentials())
+        self.created += 1
+        return client
+
+    def _create(self, credentials):
+        if self.factory is not None:
+            return self.factory(credentials)
+        import praw  # only needed once a real client is created
+
+        return praw.Reddit(**credentials, **self.reddit_kwargs)
+
+    def reset(self):
+        """
+        Drop the shared client and credentials (e.g. after editing praw.ini).
+
+        The next `get()` re-reads the file and creates a new client.
+        """
+        with self._lock:
+            self.generation += 1
+            self._client = None
+            self._credentials = None
+
+
+_default_manager = RedditClientManager()
+
+
+def get_manager():
+    """Return the process-wide RedditClientManager."""
+    return _default_manager
+
+
+def set_manager(manager):
+    """
+    Replace the process-wide manager (e.g. with one pointing at a stub).
+
+    Returns:
+        The previous manager, so callers can restore it
+    """
+    global _default_manager
+    previous, _default_manager = _default_manager, manager
+    return previous
+
+
+def get_reddit():
+    """Return the process-wide authenticated Reddit client."""
+    return _default_manager.get()
+
+
+def reddit_session():
+    """Context manager giving exclusive use of the process-wide client."""
+    return _default_manager.session()
@@ -0,0 +1,710 @@
+"""Reddit Scraper for District Datasets
+====================================================
+
+Query and filtering helpers used by `01_data_scraping_reddit.ipynb`, plus
+a concurrent fetch engine that scrapes several districts at once. Searches
+and comment trees are fetched on a thread pool in which every worker uses
+its own Reddit client (praw is not thread-safe), and every API call goes
+through a token-bucket limiter whose rate follows the `x-ratelimit-*`
+budget Reddit reports, with retries and exponential backoff on rate-limit
+and server errors.
+
+Usage:
+    >>> engine = FetchEngine(max_workers=8)        # one client per worker thread
+    >>> frames = engine.fetch_districts(["Palo Alto", "Oklahoma City"],
+    ...                                 options=["schools", "teachers"])
+
+Author: ADS 509 Team"""
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+
+import pandas as pd
+from prawcore.exceptions import RequestException, ServerError, TooManyRequests
+
+from instrumentation import bind_run, count, timer
+from reddit_client import get_manager, reddit_session
+
+# Reddit's OAuth budget: 1000 requests per 600-second window (100 QPM)
+RATE_WINDOW_SECONDS = 600
+DEFAULT_RATE = 1000 / RATE_WINDOW_SECONDS
+
+# Fraction of the reported remaining budget the limiter is allowed to use
+RATE_SAFETY = 0.9
+
+# Submissions returned per search listing request
+SEARCH_PAGE_SIZE = 100
+
+# Errors worth retrying: throttling, 5xx and connection problems
+RETRYABLE_ERRORS = (TooManyRequests, ServerError, RequestException)
+
+DATASET_COLUMNS = [
+    "source", "query", "topic", "comments_nested", "comments_flat",
+    "submission_id", "created_utc", "comment_ids",
+]
+
+
+# --------------------------------------------
+# ✅ Query and Filtering Helpers
+# --------------------------------------------
+def word_count(s: str) -> int:
+    return len(re.findall(r"\w+", s or ""))
+
+
+def iter_search_results(listing):
+    """
+    Yield from a search listing, counting API calls as they are made.
+
+    PRAW fetches search results lazily, `SEARCH_PAGE_SIZE` submissions per
+    request, so one ``reddit.api_calls`` is counted when each page is
+    reached (and one for a search that returns nothing). Works with any
+    ``limit``, including ``None``.
+
+    Parameters
+    ----------
+    listing : praw.models.ListingGenerator
+        The generator returned by ``subreddit.search(...)``.
+
+    Yields
+    ------
+    praw.models.Submission
+    """
+    seen = 0
+    for submission in listing:
+        if seen % SEARCH_PAGE_SIZE == 0:
+            count("reddit.api_calls")
+        seen += 1
+        yield submission
+    if not seen:
+        count("reddit.api_calls")
+
+
+def iter_comments(submission, min_score=6, min_words=21, skip_ids=None):
+    """
+    Yield the qualifying comments of a Reddit submission one at a time.
+
+    Applies the filters of `comments_to_corpus` without building any lists,
+    for callers that write comments out as they go (see stream_ingest.py).
+
+    Parameters
+    ----------
+    submission : praw.models.Submission
+        Reddit submission object from which to collect comments.
+    min_score, min_words, skip_ids
+        Same as `comments_to_corpus`.
+
+    Yields
+    ------
+    tuple of (str, str)
+        ``(comment_id, body)`` with the body stripped, in comment-tree order.
+    """
+    with timer("reddit.load_comments"):
+        submission.comments.replace_more(limit=0)
+        comments = submission.comments.list()
+    count("reddit.api_calls")
+    count("reddit.comments_seen", len(comments))
+    skip_ids = skip_ids or ()
+
+    for c in comments:
+        if getattr(c, "id", None) in skip_ids:
+            continue
+        body = c.body
+        if not isinstance(body, str):
+            continue
+        body = body.strip()
+
+        if body.lower() in ("[deleted]", "[removed]"):
+            continue
+        if c.score is None:
+            continue
+
+        if c.score >= min_score and word_count(body) >= min_words:
+            count("reddit.comments_kept")
+            yield getattr(c, "id", None), body
+
+
+def comments_to_corpus(submission, min_score=6, min_words=21, skip_ids=None):
+    """
+    Extract and filter comments from a Reddit submission.
+
+    Iterates through all comments in a submission and keeps only those that meet
+    both a minimum score threshold and a minimum word count. Each qualifying
+    comment is returned in two parallel forms, plus its Reddit ID:
+
+    - "nested": [["comment1"], ["comment2"], ...]
+    - "flat":   ["comment1", "comment2", ...]
+    - "ids":    ["id1", "id2", ...]
+
+    Parameters
+    ----------
+    submission : praw.models.Submission
+        Reddit submission object from which to collect comments.
+    min_score : int, optional, default=6
+        Minimum upvote score required for a comment to be included.
+    min_words : int, optional, default=21
+        Minimum number of words required for a comment to be included.
+    skip_ids : set of str, optional
+        Comment IDs already stored; these are left out (incremental scraping).
+
+    Returns
+    -------
+    dict
+        Dictionary with three keys:
+        - "nested": list of list of str
+        - "flat":   list of str
+        - "ids":    list of str
+
+    Notes
+    -----
+    - Comments with `[deleted]` or `[removed]` text are skipped.
+    - Comments with no body text or missing score are excluded.
+    - `submission.comments.replace_more(limit=0)` is used to ensure that
+      all comments are fully loaded before filtering.
+    - "nested" holds the same string objects as "flat", so the second form
+      costs one small list per comment, not a copy of the text.
+    """
+    ids, flat = [], []
+    for comment_id, body in iter_comments(submission, min_score, min_words, skip_ids):
+        ids.append(comment_id)
+        flat.append(body)
+    return {"nested": [[body] for body in flat], "flat": flat, "ids": ids}
+
+
+def submission_row(submission, query, comments):
+    """Build one dataset row from a submission and its filtered comments."""
+    return {
+        "source": "reddit",
+        "query": query,
+        "topic": (submission.title or "").strip(),
+        "comments_nested": comments["nested"],
+        "comments_flat": comments["flat"],
+        "submission_id": getattr(submission, "id", None),
+        "created_utc": getattr(submission, "created_utc", None),
+        "comment_ids": comments["ids"],
+    }
+
+
+@timer("reddit.build_df_for_query")
+def build_df_for_query(
+    subreddit_name: str,
+    query: str,
+    limit=20,
+    sort="relevance",
+    time_filter="all",
+    min_score=6,
+    min_words=21,
+    reddit=None,
+):
+    """
+    Query Reddit submissions and build a DataFrame of post titles and filtered comments.
+
+    This function searches a specified subreddit for submissions matching a query
+    and collects comments from each submission that meet the given thresholds
+    (minimum score and minimum word count). The comments are returned both as a
+    nested form (list of single-element lists) and as a flat form (list of strings).
+    The result is a DataFrame where each row corresponds to one submission.
+
+    Parameters
+    ----------
+    subreddit_name : str
+        Name of the subreddit to search (without the "r/").
+    query : str
+        Search query string to use within the subreddit.
+    limit : int, optional, default=20
+        Maximum number of submissions to retrieve.
+    sort : {"relevance", "hot", "top", "new", "comments"}, optional, default="relevance"
+        Sorting method for the search results.
+    time_filter : {"all", "day", "hour", "month", "week", "year"}, optional, default="all"
+        Restrict search results to a specific time window.
+    min_score : int, optional, default=6
+        Minimum upvote score required for a comment to be included.
+    min_words : int, optional, default=21
+        Minimum number of words required for a comment to be included.
+    reddit : praw.Reddit, optional
+        Client to use (default: the shared client from `reddit_client`,
+        held for the whole query).
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame with one row per submission and the following columns:
+
+        - ``source`` : str
+            Constant value "reddit".
+        - ``query`` : str
+            The original search query string.
+        - ``topic`` : str
+            Title of the submission.
+        - ``comments_nested`` : list of list of str
+            Nested list of comments (each comment wrapped in a list).
+        - ``comments_flat`` : list of str
+            Flat list of comments.
+        - ``submission_id`` / ``created_utc`` : str / float
+            Reddit ID and creation time of the submission.
+        - ``comment_ids`` : list of str
+            Reddit IDs of the kept comments (parallel to ``comments_flat``).
+    """
+    rows = []
+    with (nullcontext(reddit) if reddit else reddit_session()) as reddit:
+        sr = reddit.subreddit(subreddit_name)
+
+        listing = sr.search(query, sort=sort, time_filter=time_filter, limit=limit)
+        for subm in iter_search_results(listing):
+            count("reddit.posts")
+            try:
+                comments = comments_to_corpus(
+                    subm, min_score=min_score, min_words=min_words
+                )
+
+                if comments["nested"]:  # only keep submissions with qualifying comments
+                    rows.append(submission_row(subm, query, comments))
+
+            except Exception as e:
+                print(f"[warn] {subm.id}: {e}")
+                time.sleep(0.2)  # be polite to the API
+
+    return pd.DataFrame(rows, columns=DATASET_COLUMNS)
+
+
+def query_builder(district, options):
+    """
+    Build a Reddit search query string based on district name and topic options.
+
+    The function constructs a search query suitable for Reddit's API by combining
+    the district name (quoted for exact matching) with user-selected topic keywords
+    joined using logical OR operators inside parentheses.
+
+    Parameters
+    ----------
+    district : str
+        Name of the district or area to search for (e.g., "Palo Alto").
+    options : list of str
+        List of topic keywords to include in the query
+        (e.g., ["schools", "district", "education"]).
+
+    Returns
+    -------
+    str
+        Formatted Reddit search query string.
+        Example:
+        '"Palo Alto" (schools OR district OR education)'
+
+    Notes
+    -----
+    - If `district` is empty, only the topic portion is returned.
+    - If `options` is empty, only the district portion is returned.
+    - Leading and trailing whitespace in `district` is automatically stripped.
+
+    Examples
+    --------
+    >>> query_builder("Palo Alto", ["schools", "teachers"])
+    '"Palo Alto" (schools OR teachers)'
+
+    >>> query_builder("San Diego", [])
+    '"San Diego"'
+    """
+    district_part = f'"{district.strip()}"' if district else ""
+
+    # join topic options with OR inside ()
+    if options:
+        options_part = "(" + " OR ".join(options) + ")"
+    else:
+        options_part = ""
+
+    query = f"{district_part} {options_part}".strip()
+
+    return query
+
+
+def total_word_count(comments):
+    """
+    Compute the total number of words across a list of comment strings.
+
+    Parameters
+    ----------
+    comments : list of str
+        List of comments from which to count words.
+
+    Returns
+    -------
+    int
+        Total number of words across all comments.
+        Returns 0 if `comments` is empty or None.
+
+    Notes
+    -----
+    - Each comment is split on whitespace to estimate word count.
+    - Non-string entries in the list should be cleaned before calling this function.
+
+    Examples
+    --------
+    >>> total_word_count(["This is one comment.", "This is another."])
+    7
+
+    >>> total_word_count([])
+    0
+    """
+    total = 0
+    if not comments:
+        return 0
+
+    for comment in comments:
+        words = comment.split()
+        total += len(words)
+
+    return total
+
+
+# --------------------------------------------
+# ✅ Rate Limiting
+# --------------------------------------------
+class TokenBucket:
+    """
+    Thread-safe token bucket that paces API calls.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    call takes one token (or more for multi-page requests) and blocks until
+    enough are available. `update_from_limits` re-tunes the rate from the
+    budget Reddit reports after each response.
+
+    Parameters
+    ----------
+    rate : float, optional
+        Tokens added per second (default: Reddit's 1000 requests / 600 s).
+    capacity : int, optional, default=10
+        Largest burst allowed after an idle period.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=10):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` tokens are available, then take them."""
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = max(self.paused_until - now,
+                           (tokens - self.tokens) / self.rate)
+            time.sleep(max(wait, 0.01))
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds` (e.g. after an HTTP 429)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def update_from_limits(self, limits):
+        """
+        Re-tune the rate from a `reddit.auth.limits` dict.
+
+        The remaining budget is spread evenly over the time left in the
+        current window (the full window when Reddit does not report a reset
+        time); when the budget is exhausted the bucket pauses until reset.
+        """
+        remaining = limits.get("remaining")
+        if remaining is None:
+            return
+
+        reset = limits.get("reset_timestamp")
+        seconds_left = (reset - time.time()) if reset else RATE_WINDOW_SECONDS
+        seconds_left = max(1.0, seconds_left)
+
+        if remaining <= 1:
+            self.pause(seconds_left)
+            return
+        with self._lock:
+            self.rate = max(0.01, remaining * RATE_SAFETY / seconds_left)
+
+
+def combine_limits(reports, now=None):
+    """
+    Merge the `auth.limits` of several clients into one report.
+
+    Every client draws on the same budget, so the most conservative view
+    wins: the smallest remaining count and the latest reset time. Reports
+    whose window has already reset are ignored.
+
+    Parameters
+    ----------
+    reports : iterable of dict
+        ``reddit.auth.limits`` dicts (``remaining``, ``reset_timestamp``).
+    now : float, optional
+        Current Unix time (default: ``time.time()``).
+
+    Returns
+    -------
+    dict
+        ``{"remaining": ..., "reset_timestamp": ...}``; ``remaining`` is
+        None when no client has reported yet.
+    """
+    now = time.time() if now is None else now
+    current = [
+        r for r in reports
+        if r.get("remaining") is not None
+        and not (r.get("reset_timestamp") and r["reset_timestamp"] <= now)
+    ]
+    if not current:
+        return {"remaining": None, "reset_timestamp": None}
+    resets = [r["reset_timestamp"] for r in current if r.get("reset_timestamp")]
+    return {"remaining": min(r["remaining"] for r in current),
+            "reset_timestamp": max(resets) if resets else None}
+
+
+# --------------------------------------------
+# ✅ Concurrent Fetch Engine
+# --------------------------------------------
+class FetchEngine:
+    """
+    Fetch searches and comment trees for many districts concurrently.
+
+    One thread pool serves every district: each district's search runs as
+    a task, and as soon as it returns, one task per submission fetches and
+    filters that submission's comments. Each worker thread checks out its
+    own Reddit client, built by `manager.create()` and kept by the engine
+    for its later runs; all tasks share one `TokenBucket`, so the combined
+    request rate stays inside Reddit's budget however many workers run.
+    Each client sees only its own ``x-ratelimit-*`` headers, so the bucket
+    is tuned from the combined reports of all of them (see `combine_limits`).
+
+    Parameters
+    ----------
+    reddit : praw.Reddit, optional
+        A single client to use for every call. praw clients are not
+        thread-safe, so the engine then runs one fetch at a time
+        (``max_workers`` is ignored).
+    max_workers : int, optional, default=8
+        Number of threads fetching concurrently.
+    limiter : TokenBucket, optional
+        Rate limiter (default: a new bucket at Reddit's default budget).
+    max_retries : int, optional, default=4
+        Retries per API call on rate-limit, server or connection errors.
+    backoff : float, optional, default=1.0
+        Base delay in seconds; retry ``n`` waits ``backoff * 2**n`` plus jitter.
+    manager : reddit_client.RedditClientManager, optional
+        Source of the worker clients when ``reddit`` is not given
+        (default: the process-wide manager).
+    """
+
+    def __init__(self, reddit=None, max_workers=8, limiter=None,
+                 max_retries=4, backoff=1.0, manager=None):
+        self.manager = manager or get_manager()
+        self._reddit = reddit
+        self.max_workers = 1 if reddit is not None else max_workers
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # district -> {submission_id: num_comments} fetched by the last run
+        self.fetched = {}
+
+        self._local = threading.local()
+        self._idle = []    # clients not held by any thread
+        self._in_use = {}  # thread -> client
+        self._generation = self.manager.generation
+        self._clients_lock = threading.Lock()
+        self._limits = {}  # client -> its latest auth.limits
+
+    @property
+    def reddit(self):
+        """The Reddit client for the calling thread."""
+        if self._reddit is not None:
+            return self._reddit
+        client = getattr(self._local, "client", None)
+        if client is None or self._local.generation != self.manager.generation:
+            client = self._checkout()
+        return client
+
+    def _checkout(self):
+        with self._clients_lock:
+            if self._generation != self.manager.generation:
+                # credentials were reset: retire the clients built before
+                self._idle.clear()
+                self._generation = self.manager.generation
+            client = self._idle.pop() if self._idle else self.manager.create()
+            self._in_use[threading.current_thread()] = client
+        self._local.client = client
+        self._local.generation = self._generation
+        return client
+
+    def _release_workers(self):
+        """Return the clients of finished worker threads to the idle list."""
+        with self._clients_lock:
+            for thread in [t for t in self._in_use if not t.is_alive()]:
+                client = self._in_use.pop(thread)
+                if self._generation == self.manager.generation:
+                    self._idle.append(client)
+
+    def call(self, func, *args, cost=1, **kwargs):
+        """
+        Run one API call under the rate limiter, retrying transient errors.
+
+        Parameters
+        ----------
+        func : callable
+            Function that performs the request(s).
+        cost : int, optional, default=1
+            Number of requests the call is expected to make.
+        """
+        for attempt in range(self.max_retries + 1):
+            with timer("reddit.rate_limit_wait"):
+                self.limiter.acquire(cost)
+            try:
+                result = func(*args, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                count("reddit.retries")
+                delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+                if isinstance(e, TooManyRequests):
+                    self.limiter.pause(delay)
+                time.sleep(delay)
+            else:
+                self._update_limits(self.reddit)
+                return result
+
+    def _update_limits(self, reddit):
+        """Record `reddit`'s rate-limit report and re-tune the shared bucket."""
+        with self._clients_lock:
+            self._limits[reddit] = dict(reddit.auth.limits)
+            limits = combine_limits(self._limits.values())
+        self.limiter.update_from_limits(limits)
+
+    def search(self, subreddit_name, query, limit, sort, time_filter):
+        """Return the list of submissions matching `query`."""
+        sr = self.reddit.subreddit(subreddit_name)
+        # expected listing requests, reserved from the limiter up front
+        pages = max(1, -(-limit // SEARCH_PAGE_SIZE)) if limit else 1
+        with timer("reddit.search"):
+            submissions = self.call(
+                lambda: list(iter_search_results(
+                    sr.search(query, sort=sort, time_filter=time_filter, limit=limit))),
+                cost=pages,
+            )
+        count("reddit.posts", len(submissions))
+        return submissions
+
+    def fetch_comments(self, submission, min_score, min_words, skip_ids=None):
+        """
+        Fetch and filter one submission's comments (see `comments_to_corpus`).
+
+        The submission is re-bound to this thread's client, so the comment
+        request does not go through the client of the thread that searched.
+        Loading the comments is one request either way.
+        """
+        submission = self.reddit.submission(id=submission.id)
+        return self.call(
+            comments_to_corpus, submission,
+            min_score=min_score, min_words=min_words, skip_ids=skip_ids,
+        )
+
+    @timer("reddit.fetch_districts")
+    def fetch_districts(
+        self,
+        districts,
+        options,
+        subreddit_name="all",
+        limit=20,
+        sort="relevance",
+        time_filter="all",
+        min_score=6,
+        min_words=21,
+        index=None,
+    ):
+        """
+        Scrape several districts concurrently.
+
+        Parameters
+        ----------
+        districts : list of str
+            District names, e.g. ["Palo Alto", "Oklahoma City"].
+        options : list of str
+            Topic keywords passed to `query_builder`.
+        subreddit_name, limit, sort, time_filter, min_score, min_words
+            Same as `build_df_for_query`.
+        index : scrape_index.ScrapeIndex, optional
+            When given, only new work is fetched: unseen submissions, and
+            known submissions whose comment count grew (keeping only comments
+            not already stored). Submissions with nothing new are skipped.
+
+        Returns
+        -------
+        dict of str -> pandas.DataFrame
+            One frame per district, in the same format and row order as
+            `build_df_for_query`. The submissions actually fetched are listed
+            in `self.fetched` so the caller can record them once saved.
+        """
+        queries = {d: query_builder(district=d, options=options) for d in districts}
+        results = {d: {} for d in districts}
+        submissions = {}
+        known = {d: index.submission_counts(d) for d in districts} if index else {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            searches = {
+                pool.submit(bind_run(self.search), subreddit_name, q, limit, sort,
+                            time_filter): d
+                for d, q in queries.items()
+            }
+
+            comment_jobs = {}
+            for future in as_completed(searches):
+                district = searches[future]
+                try:
+                    submissions[district] = future.result()
+                except Exception as e:
+                    print(f"[warn] {district}: search failed: {e}")
+                    submissions[district] = []
+                    continue
+                for position, subm in enumerate(submissions[district]):
+                    skip_ids = None
+                    if index is not None and subm.id in known[district]:
+                        if subm.num_comments <= known[district][subm.id]:
+                            continue  # no new comments since the last run
+                        skip_ids = index.comment_ids(district, subm.id)
+                    job = pool.submit(
+                        bind_run(self.fetch_comments), subm, min_score, min_words, skip_ids
+                    )
+                    comment_jobs[job] = (district, position)
+
+            for future in as_completed(comment_jobs):
+                district, position = comment_jobs[future]
+                subm = submissions[district][position]
+                try:
+                    results[district][position] = future.result()
+                except Exception as e:
+                    print(f"[warn] {subm.id}: {e}")
+        self._release_workers()
+
+        self.fetched = {
+            district: {
+                submissions[district][position].id:
+                    submissions[district][position].num_comments
+                for position in results[district]
+            }
+            for district in districts
+        }
+
+        frames = {}
+        for district in districts:
+            rows = [
+                submission_row(subm, queries[district], results[district][position])
+                for position, subm in enumerate(submissions[district])
+                if position in results[district] and results[district][position]["nested"]
+            ]
+            frames[district] = pd.DataFrame(rows, columns=DATASET_COLUMNS)
+        return frames
@@ -0,0 +1,355 @@
+"""Review Sentiment Classifier
+====================================================
+
+Backend of the app's Classifier page: a TF-IDF + logistic-regression
+model trained on the cleaned district datasets and served in batches.
+
+- Training labels are the VADER labels (`sentiment.score_many`) of each
+  raw comment; the model learns them from the cleaned text, so scoring
+  thousands of reviews is a couple of sparse matrix products instead of
+  a lexicon lookup per word.
+- The fitted pipeline is saved with joblib to
+  ``models/sentiment_classifier.joblib`` and loaded once per process
+  (`get_classifier`).
+- `SentimentClassifier.predict_many` scores a whole list per call;
+  `MicroBatcher` collects single requests from concurrent callers (app
+  sessions run in separate threads) for a few milliseconds and answers
+  them with one `predict_many` call.
+
+Usage:
+    $ python review_classifier.py train
+    $ python review_classifier.py predict "Great teachers" "Unsafe campus"
+
+    >>> get_classifier().predict_many(reviews)    # label, confidence
+    >>> get_batcher().predict("Great teachers")   # ("Positive", 0.93)
+
+Author: ADS 509 Team"""
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from notebook_modules import get_cleaner
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+MODEL_PATH = PROJECT_ROOT / "models" / "sentiment_classifier.joblib"
+
+# Bump when the feature pipeline changes; older model files are rejected
+CLASSIFIER_VERSION = 1
+
+# Texts vectorised per step in predict_many (bounds peak memory)
+PREDICT_BATCH_SIZE = 4096
+
+# Micro-batching: requests per batch and how long to wait for more
+MAX_BATCH = 256
+MAX_WAIT_SECONDS = 0.005
+
+VECTORIZER_OPTIONS = {"ngram_range": (1, 2), "min_df": 2, "sublinear_tf": True}
+MODEL_OPTIONS = {"max_iter": 1000, "C": 4.0, "class_weight": "balanced"}
+
+
+# --------------------------------------------
+# ✅ Classifier
+# --------------------------------------------
+class SentimentClassifier:
+    """
+    Fitted TF-IDF + logistic-regression pipeline with its training metadata.
+
+    Args:
+        pipeline: Fitted sklearn Pipeline taking cleaned text
+        metadata: Dict with datasets, n_train, metrics, trained_at, ...
+    """
+
+    def __init__(self, pipeline, metadata=None):
+        self.pipeline = pipeline
+        self.metadata = metadata or {}
+        self.classes = np.asarray(pipeline.classes_, dtype=object)
+
+    @classmethod
+    def fit(cls, texts, labels, test_size=0.2, random_state=42):
+        """
+        Train on raw texts and their labels.
+
+        A stratified `test_size` share is held out for the reported metrics;
+        the final model is then refit on all texts.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.metrics import accuracy_score, f1_score
+        from sklearn.model_selection import train_test_split
+        from sklearn.pipeline import make_pipeline
+
+        cleaned = np.asarray(get_cleaner().clean_many(list(texts)), dtype=object)
+        labels = np.asarray(labels, dtype=object)
+        keep = cleaned != ""
+        cleaned, labels = cleaned[keep], labels[keep]
+
+        def build():
+            return make_pipeline(TfidfVectorizer(**VECTORIZER_OPTIONS),
+                                 LogisticRegression(**MODEL_OPTIONS))
+
+        metrics = {}
+        if test_size:
+            x_train, x_test, y_train, y_test = train_test_split(
+                cleaned, labels, test_size=test_size, random_state=random_state,
+                stratify=labels)
+            predicted = build().fit(x_train, y_train).predict(x_test)
+            metrics = {"accuracy": float(accuracy_score(y_test, predicted)),
+                       "macro_f1": float(f1_score(y_test, predicted, average="macro"))}
+
+        pipeline = build().fit(cleaned, labels)
+        metadata = {
+            "version": CLASSIFIER_VERSION,
+            "n_train": int(len(cleaned)),
+            "label_counts": {k: int(v) for k, v in pd.Series(labels).value_counts().items()},
+            "metrics": metrics,
+            "trained_at": time.time(),
+        }
+        return cls(pipeline, metadata)
+
+    def predict_proba(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        """
+        Class probabilities for raw texts, shape (n_texts, n_classes).
+
+        Texts are cleaned and vectorised `batch_size` at a time.
+        """
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        if not texts:
+            return np.empty((0, len(self.classes)))
+        cleaner = get_cleaner()
+        return np.vstack([
+            self.pipeline.predict_proba(cleaner.clean_many(texts[i:i + batch_size]))
+            for i in range(0, len(texts), batch_size)
+        ])
+
+    def predict_many(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        """
+        Label a batch of raw texts.
+
+        Args:
+            texts: List or pandas Series of review texts
+            batch_size: Texts vectorised per step
+
+        Returns:
+            DataFrame with columns label, confidence (probability of the
+            predicted label), in input order
+
+        Example:
+            >>> get_classifier().predict_many(["Great teachers!", "Unsafe campus."])
+        """
+        proba = self.predict_proba(list(texts), batch_size=batch_size)
+        best = proba.argmax(axis=1) if len(proba) else np.array([], dtype=int)
+        return pd.DataFrame({
+            "label": self.classes[best],
+            "confidence": proba[np.arange(len(proba)), best],
+        })
+
+    def predict(self, text):
+        """Label of a single text as a (label, confidence) tuple."""
+        row = self.predict_many([text]).iloc[0]
+        return row["label"], float(row["confidence"])
+
+    def save(self, path=MODEL_PATH):
+        import joblib
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp")
+        joblib.dump({"pipeline": self.pipeline, "metadata": self.metadata}, tmp)
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """
+        Load a model written by `save`.
+
+        Raises:
+            FileNotFoundError: When no model has been trained yet
+            ValueError: When the file comes from an older feature pipeline
+        """
+        import joblib
+
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(
+                f"❌ No classifier at {path}; run `python review_classifier.py train`")
+        bundle = joblib.load(path)
+        version = bundle["metadata"].get("version")
+        if version != CLASSIFIER_VERSION:
+            raise ValueError(f"❌ Classifier {path} is version {version}, expected "
+                             f"{CLASSIFIER_VERSION}; retrain it")
+        return cls(bundle["pipeline"], bundle["metadata"])
+
+
+@lru_cache(maxsize=None)
+def get_classifier(path=MODEL_PATH):
+    """Return the process-wide classifier (the model file is read once)."""
+    return SentimentClassifier.load(path)
+
+
+# --------------------------------------------
+# ✅ Micro-Batching
+# --------------------------------------------
+class MicroBatcher:
+    """
+    Serve single predictions from concurrent threads in shared batches.
+
+    A background thread takes the first waiting request, keeps collecting
+    for up to `max_wait` seconds or until `max_batch` requests are queued,
+    and answers all of them with one `predict_many` call.
+
+    Args:
+        classifier: SentimentClassifier to serve
+        max_batch: Upper bound on requests per batch
+        max_wait: Seconds to wait for more requests after the first one
+    """
+
+    def __init__(self, classifier, max_batch=MAX_BATCH, max_wait=MAX_WAIT_SECONDS):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queue one text; returns a Future resolving to (label, confidence)."""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text, timeout=None):
+        """Label one text through the shared batch; blocks until it is scored."""
+        return self.submit(text).result(timeout)
+
+    def predict_many(self, texts, timeout=None):
+        """Label several texts; they may share a batch with other callers."""
+        futures = [self.submit(t) for t in texts]
+        return [f.result(timeout) for f in futures]
+
+    def _collect(self):
+        """Block for the first request, then gather more until full or timed out."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while batch[-1] is not None and len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            stop = batch[-1] is None
+            requests = [item for item in batch if item is not None]
+            if requests:
+                texts, futures = zip(*requests)
+                try:
+                    result = self.classifier.predict_many(texts)
+                except Exception as e:  # hand the error to every waiting caller
+                    for future in futures:
+                        future.set_exception(e)
+                else:
+                    for future, label, confidence in zip(
+                            futures, result["label"], result["confidence"]):
+                        future.set_result((label, float(confidence)))
+                self.batches += 1
+                self.requests += len(requests)
+            if stop:
+                return
+
+    def stats(self):
+        mean = self.requests / self.batches if self.batches else 0.0
+        return {"batches": self.batches, "requests": self.requests, "mean_batch": mean}
+
+    def close(self):
+        """Finish queued requests and stop the background thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+@lru_cache(maxsize=None)
+def get_batcher(path=MODEL_PATH):
+    """Return the process-wide MicroBatcher around `get_classifier(path)`."""
+    return MicroBatcher(get_classifier(path))
+
+
+# --------------------------------------------
+# ✅ Training Data
+# --------------------------------------------
+def training_data(datasets=None):
+    """
+    Raw comments and their VADER labels from the cleaned district datasets.
+
+    Args:
+        datasets: Dataset paths (default: the newest cleaned dataset of
+            every district, see `artefact_store.discover_datasets`)
+
+    Returns:
+        Tuple (list of comment texts, NumPy array of labels, list of
+        dataset names)
+    """
+    from artefact_store import discover_datasets
+    from dataset_store import load_dataset
+    from sentiment import score_many
+
+    paths = list(datasets or discover_datasets().values())
+    texts = []
+    for path in paths:
+        df = load_dataset(path, columns=["comments_flat"])
+        texts.extend(c for comments in df["comments_flat"] for c in comments)
+    _, labels = score_many(texts, cache=True)
+    return texts, labels, [Path(p).name for p in paths]
+
+
+def train(datasets=None, path=MODEL_PATH, test_size=0.2):
+    """Train on the district datasets and save the model; returns the classifier."""
+    texts, labels, names = training_data(datasets)
+    classifier = SentimentClassifier.fit(texts, labels, test_size=test_size)
+    classifier.metadata["datasets"] = names
+    classifier.save(path)
+    get_classifier.cache_clear()
+    get_batcher.cache_clear()
+    return classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review sentiment classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train", help="train on the cleaned district datasets")
+    train_cmd.add_argument("--datasets", nargs="*", type=Path,
+                           help="dataset files (default: newest cleaned file per district)")
+    train_cmd.add_argument("--output", type=Path, default=MODEL_PATH)
+    predict_cmd = sub.add_parser("predict", help="label texts with the saved model")
+    predict_cmd.add_argument("texts", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        start = time.perf_counter()
+        classifier = train(args.datasets, path=args.output)
+        meta = classifier.metadata
+        print(f"✅ Trained on {meta['n_train']:,} comments from {', '.join(meta['datasets'])} "
+              f"in {time.perf_counter() - start:.1f}s")
+        print(f"   held-out accuracy {meta['metrics']['accuracy']:.3f}, "
+              f"macro F1 {meta['metrics']['macro_f1']:.3f} → {args.output}")
+    elif args.command == "predict":
+        result = get_classifier().predict_many(args.texts)
+        result.insert(0, "text", args.texts)
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Incremental Scraping: Fetch Index and Delta Datasets
+====================================================
+
+Keeps a local index (SQLite) of every submission and comment already
+scraped per district, with the time it was fetched and the submission's
+comment count at that time. `FetchEngine.fetch_districts(index=...)` uses
+it to skip unchanged submissions and already-stored comments, and each run
+writes only what is new as a small delta pickle next to the dataset.
+
+Files in the dataset folder, per district:
+
+- ``<District>_incremental_reddit.pkl`` - compacted base dataset
+- ``<District>_delta_<timestamp>_reddit.pkl`` - one per incremental run
+- ``scrape_index.sqlite`` - the fetch index (shared by all districts)
+
+Later stages read ``<District>_pipeline_reddit``, not these files.
+`python pipeline.py run --incremental` (or notebook 01 with
+``INCREMENTAL = True``) scrapes incrementally and then rewrites that
+dataset from the base and deltas, so new data reaches cleaning, topics and
+sentiment.
+
+Usage:
+    >>> scrape_incremental(engine, ["Palo Alto"], options, dataset_folder)
+    >>> df = load_incremental(dataset_folder, "Palo Alto")   # base + deltas
+
+Author: ADS 509 Team"""
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from reddit_scraper import DATASET_COLUMNS, total_word_count
+
+INDEX_FILENAME = "scrape_index.sqlite"
+
+# <District>_delta_<YYYYmmdd_HHMMSS>[_<n>]_reddit.pkl, see `save_delta`
+DELTA_PATTERN = re.compile(r"_delta_(\d{8}_\d{6})(?:_(\d+))?_reddit\.pkl$")
+
+
+def _district_slug(district):
+    """File-name form of a district, matching `save_pickle_file`."""
+    return district.replace(" ", "_")
+
+
+# --------------------------------------------
+# ✅ Fetch Index
+# --------------------------------------------
+class ScrapeIndex:
+    """
+    Local record of the submissions and comments already scraped.
+
+    Args:
+        dataset_folder: Folder holding the datasets (the index file is
+            created there as scrape_index.sqlite)
+    """
+
+    def __init__(self, dataset_folder):
+        self.path = Path(dataset_folder) / INDEX_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS submissions (
+                district TEXT NOT NULL,
+                submission_id TEXT NOT NULL,
+                num_comments INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (district, submission_id)
+            );
+            CREATE TABLE IF NOT EXISTS comments (
+                district TEXT NOT NULL,
+                comment_id TEXT NOT NULL,
+                submission_id TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (district, comment_id)
+            );
+            CREATE INDEX IF NOT EXISTS comments_by_submission
+                ON comments (district, submission_id);
+            """
+        )
+
+    def submission_counts(self, district):
+        """Return {submission_id: num_comments when last fetched}."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT submission_id, num_comments FROM submissions WHERE district = ?",
+                (district,),
+            ))
+
+    def comment_ids(self, district, submission_id):
+        """Return the set of stored comment IDs for one submission."""
+        with self._lock:
+            return {row[0] for row in self._conn.execute(
+                "SELECT comment_id FROM comments WHERE district = ? AND submission_id = ?",
+                (district, submission_id),
+            )}
+
+    def last_fetched(self, district):
+        """Return the time (epoch seconds) of the latest fetch, or None."""
+        with self._lock:
+            (ts,) = self._conn.execute(
+                "SELECT MAX(fetched_at) FROM submissions WHERE district = ?",
+                (district,),
+            ).fetchone()
+        return ts
+
+    def record(self, district, fetched, df):
+        """
+        Mark submissions and comments as stored.
+
+        Call this only after the data has been written to disk, so a crash
+        in between simply causes a re-fetch on the next run.
+
+        Args:
+            district: District name
+            fetched: {submission_id: num_comments} for every submission whose
+                comments were fetched (see `FetchEngine.fetched`)
+            df: Frame that was saved, with submission_id/comment_ids columns
+        """
+        now = time.time()
+        comments = [
+            (district, cid, sid, now)
+            for sid, ids in zip(df["submission_id"], df["comment_ids"])
+            for cid in ids
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?)",
+                [(district, sid, n, now) for sid, n in fetched.items()],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO comments VALUES (?, ?, ?, ?)", comments
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+# --------------------------------------------
+# ✅ Delta Datasets
+# --------------------------------------------
+def save_delta(df, district, dataset_folder):
+    """
+    Write the new rows of one incremental run as a delta pickle.
+
+    Returns:
+        Path of the delta file, or None when there was nothing new
+    """
+    if df.empty:
+        return None
+
+    folder = Path(dataset_folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = folder / f"{_district_slug(district)}_delta_{timestamp}_reddit.pkl"
+    suffix = 1
+    while path.exists():
+        path = folder / f"{_district_slug(district)}_delta_{timestamp}_{suffix}_reddit.pkl"
+        suffix += 1
+
+    df.to_pickle(path)
+    return path
+
+
+def _delta_order(path):
+    """Sort key of a delta file: the timestamp in its name, then the suffix."""
+    ts, suffix = DELTA_PATTERN.search(path.name).groups()
+    return ts, int(suffix or 0)
+
+
+def delta_paths(dataset_folder, district):
+    """
+    Return a district's delta pickles, oldest first.
+
+    Ordered by the timestamp in the file name rather than the modification
+    time, which copying or syncing the folder can change.
+    """
+    pattern = f"{_district_slug(district)}_delta_*_reddit.pkl"
+    paths = [p for p in Path(dataset_folder).glob(pattern) if DELTA_PATTERN.search(p.name)]
+    return sorted(paths, key=_delta_order)
+
+
+def base_path(dataset_folder, district):
+    """Return the path of a district's compacted incremental dataset."""
+    return Path(dataset_folder) / f"{_district_slug(district)}_incremental_reddit.pkl"
+
+
+def merge_frames(frames):
+    """
+    Merge dataset frames, appending new comments to known submissions.
+
+    Rows are matched on submission_id; comments already present (by comment
+    ID) are not duplicated. `num_comments` and `total_words` are recomputed.
+
+    Returns:
+        One DataFrame in the scraper's dataset format
+    """
+    rows = {}
+    for df in frames:
+        for rec in df.to_dict("records"):
+            sid = rec["submission_id"]
+            if sid not in rows:
+                rows[sid] = {
+                    **rec,
+                    "comments_nested": list(rec["comments_nested"]),
+                    "comments_flat": list(rec["comments_flat"]),
+                    "comment_ids": list(rec["comment_ids"]),
+                }
+                continue
+
+            row = rows[sid]
+            row["topic"] = rec["topic"]
+            seen = set(row["comment_ids"])
+            for cid, nested, flat in zip(
+                rec["comment_ids"], rec["comments_nested"], rec["comments_flat"]
+            ):
+                if cid not in seen:
+                    row["comment_ids"].append(cid)
+                    row["comments_nested"].append(nested)
+                    row["comments_flat"].append(flat)
+
+    merged = pd.DataFrame(list(rows.values()), columns=DATASET_COLUMNS)
+    merged["num_comments"] = merged["comments_flat"].apply(len)
+    merged["total_words"] = merged["comments_flat"].apply(total_word_count)
+    return merged
+
+
+def load_incremental(dataset_folder, district):
+    """Load a district's base dataset with every delta applied."""
+    base = base_path(dataset_folder, district)
+    frames = [pd.read_pickle(base)] if base.exists() else []
+    frames += [pd.read_pickle(p) for p in delta_paths(dataset_folder, district)]
+    return merge_frames(frames)
+
+
+def compact(dataset_folder, district):
+    """
+    Fold all deltas into the base dataset and delete the delta files.
+
+    Returns:
+        Path of the compacted base dataset
+    """
+    deltas = delta_paths(dataset_folder, district)
+    merged = load_incremental(dataset_folder, district)
+    path = base_path(dataset_folder, district)
+
+    # write to a temp file first so a crash never leaves a half-written base
+    tmp = path.with_suffix(".tmp")
+    merged.to_pickle(tmp)
+    tmp.replace(path)
+    for delta in deltas:
+        delta.unlink()
+    return path
+
+
+def scrape_incremental(engine, districts, options, dataset_folder, index=None,
+                       **fetch_kwargs):
+    """
+    Fetch only what changed since the last run and save it as deltas.
+
+    Args:
+        engine: reddit_scraper.FetchEngine
+        districts: District names
+        options: Topic keywords for `query_builder`
+        dataset_folder: Folder for deltas, base datasets and the index
+        index: ScrapeIndex (default: the one in `dataset_folder`)
+        **fetch_kwargs: Passed to `FetchEngine.fetch_districts`
+            (subreddit_name, limit, min_score, ...)
+
+    Returns:
+        Dict of district -> delta path (None when nothing was new)
+    """
+    index = index or ScrapeIndex(dataset_folder)
+    frames = engine.fetch_districts(districts, options, index=index, **fetch_kwargs)
+
+    saved = {}
+    for district, df in frames.items():
+        df["num_comments"] = df["comments_flat"].apply(len)
+        df["total_words"] = df["comments_flat"].apply(total_word_count)
+        saved[district] = save_delta(df, district, dataset_folder)
+        index.record(district, engine.fetched.get(district, {}), df)
+        n_new = int(df["num_comments"].sum())
+        print(f"{district}: {len(df)} submissions with {n_new} new comments")
+    return saved
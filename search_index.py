@@ -0,0 +1,454 @@
+"""Full-Text Search over Scraped Comments
+====================================================
+
+A positional inverted index (term -> documents -> positions) over the
+cleaned district datasets, so the app's Query Builder can search data
+that has already been scraped, offline, in milliseconds, instead of
+calling the Reddit API or scanning every `comments_flat` list.
+
+Documents are every post title (comment_idx -1) and every comment. Terms
+are the tokens of the cleaned text; query words go through the same
+cleaner, so "Teachers," matches "teachers" and stopwords are ignored on
+both sides: a query word that cleans to nothing is dropped from the query
+("schools OR the" is "schools", and a query of only such words matches
+every document).
+
+Queries use the `reddit_scraper.query_builder` syntax:
+
+- ``teachers`` - a term; ``"palo alto"`` - a phrase (consecutive terms)
+- ``a b`` or ``a AND b`` - both; ``a OR b`` - either; ``NOT a`` / ``-a``
+- parentheses group: ``"Palo Alto" (schools OR teachers)``
+
+Layout of `artefacts/search_index/`:
+
+- ``terms.txt`` - sorted terms, line number = term ID
+- ``term_offsets.npy`` - postings of term t are [term_offsets[t], term_offsets[t + 1])
+- ``posting_docs.npy`` - document ID of each posting, ascending per term
+- ``position_offsets.npy`` / ``positions.npy`` - token positions per posting
+- ``docs.parquet`` - district, dataset, post_id, comment_idx, title, text
+- ``meta.json`` - source datasets (size/mtime), written last
+
+Usage:
+    $ python search_index.py build
+    $ python search_index.py search '"Palo Alto" (schools OR teachers)'
+
+    >>> get_search_index().search("homework OR tests", district="Palo Alto")
+
+Author: ADS 509 Team"""
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from artefact_store import ARTEFACT_DIR, discover_datasets
+from notebook_modules import text_processing
+
+INDEX_DIR = ARTEFACT_DIR / "search_index"
+
+# Bump when the index layout changes; older indexes are rebuilt
+INDEX_VERSION = 1
+
+_ARRAYS = ("term_offsets", "posting_docs", "position_offsets", "positions")
+
+# Query tokens: quoted phrases, parentheses, everything else up to a space
+_QUERY_TOKEN = re.compile(r'"[^"]*"|[()]|[^\s()"]+')
+
+
+def _source_signature(path):
+    stat = Path(path).stat()
+    return {"name": Path(path).name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _ranges(starts, ends):
+    """Concatenation of arange(s, e) for every pair, without a Python loop."""
+    lengths = ends - starts
+    if not lengths.sum():
+        return np.array([], dtype=np.int64)
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return np.arange(lengths.sum()) + shifts
+
+
+# --------------------------------------------
+# ✅ Building the Index
+# --------------------------------------------
+def _district_docs(district, path):
+    """Document table and cleaned texts (title first, then comments) of one dataset."""
+    from dataset_store import load_dataset
+
+    df = load_dataset(path, columns=["topic", "comments_flat", "cleaned_comments"])
+    titles = text_processing().clean_corpus(list(df["topic"]), cache=True)
+
+    docs = {"post_id": [], "comment_idx": [], "title": [], "text": []}
+    cleaned = []
+    for post_id, (topic, title, comments, clean) in enumerate(
+            zip(df["topic"], titles, df["comments_flat"], df["cleaned_comments"])):
+        n = len(comments)
+        docs["post_id"].extend([post_id] * (n + 1))
+        docs["comment_idx"].extend(range(-1, n))
+        docs["title"].extend([topic] * (n + 1))
+        docs["text"].extend([topic, *comments])
+        cleaned.append([title, *clean])
+
+    docs = pd.DataFrame(docs)
+    docs.insert(0, "dataset", Path(path).name)
+    docs.insert(0, "district", district)
+    return docs, cleaned
+
+
+def build_index(datasets=None, folder=INDEX_DIR):
+    """
+    Index the cleaned datasets and write the index to `folder`.
+
+    Args:
+        datasets: Dict of district -> dataset path (default: the newest
+            cleaned dataset of every district)
+        folder: Target folder; replaced as a whole at the end
+
+    Returns:
+        SearchIndex over the written files
+    """
+    tp = text_processing()
+    datasets = datasets or discover_datasets()
+
+    tables, words, term_ids, doc_ids, positions = [], [], [], [], []
+    n_docs = 0
+    for district, path in datasets.items():
+        docs, cleaned = _district_docs(district, path)
+        tokens = tp.TokenizedPosts.from_posts(cleaned)
+        lengths = tokens.comment_lengths
+        token_doc = np.repeat(np.arange(len(lengths)), lengths)
+
+        tables.append(docs)
+        words.append(np.array(tokens.words, dtype=object))
+        term_ids.append(np.asarray(tokens.token_ids, dtype=np.int64))
+        doc_ids.append(token_doc + n_docs)
+        positions.append(np.arange(len(token_doc)) - tokens.comment_offsets[token_doc])
+        n_docs += len(docs)
+
+    # one sorted vocabulary across districts; local token IDs -> global term IDs
+    terms = np.unique(np.concatenate(words)) if words else np.array([], dtype=object)
+    term = np.concatenate([np.searchsorted(terms, w)[ids] for w, ids in zip(words, term_ids)]
+                          or [np.array([], dtype=np.int64)])
+    doc = np.concatenate(doc_ids or [np.array([], dtype=np.int64)])
+    pos = np.concatenate(positions or [np.array([], dtype=np.int64)])
+
+    order = np.lexsort((pos, doc, term))
+    term, doc, pos = term[order], doc[order], pos[order]
+    new_posting = np.r_[True, (term[1:] != term[:-1]) | (doc[1:] != doc[:-1])] if len(term) \
+        else np.array([], dtype=bool)
+    starts = np.flatnonzero(new_posting)
+
+    arrays = {
+        "term_offsets": np.searchsorted(term[starts], np.arange(len(terms) + 1)).astype(np.int64),
+        "posting_docs": doc[starts].astype(np.int32),
+        "position_offsets": np.r_[starts, len(term)].astype(np.int64),
+        "positions": pos.astype(np.int32),
+    }
+    docs = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(
+        columns=["district", "dataset", "post_id", "comment_idx", "title", "text"])
+    sources = {district: _source_signature(path) for district, path in datasets.items()}
+    return save_index(terms, arrays, docs, sources, folder)
+
+
+def save_index(terms, arrays, docs, sources, folder=INDEX_DIR):
+    """Write index files to a temporary folder and swap it in; returns the loaded index."""
+    folder = Path(folder)
+    tmp = folder.with_name(f"{folder.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    (tmp / "terms.txt").write_text("\n".join(terms), encoding="utf-8")
+    for name in _ARRAYS:
+        np.save(tmp / f"{name}.npy", arrays[name])
+    docs.to_parquet(tmp / "docs.parquet", index=False)
+    meta = {
+        "version": INDEX_VERSION,
+        "n_terms": len(terms),
+        "n_docs": len(docs),
+        "sources": sources,
+        "built_at": time.time(),
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    old = folder.with_name(f"{folder.name}.old-{os.getpid()}")
+    if folder.exists():
+        folder.rename(old)
+    tmp.rename(folder)
+    shutil.rmtree(old, ignore_errors=True)
+    return load_index(folder)
+
+
+def load_index(folder=INDEX_DIR, mmap_mode="r"):
+    """
+    Open a stored index.
+
+    Returns:
+        SearchIndex, or None when the folder holds no (current) index
+    """
+    folder = Path(folder)
+    meta_path = folder / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text())
+    if meta.get("version") != INDEX_VERSION:
+        return None
+
+    terms = (folder / "terms.txt").read_text(encoding="utf-8").split("\n") if meta["n_terms"] else []
+    arrays = {name: np.load(folder / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAYS}
+    docs = pd.read_parquet(folder / "docs.parquet")
+    return SearchIndex(terms, arrays, docs, meta)
+
+
+def index_is_current(datasets=None, folder=INDEX_DIR):
+    """True when the stored index was built from exactly these dataset files."""
+    path = Path(folder) / "meta.json"
+    if not path.exists():
+        return False
+    meta = json.loads(path.read_text())
+    datasets = datasets or discover_datasets()
+    sources = {district: _source_signature(p) for district, p in datasets.items()}
+    return meta.get("version") == INDEX_VERSION and meta.get("sources") == sources
+
+
+@lru_cache(maxsize=None)
+def get_search_index(folder=INDEX_DIR):
+    """Return the process-wide index (None when it has not been built)."""
+    return load_index(folder)
+
+
+# --------------------------------------------
+# ✅ Queries
+# --------------------------------------------
+def parse_query(query):
+    """
+    Parse a query string into a nested tuple tree.
+
+    Nodes are ("term", word), ("phrase", text), ("and", a, b),
+    ("or", a, b), ("not", a) and ("all",) for an empty query.
+
+    Raises:
+        ValueError: On unbalanced parentheses or a dangling operator
+    """
+    tokens = _QUERY_TOKEN.findall(query)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "OR":
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_unary()
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                take()
+            node = ("and", node, parse_unary())
+        return node
+
+    def parse_unary():
+        token = peek()
+        if token is None or token in (")", "OR", "AND"):
+            raise ValueError(f"❌ Expected a term at position {pos} in query: {query!r}")
+        take()
+        if token == "NOT":
+            return ("not", parse_unary())
+        if token.startswith("-") and len(token) > 1:
+            return ("not", ("term", token[1:]))
+        if token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError(f"❌ Missing ')' in query: {query!r}")
+            take()
+            return node
+        if token.startswith('"'):
+            return ("phrase", token.strip('"'))
+        return ("term", token)
+
+    if not tokens:
+        return ("all",)
+    tree = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"❌ Unexpected {tokens[pos]!r} in query: {query!r}")
+    return tree
+
+
+class SearchIndex:
+    """
+    Positional inverted index loaded from disk (arrays may be memory-mapped).
+
+    Args:
+        terms: Sorted list of terms (position = term ID)
+        arrays: Dict with term_offsets, posting_docs, position_offsets and
+            positions (see the module docstring)
+        docs: Document table, one row per document ID
+        meta: Contents of meta.json
+    """
+
+    def __init__(self, terms, arrays, docs, meta=None):
+        self.terms = terms
+        self.term_ids = {t: i for i, t in enumerate(terms)}
+        self.term_offsets = arrays["term_offsets"]
+        self.posting_docs = arrays["posting_docs"]
+        self.position_offsets = arrays["position_offsets"]
+        self.positions = arrays["positions"]
+        self.docs = docs
+        self.meta = meta or {}
+        self._max_position = int(self.positions.max()) if len(self.positions) else 0
+
+    @property
+    def n_docs(self):
+        return len(self.docs)
+
+    @property
+    def districts(self):
+        return list(self.meta.get("sources", {}))
+
+    def _clean(self, text):
+        """Query text -> index terms, using the cleaner the index was built with."""
+        return text_processing().clean_text(text).split()
+
+    def _postings(self, term_id):
+        """Slice of posting indexes of one term."""
+        return slice(int(self.term_offsets[term_id]), int(self.term_offsets[term_id + 1]))
+
+    def term_docs(self, term):
+        """Sorted document IDs containing an (already cleaned) term."""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.array([], dtype=np.int64)
+        return np.asarray(self.posting_docs[self._postings(term_id)], dtype=np.int64)
+
+    def phrase_docs(self, words):
+        """Sorted document IDs containing the cleaned `words` consecutively."""
+        if not words:
+            return np.arange(self.n_docs)
+        candidates = self.term_docs(words[0])
+        for word in words[1:]:
+            candidates = np.intersect1d(candidates, self.term_docs(word), assume_unique=True)
+        if len(words) == 1 or not len(candidates):
+            return candidates
+
+        # key = doc * stride + (position - offset in phrase); a doc matches when
+        # every word yields the same key
+        stride = self._max_position + len(words) + 1
+        keys = None
+        for offset, word in enumerate(words):
+            postings = self._postings(self.term_ids[word])
+            docs = np.asarray(self.posting_docs[postings])
+            idx = postings.start + np.searchsorted(docs, candidates)
+            starts = np.asarray(self.position_offsets[idx])
+            ends = np.asarray(self.position_offsets[idx + 1])
+            owner = np.repeat(candidates, ends - starts)
+            pos = np.asarray(self.positions[_ranges(starts, ends)], dtype=np.int64)
+            word_keys = np.unique(owner * stride + pos - offset + len(words))
+            keys = word_keys if keys is None else np.intersect1d(keys, word_keys,
+                                                                 assume_unique=True)
+        return np.unique(keys // stride)
+
+    def _evaluate(self, node):
+        """Matching document IDs, or None for a node with no terms left."""
+        kind = node[0]
+        if kind == "all":
+            return None
+        if kind in ("term", "phrase"):
+            words = self._clean(node[1])
+            return self.phrase_docs(words) if words else None
+        if kind == "not":
+            inner = self._evaluate(node[1])
+            if inner is None:
+                return None
+            return np.setdiff1d(np.arange(self.n_docs), inner, assume_unique=True)
+        left, right = self._evaluate(node[1]), self._evaluate(node[2])
+        if left is None or right is None:
+            return right if left is None else left
+        if kind == "and":
+            return np.intersect1d(left, right, assume_unique=True)
+        return np.union1d(left, right)
+
+    def match(self, query, district=None):
+        """
+        Document IDs matching a query.
+
+        Args:
+            query: Query string (see the module docstring)
+            district: Optional district name to restrict the results to
+
+        Returns:
+            Sorted NumPy array of document IDs
+        """
+        doc_ids = self._evaluate(parse_query(query))
+        if doc_ids is None:
+            doc_ids = np.arange(self.n_docs)
+        if district is not None:
+            doc_ids = doc_ids[self.docs["district"].to_numpy()[doc_ids] == district]
+        return doc_ids
+
+    def search(self, query, district=None, limit=None):
+        """
+        Matching documents as a table.
+
+        Returns:
+            DataFrame with district, dataset, post_id, comment_idx (-1 for
+            the post title), title and text, in dataset order
+        """
+        doc_ids = self.match(query, district=district)
+        if limit is not None:
+            doc_ids = doc_ids[:limit]
+        return self.docs.iloc[doc_ids].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over scraped comments")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="index the newest cleaned dataset of every district")
+    build.add_argument("--datasets", type=Path, default=None)
+    build.add_argument("--force", action="store_true", help="rebuild even when up to date")
+    search = sub.add_parser("search", help="run a query against the stored index")
+    search.add_argument("query")
+    search.add_argument("--district")
+    search.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        datasets = discover_datasets(args.datasets)
+        if not args.force and index_is_current(datasets):
+            print(f"✅ Index up to date ({INDEX_DIR})")
+            return
+        start = time.perf_counter()
+        index = build_index(datasets)
+        print(f"✅ Indexed {index.n_docs:,} documents, {len(index.terms):,} terms "
+              f"in {time.perf_counter() - start:.1f}s → {INDEX_DIR}")
+    elif args.command == "search":
+        index = get_search_index()
+        if index is None:
+            raise SystemExit("❌ No search index; run `python search_index.py build`")
+        index.match("warm up")  # first query imports the cleaner
+        start = time.perf_counter()
+        doc_ids = index.match(args.query, district=args.district)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{len(doc_ids):,} documents in {elapsed:.1f} ms")
+        results = index.docs.iloc[doc_ids[:args.limit]]
+        for row in results.itertuples():
+            text = " ".join(row.text.split())[:100]
+            print(f"  [{row.district} #{row.post_id}/{row.comment_idx}] {text}")
+
+
+if __name__ == "__main__":
+    main()
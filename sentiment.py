@@ -0,0 +1,148 @@
+"""Sentiment Scoring for Reddit Text
+====================================================
+
+One VADER analyzer per process, shared by the Streamlit app
+(`reddit_utils.fetch_reddit_posts`) and the notebooks, with a batch API
+that scores whole lists/Series at once and can fan out to a process pool
+for large corpora.
+
+Author: ADS 509 Team"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib.metadata import version
+
+import numpy as np
+
+from instrumentation import count, timer
+from nltk_resources import require
+from parallel import resolve_n_jobs
+from result_cache import resolve_cache
+
+# Compound-score cut-offs for the Positive / Negative labels
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Batches smaller than this are scored serially even when n_jobs > 1
+PARALLEL_MIN_TEXTS = 5_000
+
+# Number of chunks handed to each worker process
+CHUNKS_PER_WORKER = 4
+
+# Result-cache namespace; includes the NLTK version so an upgraded analyzer
+# never serves scores computed by an older one
+CACHE_NAMESPACE = f"vader:{version('nltk')}"
+
+
+# --------------------------------------------
+# ✅ Shared Analyzer
+# --------------------------------------------
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """
+    Return the process-wide VADER analyzer (lexicon is loaded once).
+
+    NLTK is imported here rather than at module level: importing it takes
+    seconds, and callers such as the Streamlit app rarely need the analyzer.
+    """
+    require("vader_lexicon")
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    return SentimentIntensityAnalyzer()
+
+
+def label_scores(scores):
+    """
+    Map compound scores to "Positive" / "Negative" / "Neutral" labels.
+
+    Args:
+        scores: Array-like of compound scores
+
+    Returns:
+        NumPy array of labels
+    """
+    scores = np.asarray(scores, dtype=float)
+    return np.select(
+        [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+        ["Positive", "Negative"],
+        default="Neutral",
+    ).astype(object)
+
+
+def score_text(text):
+    """Return the compound sentiment score of one text (non-strings score 0)."""
+    if not isinstance(text, str) or not text:
+        return 0.0
+    return get_analyzer().polarity_scores(text)["compound"]
+
+
+# --------------------------------------------
+# ✅ Batch Scoring
+# --------------------------------------------
+def _score_chunk(texts):
+    """Worker task: score a chunk of texts with this process's analyzer."""
+    return [score_text(t) for t in texts]
+
+
+def _score_texts(texts, n_jobs=1, executor=None):
+    """Score a list of texts serially or on a process pool, in input order."""
+    n_workers = resolve_n_jobs(n_jobs)
+
+    if (executor is None and n_workers == 1) or len(texts) < PARALLEL_MIN_TEXTS:
+        return _score_chunk(texts)
+
+    size = max(1, -(-len(texts) // (n_workers * CHUNKS_PER_WORKER)))
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    pool = executor or ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        return [s for chunk in pool.map(_score_chunk, chunks) for s in chunk]
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+
+@timer("sentiment.score_many")
+def score_many(texts, n_jobs=1, executor=None, cache=None):
+    """
+    Score a batch of texts with one shared analyzer.
+
+    Args:
+        texts: List or pandas Series of texts
+        n_jobs: Number of worker processes (default: 1 = serial, -1 = all
+            cores); with `executor`, the number of workers it has (sets the
+            number of chunks)
+        executor: Optional existing `concurrent.futures.Executor` to reuse;
+            it is not shut down
+        cache: Optional persistent result cache - True for the shared
+            on-disk cache, or a `result_cache.ResultCache`; only texts not
+            scored before are sent to the analyzer
+
+    Returns:
+        Tuple of NumPy arrays (scores, labels), in input order
+
+    Example:
+        >>> scores, labels = score_many(["Great teachers!", "Unsafe campus."])
+        >>> list(labels)
+        ['Positive', 'Negative']
+    """
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    count("sentiment.texts", len(texts))
+    cache = resolve_cache(cache, CACHE_NAMESPACE)
+
+    if cache is None:
+        scores = _score_texts(texts, n_jobs=n_jobs, executor=executor)
+    else:
+        scores = cache.map(
+            texts, lambda missing: _score_texts(missing, n_jobs=n_jobs, executor=executor)
+        )
+
+    scores = np.asarray(scores, dtype=float)
+    return scores, label_scores(scores)
+
+
+def analyze_sentiment(text, cache=None):
+    """Return compound sentiment score and label."""
+    if cache:
+        scores, labels = score_many([text], cache=cache)
+        return float(scores[0]), labels[0]
+    score = score_text(text)
+    return score, label_scores([score])[0]
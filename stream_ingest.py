@@ -0,0 +1,411 @@
+"""Streaming Ingestion from Reddit to Disk
+====================================================
+
+Scrapes a district in constant memory and can resume after a crash.
+`build_df_for_query` keeps every submission's comments in memory until
+the end. Here, instead:
+
+- Submissions come out of a generator that pulls one search page (100
+  submissions) at a time, and each submission's filtered comments come
+  out of `reddit_scraper.iter_comments`.
+- Comments are buffered up to `batch_size`, then cleaned (TextCleaner,
+  with the shared result cache) and VADER-scored as a batch.
+- Each batch is written as one Parquet part, in the long one-row-per-comment
+  layout of dataset_store.py, plus per-comment ``comment_score`` /
+  ``comment_label``. A batch always ends at a submission boundary.
+- After each part, ``checkpoint.json`` records the parts and the
+  submissions they contain. A re-run resumes from there: finished
+  submissions are skipped without fetching their comments, and a part
+  written after the last checkpoint is discarded.
+
+Folder per district: ``datasets/<District>_stream_reddit/`` with
+``part-00000.parquet``, ... and ``checkpoint.json``. `finalize` copies the
+parts row group by row group into one ``<District>_stream_reddit.parquet``,
+which `dataset_store.load_dataset` reads like any other dataset.
+
+Usage:
+    $ python stream_ingest.py run "Palo Alto" --limit 1000 --batch-size 2000
+    $ python stream_ingest.py status "Palo Alto"
+    $ python stream_ingest.py finalize "Palo Alto"
+
+    >>> summary = ingest("Palo Alto", options=["schools", "teachers"], limit=1000)
+    >>> df = load_stream(stream_dir("Palo Alto"))       # one row per post
+
+Author: ADS 509 Team"""
+import argparse
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dataset_store import ROW_GROUP_SIZE, _METADATA_KEY, to_posts
+import instrumentation
+from instrumentation import count, timer
+from notebook_modules import get_cleaner
+from reddit_scraper import (
+    SEARCH_PAGE_SIZE,
+    FetchEngine,
+    iter_comments,
+    query_builder,
+    total_word_count,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DATASET_DIR = PROJECT_ROOT / "datasets"
+
+# Comments cleaned, scored and written per part (bounds memory)
+BATCH_SIZE = 2_000
+
+# Bump when the part layout changes; older checkpoints are not resumed
+STREAM_VERSION = 1
+
+# Long layout of every part (dataset_store column names)
+PART_SCHEMA = pa.schema([
+    ("post_id", pa.int32()),
+    ("comment_idx", pa.int32()),
+    ("source", pa.string()),
+    ("query", pa.string()),
+    ("topic", pa.string()),
+    ("submission_id", pa.string()),
+    ("created_utc", pa.float64()),
+    ("num_comments", pa.int64()),
+    ("total_words", pa.int64()),
+    ("comment", pa.string()),
+    ("comment_id", pa.string()),
+    ("cleaned_comment", pa.string()),
+    ("comment_score", pa.float64()),
+    ("comment_label", pa.string()),
+])
+
+# Post-layout column order restored on load (see dataset_store.to_posts)
+POST_COLUMNS = [
+    "source", "query", "topic", "comments_nested", "comments_flat",
+    "submission_id", "created_utc", "comment_ids", "num_comments", "total_words",
+    "cleaned_comments", "comment_scores", "comment_labels",
+]
+
+
+def stream_dir(district, folder=DATASET_DIR):
+    return Path(folder) / f"{district.replace(' ', '_')}_stream_reddit"
+
+
+# --------------------------------------------
+# ✅ Generators
+# --------------------------------------------
+def iter_submissions(engine, query, subreddit_name="all", limit=1000,
+                     sort="relevance", time_filter="all"):
+    """
+    Yield search results one page (`SEARCH_PAGE_SIZE` submissions) at a time.
+
+    Each page is one rate-limited, retried `FetchEngine.call`; later pages
+    are only requested when the consumer gets there.
+    """
+    sr = engine.reddit.subreddit(subreddit_name)
+    listing = iter(sr.search(query, sort=sort, time_filter=time_filter, limit=limit))
+    while True:
+        page = engine.call(lambda: list(islice(listing, SEARCH_PAGE_SIZE)))
+        count("reddit.api_calls")
+        count("reddit.posts", len(page))
+        yield from page
+        if len(page) < SEARCH_PAGE_SIZE:
+            return
+
+
+def iter_posts(engine, query, done=(), min_score=6, min_words=21, **search):
+    """
+    Yield (submission, [(comment_id, body), ...]) for submissions not in `done`.
+
+    Only one submission's comments are held at a time; submissions without
+    qualifying comments are skipped, as in `build_df_for_query`.
+    """
+    for subm in iter_submissions(engine, query, **search):
+        if subm.id in done:
+            count("stream.resumed_skips")
+            continue
+        try:
+            comments = engine.call(
+                lambda: list(iter_comments(subm, min_score=min_score, min_words=min_words)))
+        except Exception as e:
+            print(f"[warn] {subm.id}: {e}")
+            continue
+        if comments:
+            yield subm, comments
+
+
+# --------------------------------------------
+# ✅ Batched Writer
+# --------------------------------------------
+class StreamWriter:
+    """
+    Buffer posts, then clean, score and write them as checkpointed parts.
+
+    Args:
+        folder: Part folder (see `stream_dir`), created if missing
+        batch_size: Comments per part (a part always ends at a post boundary)
+        params: Scrape parameters; a checkpoint written with other
+            parameters is not resumed
+        cache: Result cache for cleaning and scoring (True = shared on-disk)
+    """
+
+    def __init__(self, folder, batch_size=BATCH_SIZE, params=None, cache=True):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.cache = cache
+        self.checkpoint = self._load_checkpoint(params or {})
+        self.done = set(self.checkpoint["submissions"])
+        self._posts, self._rows = [], []
+
+    @property
+    def checkpoint_path(self):
+        return self.folder / "checkpoint.json"
+
+    def _load_checkpoint(self, params):
+        fresh = {"version": STREAM_VERSION, "params": params, "parts": [],
+                 "submissions": [], "n_posts": 0, "n_comments": 0, "finished": False}
+        if self.checkpoint_path.exists():
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+            if checkpoint.get("version") == STREAM_VERSION and checkpoint.get("params") == params:
+                fresh = checkpoint
+        # parts written after the last checkpoint (or by an older run) are dropped
+        for part in self.folder.glob("part-*.parquet"):
+            if part.name not in fresh["parts"]:
+                part.unlink()
+        return fresh
+
+    def add(self, query, submission, comments):
+        """Buffer one post and its [(comment_id, body), ...]; flushes when full."""
+        # copy the fields now: the submission object holds its whole comment tree
+        post = {
+            "post_id": self.checkpoint["n_posts"],
+            "query": query,
+            "topic": (submission.title or "").strip(),
+            "submission_id": getattr(submission, "id", None),
+            "created_utc": getattr(submission, "created_utc", None),
+            "num_comments": len(comments),
+            "total_words": total_word_count(body for _, body in comments),
+        }
+        self.checkpoint["n_posts"] += 1
+        self._posts.append(post)
+        for idx, (comment_id, body) in enumerate(comments):
+            self._rows.append((post["post_id"], idx, comment_id, body))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    @timer("stream.flush")
+    def flush(self):
+        """Clean, score and write the buffered posts, then update the checkpoint."""
+        if not self._rows:
+            return None
+        from sentiment import score_many
+
+        rows, posts = self._rows, {p["post_id"]: p for p in self._posts}
+        self._rows, self._posts = [], []
+        bodies = [row[3] for row in rows]
+        scores, labels = score_many(bodies, cache=self.cache)
+        columns = {
+            "post_id": [row[0] for row in rows],
+            "comment_idx": [row[1] for row in rows],
+            "source": ["reddit"] * len(rows),
+        }
+        for col in ("query", "topic", "submission_id", "created_utc",
+                    "num_comments", "total_words"):
+            columns[col] = [posts[row[0]][col] for row in rows]
+        columns.update({
+            "comment": bodies,
+            "comment_id": [row[2] for row in rows],
+            "cleaned_comment": list(get_cleaner().clean_many(bodies, cache=self.cache)),
+            "comment_score": scores,
+            "comment_label": labels,
+        })
+        table = pa.Table.from_pydict(columns, schema=PART_SCHEMA)
+
+        name = f"part-{len(self.checkpoint['parts']):05d}.parquet"
+        tmp = self.folder / f"{name}.tmp"
+        pq.write_table(table, tmp, compression="zstd")
+        tmp.replace(self.folder / name)
+
+        new_ids = [post["submission_id"] for post in posts.values()]
+        self.checkpoint["parts"].append(name)
+        self.checkpoint["submissions"].extend(new_ids)
+        self.checkpoint["n_comments"] += len(rows)
+        self.done.update(new_ids)
+        self._write_checkpoint()
+        count("stream.parts")
+        count("stream.comments", len(rows))
+        return self.folder / name
+
+    def _write_checkpoint(self):
+        self.checkpoint["updated_at"] = time.time()
+        tmp = self.checkpoint_path.with_name("checkpoint.json.tmp")
+        tmp.write_text(json.dumps(self.checkpoint, indent=1))
+        tmp.replace(self.checkpoint_path)
+
+    def close(self, finished=True):
+        """Flush what is left; with `finished`, mark the scrape complete."""
+        self.flush()
+        self.checkpoint["finished"] = finished
+        self._write_checkpoint()
+        return self.checkpoint
+
+
+# --------------------------------------------
+# ✅ Ingest / Load
+# --------------------------------------------
+def ingest(district, options, folder=DATASET_DIR, subreddit_name="all", limit=1000,
+           sort="relevance", time_filter="all", min_score=6, min_words=21,
+           batch_size=BATCH_SIZE, engine=None, cache=True):
+    """
+    Stream one district's scrape to checkpointed Parquet parts.
+
+    Resumes the previous run for the same district and parameters; a
+    finished scrape is not fetched again.
+
+    Args:
+        district: District name, e.g. "Palo Alto"
+        options: Topic keywords passed to `query_builder`
+        folder: Dataset folder; parts go to `stream_dir(district, folder)`
+        subreddit_name, limit, sort, time_filter, min_score, min_words:
+            Same as `build_df_for_query`
+        batch_size: Comments per part
+        engine: `FetchEngine` to use (default: a new one on the shared client)
+        cache: Result cache for cleaning and scoring
+
+    Returns:
+        The checkpoint dict (parts, submissions, n_posts, n_comments, finished)
+    """
+    query = query_builder(district, options)
+    params = {"query": query, "subreddit_name": subreddit_name, "limit": limit,
+              "sort": sort, "time_filter": time_filter, "min_score": min_score,
+              "min_words": min_words}
+    writer = StreamWriter(stream_dir(district, folder), batch_size=batch_size,
+                          params=params, cache=cache)
+    if writer.checkpoint["finished"]:
+        print(f"✅ {district}: already complete ({writer.checkpoint['n_comments']:,} comments)")
+        return writer.checkpoint
+
+    if writer.done:
+        print(f"↪️ {district}: resuming after {len(writer.done)} submissions")
+    engine = engine or FetchEngine()
+    posts = iter_posts(engine, query, done=writer.done, min_score=min_score,
+                       min_words=min_words, subreddit_name=subreddit_name, limit=limit,
+                       sort=sort, time_filter=time_filter)
+    finished = False
+    with instrumentation.run(f"stream:{district}", limit=limit, batch_size=batch_size):
+        try:
+            for subm, comments in posts:
+                writer.add(query, subm, comments)
+            finished = True
+        finally:
+            # on an error, keep what was fetched so the next run resumes after it
+            checkpoint = writer.close(finished)
+    print(f"✅ {district}: {checkpoint['n_posts']:,} posts, "
+          f"{checkpoint['n_comments']:,} comments in {len(checkpoint['parts'])} parts")
+    return checkpoint
+
+
+def read_checkpoint(folder):
+    """The checkpoint of a stream folder, or None when nothing was written."""
+    path = Path(folder) / "checkpoint.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def iter_parts(folder, columns=None):
+    """Yield each checkpointed part as an Arrow table, in order."""
+    checkpoint = read_checkpoint(folder) or {"parts": []}
+    for name in checkpoint["parts"]:
+        yield pq.read_table(Path(folder) / name, columns=columns)
+
+
+def load_stream(folder, columns=None, as_posts=True):
+    """
+    Load the parts of a stream folder (finished or not).
+
+    Args:
+        folder: Stream folder (see `stream_dir`)
+        columns: Stored (long-layout) columns to read (default: all)
+        as_posts: Regroup into one row per post (default) or return the
+            long one-row-per-comment frame
+
+    Returns:
+        pandas.DataFrame
+    """
+    tables = list(iter_parts(folder, columns))
+    long = (pa.concat_tables(tables) if tables else PART_SCHEMA.empty_table()).to_pandas()
+    if not as_posts:
+        return long
+    return to_posts(long, columns=POST_COLUMNS)
+
+
+def finalize(district, folder=DATASET_DIR):
+    """
+    Merge a district's parts into ``<District>_stream_reddit.parquet``.
+
+    Parts are copied one at a time, so memory stays at one part; the file
+    is readable with `dataset_store.load_dataset`.
+
+    Returns:
+        Path of the written file
+    """
+    parts = stream_dir(district, folder)
+    checkpoint = read_checkpoint(parts)
+    if not checkpoint or not checkpoint["parts"]:
+        raise FileNotFoundError(f"❌ No streamed parts in {parts}")
+    if not checkpoint["finished"]:
+        print(f"⚠️ {district}: scrape not finished; finalizing the parts so far")
+
+    path = parts.with_name(f"{parts.name}.parquet")
+    metadata = {_METADATA_KEY: json.dumps({"columns": POST_COLUMNS}).encode()}
+    tmp = path.with_name(f"{path.name}.tmp")
+    with pq.ParquetWriter(tmp, PART_SCHEMA.with_metadata(metadata),
+                          compression="zstd") as out:
+        for table in iter_parts(parts):
+            out.write_table(table, row_group_size=ROW_GROUP_SIZE)
+    tmp.replace(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming district ingestion")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="scrape (or resume) districts into parts")
+    run_cmd.add_argument("districts", nargs="+")
+    run_cmd.add_argument("--options", nargs="+", default=["school", "schools", "district",
+                                                          "education", "teacher", "teachers"])
+    run_cmd.add_argument("--limit", type=int, default=1000)
+    run_cmd.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    run_cmd.add_argument("--finalize", action="store_true",
+                         help="merge the parts into one Parquet file when done")
+    for name in ("status", "finalize"):
+        cmd = sub.add_parser(name, help=f"{name} of streamed districts")
+        cmd.add_argument("districts", nargs="+")
+    for cmd in sub.choices.values():
+        cmd.add_argument("--folder", type=Path, default=DATASET_DIR)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        engine = FetchEngine()
+        for district in args.districts:
+            ingest(district, args.options, folder=args.folder, limit=args.limit,
+                   batch_size=args.batch_size, engine=engine)
+            if args.finalize:
+                print(f"✅ → {finalize(district, args.folder)}")
+    elif args.command == "status":
+        for district in args.districts:
+            checkpoint = read_checkpoint(stream_dir(district, args.folder))
+            if checkpoint is None:
+                print(f"{district}: not started")
+                continue
+            state = "finished" if checkpoint["finished"] else "in progress"
+            print(f"{district}: {state}, {checkpoint['n_posts']:,} posts, "
+                  f"{checkpoint['n_comments']:,} comments, {len(checkpoint['parts'])} parts")
+    elif args.command == "finalize":
+        for district in args.districts:
+            print(f"✅ {district} → {finalize(district, args.folder)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
+import json
+import time
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 
+import artefact_store
+import district_comparison
+import instrumentation
+import search_index
+
 # -----------------------------
 # Load Data (placeholder until scraping is complete)
 # -----------------------------
@@ -25,13 +34,96 @@ def load_demo_data():
 
 df = load_demo_data()
 
+# District Comparison layout
+METRICS_PER_ROW = 4
+WORDCLOUDS_PER_ROW = 3
+
+# -----------------------------
+# Precomputed Artefacts (built by `python artefact_store.py build`)
+# -----------------------------
+# Every loader takes the artefact version, so a rebuilt dataset gets new
+# cache entries while unchanged districts stay cached across sessions.
+@st.cache_data(ttl=60)
+def artefact_index():
+    return artefact_store.list_artefacts()
+
+
+@st.cache_data(max_entries=64)
+def load_artefact_table(district, name, version):
+    return artefact_store.load_table(district, name)
+
+
+@st.cache_data(max_entries=64)
+def load_artefact_summary(district, version):
+    return artefact_store.load_summary(district)
+
+
+@st.cache_resource(max_entries=16)
+def load_artefact_wordcloud(district, version):
+    return artefact_store.load_wordcloud(district)
+
+
+@st.cache_data(max_entries=16)
+def load_comparison(selection):
+    """
+    Comparison tables for a tuple of (district, version) pairs.
+
+    All districts go through `district_comparison.compare_districts` as one
+    long frame, so the cost grows with the number of posts, not districts.
+    """
+    long = district_comparison.combine(
+        {district: load_artefact_table(district, "posts", version)
+         for district, version in selection})
+    comparison = district_comparison.compare_districts(long)
+    comparison["posts"] = long[["district", "title", "num_comments", "sentiment_label"]]
+    return comparison
+
+
+@st.cache_data(max_entries=64)
+def load_topic_summary(path, mtime_ns):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+@st.cache_resource
+def get_reddit_utils():
+    """Import reddit_utils (praw, NLTK, ...) on first use, once per server."""
+    import reddit_utils
+    return reddit_utils
+
+
+@st.cache_resource(max_entries=1)
+def load_search_index(built_at):
+    """Search index over the scraped datasets; reloaded when it is rebuilt."""
+    index = search_index.load_index()
+    if index is not None:
+        index.match("school")  # loads the query cleaner once, not on the first search
+    return index
+
+
+@st.cache_resource
+def get_review_batcher():
+    """Classifier model loaded once per server, shared by all sessions."""
+    import review_classifier
+    return review_classifier.get_batcher()
+
+
+def color_sentiment(val):
+    """Background color for a sentiment label cell."""
+    if val == "Positive":
+        color = "lightgreen"
+    elif val == "Negative":
+        color = "salmon"
+    else:
+        color = "lightgray"
+    return f"background-color: {color}"
+
 # -----------------------------
 # Sidebar Navigation
 # -----------------------------
 st.sidebar.title("📚 ADS-509 School Reviews App")
 page = st.sidebar.radio(
     "Navigate",
-    ["🏠 Home", "📝 Classifier", "🔍 Topics", "📊 Data Explorer", "🔎 Query Builder", "🏫 District Comparison", "ℹ️ About"]
+    ["🏠 Home", "📝 Classifier", "🔍 Topics", "📊 Data Explorer", "🔎 Query Builder", "🏫 District Comparison", "🩺 Diagnostics", "ℹ️ About"]
 )
 
 # -----------------------------
@@ -57,15 +149,33 @@ if page == "🏠 Home":
 # -----------------------------
 elif page == "📝 Classifier":
     st.title("Text Classifier")
-    st.write("Paste a review below to see if it’s predicted as Positive or Negative.")
+    st.write("Paste a review below to see if it’s predicted as Positive, Negative or Neutral. "
+             "Several reviews can be classified at once, one per line.")
 
     user_input = st.text_area("Review text:", "")
     if st.button("Classify"):
-        if user_input.strip():
-            # Placeholder prediction
-            st.success("Prediction: Positive (demo) with 85% confidence")
-        else:
+        reviews = [line.strip() for line in user_input.splitlines() if line.strip()]
+        if not reviews:
             st.warning("Please enter a review first.")
+        else:
+            try:
+                batcher = get_review_batcher()
+            except FileNotFoundError:
+                batcher = None
+                st.info("No classifier trained yet. Run `python review_classifier.py train`.")
+            except ValueError as e:  # saved by another CLASSIFIER_VERSION
+                batcher = None
+                st.info(f"{e} with `python review_classifier.py train`.")
+            if batcher is not None:
+                predictions = batcher.predict_many(reviews)
+                if len(reviews) == 1:
+                    label, confidence = predictions[0]
+                    st.success(f"Prediction: {label} with {confidence:.0%} confidence")
+                else:
+                    results = pd.DataFrame(predictions, columns=["Prediction", "Confidence"])
+                    results.insert(0, "Review", reviews)
+                    st.dataframe(results.style.map(color_sentiment, subset=["Prediction"])
+                                 .format({"Confidence": "{:.0%}"}))
 
 # -----------------------------
 # Topics Page
@@ -74,30 +184,73 @@ elif page == "🔍 Topics":
     st.title("Topic Modeling")
     st.write("Explore the main themes found in reviews.")
 
-    # Demo topics (replace later with LDA/NMF results)
-    demo_topics = {
-        1: ["teachers", "academics", "support"],
-        2: ["safety", "resources", "facilities"],
-        3: ["extracurriculars", "sports", "clubs"]
-    }
-    for tid, words in demo_topics.items():
-        st.write(f"**Topic {tid}:** {', '.join(words)}")
+    # Summaries written by the online LDA models (notebooks/topic_models.py);
+    # refreshed with: python notebooks/topic_models.py update "<District>"
+    models_dir = Path(__file__).resolve().parent / "models"
+    summaries = {}
+    for path in sorted(models_dir.glob("*.topics.json")):
+        summary = load_topic_summary(str(path), path.stat().st_mtime_ns)
+        summaries[summary.get("district") or path.name.split(".")[0]] = summary
+
+    if not summaries:
+        st.info("No topic models yet. Run `notebooks/04_topic_modeling.ipynb` "
+                "to fit one per district.")
+    else:
+        district = st.selectbox("District", list(summaries))
+        summary = summaries[district]
+        updated = pd.to_datetime(summary["updated_at"], unit="s")
+        st.caption(f"{summary['n_docs_seen']} posts · updated {updated:%Y-%m-%d %H:%M} UTC")
+
+        for topic in summary["topics"]:
+            st.write(f"**Topic {topic['Topic']}** ({topic['Share']:.0%} of posts): "
+                     f"{topic['Top Words']}")
+
+        history = pd.DataFrame(summary["history"])
+        if not history.empty:
+            st.subheader("Topic Drift per Update")
+            history.index = pd.to_datetime(history["updated_at"], unit="s")
+            st.line_chart(history[["drift_mean", "drift_max"]])
 
 # -----------------------------
 # Data Explorer Page
 # -----------------------------
 elif page == "📊 Data Explorer":
     st.title("Descriptive Statistics")
-    st.write("Overview of the dataset: number of reviews, average rating, sentiment distribution.")
+    st.write("Overview of the dataset: number of posts, average sentiment, sentiment distribution.")
 
-    # Summary metrics
-    st.metric("Total Reviews", len(df))
-    st.metric("Avg Rating (Palo Alto)", df[df["city"]=="Palo Alto, CA"]["rating"].mean())
-    st.metric("Avg Rating (OKC)", df[df["city"]=="Oklahoma City, OK"]["rating"].mean())
+    index = artefact_index()
+    if not index:
+        st.info("No precomputed district data yet (run `python artefact_store.py build`). "
+                "Showing demo reviews.")
 
-    # Show reviews
-    st.subheader("Sample Reviews")
-    st.dataframe(df[["school", "city", "source", "rating", "review_text"]])
+        # Summary metrics
+        st.metric("Total Reviews", len(df))
+        st.metric("Avg Rating (Palo Alto)", df[df["city"]=="Palo Alto, CA"]["rating"].mean())
+        st.metric("Avg Rating (OKC)", df[df["city"]=="Oklahoma City, OK"]["rating"].mean())
+
+        # Show reviews
+        st.subheader("Sample Reviews")
+        st.dataframe(df[["school", "city", "source", "rating", "review_text"]])
+    else:
+        summaries = [load_artefact_summary(d, m["version"]) for d, m in index.items()]
+        cols = st.columns(len(summaries))
+        for col, summary in zip(cols, summaries):
+            with col:
+                st.metric(f"{summary['District']} - Posts", summary["# Posts"])
+                st.metric(f"{summary['District']} - Avg Sentiment", summary["Avg Sentiment"])
+
+        district = st.selectbox("District", list(index))
+        version = index[district]["version"]
+        st.caption(f"Source: {index[district]['dataset']}")
+
+        st.subheader("Most Frequent Words")
+        words = load_artefact_table(district, "words", version)
+        st.bar_chart(words.head(20).set_index("word")["count"])
+
+        st.subheader("Posts")
+        posts = load_artefact_table(district, "posts", version)
+        posts = posts[["title", "num_comments", "sentiment_score", "sentiment_label"]]
+        st.dataframe(posts.style.map(color_sentiment, subset=["sentiment_label"]))
 
 # -----------------------------
 # Query Builder Page (with Reddit API)
@@ -129,27 +282,44 @@ elif page == "🔎 Query Builder":
     MIN_SCORE = st.sidebar.number_input("Minimum Score", min_value=1, value=5)
     LIMIT = st.sidebar.number_input("Number of Posts (Limit)", min_value=50, max_value=500, value=150)
 
-    st.write("### Query Preview")
-    st.code(query, language="text")
-    st.write(f"Min Words: {MIN_WORD}, Min Score: {MIN_SCORE}, Limit: {LIMIT}")
-
-    # ✅ Correct import path to reddit_utils.py (same folder)
-    if st.button("Run Query"):
-        import importlib.util, os
-
-        project_root = os.path.abspath(os.path.dirname(__file__))
-        reddit_utils_path = os.path.join(project_root, "reddit_utils.py")
+    source = st.radio("Search", ["Scraped data (offline)", "Reddit API (live)"], horizontal=True)
 
-        if not os.path.exists(reddit_utils_path):
-            st.error(f"❌ reddit_utils.py not found at: {reddit_utils_path}")
+    if source == "Scraped data (offline)":
+        # Positional index over the cleaned datasets (python search_index.py build)
+        meta_path = search_index.INDEX_DIR / "meta.json"
+        index = load_search_index(meta_path.stat().st_mtime_ns) if meta_path.exists() else None
+        if index is None:
+            st.info("No search index yet. Run `python search_index.py build`.")
         else:
-            spec = importlib.util.spec_from_file_location("reddit_utils", reddit_utils_path)
-            reddit_utils = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(reddit_utils)
+            # a district with a dataset becomes a filter, any other is searched as a phrase
+            indexed = district_name in index.districts
+            terms_part = f"({' OR '.join(selected_terms)})" if selected_terms else ""
+            default = terms_part if indexed else f'"{district_name}" {terms_part}'.strip()
+            search_query = st.text_input("Query", default)
+            try:
+                start = time.perf_counter()
+                doc_ids = index.match(search_query, district=district_name if indexed else None)
+                elapsed = (time.perf_counter() - start) * 1000
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                results = index.docs.iloc[doc_ids]
+                n_posts = len(results.drop_duplicates(["district", "post_id"]))
+                st.success(f"✅ {len(results):,} matches in {n_posts} posts ({elapsed:.1f} ms)")
+                st.dataframe(results[["district", "title", "comment_idx", "text"]].head(LIMIT))
+    else:
+        st.write("### Query Preview")
+        st.code(query, language="text")
+        st.write(f"Min Words: {MIN_WORD}, Min Score: {MIN_SCORE}, Limit: {LIMIT}")
+
+        if st.button("Run Query"):
+            reddit_utils = get_reddit_utils()
 
-            with st.spinner("Fetching Reddit posts..."):
+            with st.spinner("Fetching Reddit posts..."), \
+                    instrumentation.run("app:query_builder", district=district_name):
                 try:
-                    df_results = reddit_utils.fetch_reddit_posts(district_name, selected_terms, limit=LIMIT)
+                    df_results = reddit_utils.fetch_reddit_posts(
+                        district_name, selected_terms, limit=LIMIT, cache=True)
                     st.success(f"✅ Found {len(df_results)} Reddit posts for '{district_name}'")
 
                     st.subheader("Sample Results")
@@ -161,132 +331,174 @@ elif page == "🔎 Query Builder":
 # 🏫 District Comparison (Reddit Posts + Sentiment + Visualization)
 # -----------------------------------
 elif page == "🏫 District Comparison":
-    import sys, os, importlib.util
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    from wordcloud import WordCloud
-    import seaborn as sns
-
     st.title("🏫 District Comparison (Reddit Posts)")
-    st.subheader("Query Preview")
-
-    # Input fields for two districts
-    district1 = st.text_input("District 1", "Palo Alto")
-    district2 = st.text_input("District 2", "Oklahoma City")
 
-    # Default search terms
+    # Default search terms (used when refreshing a district from Reddit)
     selected_terms = ["schools", "district", "education", "homework", "teachers", "students"]
-    query1 = f'{district1} ({ " OR ".join(selected_terms) })'
-    query2 = f'{district2} ({ " OR ".join(selected_terms) })'
 
-    st.code(f"District 1: {query1}\nDistrict 2: {query2}", language="text")
+    # 🔄 Live refresh: fetch once, store as artefacts, then serve from the store
+    with st.expander("🔄 Refresh a district from Reddit"):
+        live_district = st.text_input("District", "Palo Alto")
+        st.code(f'{live_district} ({ " OR ".join(selected_terms) })', language="text")
+        if st.button("Fetch and Store"):
+            reddit_utils = get_reddit_utils()
 
-    # ✅ Load reddit_utils dynamically (same folder as this script)
-    project_root = os.path.abspath(os.path.dirname(__file__))
-    reddit_utils_path = os.path.join(project_root, "reddit_utils.py")
-
-    if not os.path.exists(reddit_utils_path):
-        st.error(f"❌ reddit_utils.py not found at: {reddit_utils_path}")
-    else:
-        spec = importlib.util.spec_from_file_location("reddit_utils", reddit_utils_path)
-        reddit_utils = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(reddit_utils)
-
-        if st.button("Run Comparison"):
-            with st.spinner("Fetching Reddit posts and analyzing sentiment..."):
+            with st.spinner("Fetching Reddit posts and analyzing sentiment..."), \
+                    instrumentation.run("app:refresh_district", district=live_district):
                 try:
-                    # Fetch posts for each district
-                    df1 = reddit_utils.fetch_reddit_posts(district1, selected_terms, limit=50)
-                    df2 = reddit_utils.fetch_reddit_posts(district2, selected_terms, limit=50)
-
-                    if df1.empty or df2.empty:
-                        st.warning("⚠️ One or both districts returned no Reddit results.")
+                    fetched = reddit_utils.fetch_reddit_posts(
+                        live_district, selected_terms, limit=50, cache=True)
+                    if fetched.empty:
+                        st.warning("⚠️ No Reddit results for this district.")
                     else:
-                        # Add district labels
-                        df1["district"] = district1
-                        df2["district"] = district2
-                        combined_df = pd.concat([df1, df2], ignore_index=True)
-
-                        # Display metrics
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric(label=f"{district1} - Avg Sentiment", value=round(df1['sentiment_score'].mean(), 2))
-                        with col2:
-                            st.metric(label=f"{district2} - Avg Sentiment", value=round(df2['sentiment_score'].mean(), 2))
-
-                        # 🎨 Color-coded sentiment labels
-                        def color_sentiment(val):
-                            if val == "Positive":
-                                color = "lightgreen"
-                            elif val == "Negative":
-                                color = "salmon"
-                            else:
-                                color = "lightgray"
-                            return f"background-color: {color}"
-
-                        st.subheader(f"📘 {district1} Reddit Posts")
-                        st.dataframe(df1[["title", "score", "sentiment_label"]].style.applymap(color_sentiment, subset=["sentiment_label"]))
-
-                        st.subheader(f"📗 {district2} Reddit Posts")
-                        st.dataframe(df2[["title", "score", "sentiment_label"]].style.applymap(color_sentiment, subset=["sentiment_label"]))
-
-                        # 📊 Sentiment Distribution Chart
-                        st.subheader("📊 Sentiment Distribution by District")
-                        sentiment_counts = combined_df.groupby(["district", "sentiment_label"]).size().unstack(fill_value=0)
-                        st.bar_chart(sentiment_counts)
-
-                        # ☁️ Word Clouds
-                        st.subheader("☁️ Word Clouds by District")
-                        col_wc1, col_wc2 = st.columns(2)
-
-                        with col_wc1:
-                            st.markdown(f"### {district1}")
-                            text1 = " ".join(df1["title"])
-                            if text1.strip():
-                                wc1 = WordCloud(width=500, height=300, background_color="black", colormap="cool").generate(text1)
-                                st.image(wc1.to_array(), use_container_width=True)
-                            else:
-                                st.write("No text available.")
+                        artefact_store.build_live(fetched, live_district)
+                        artefact_index.clear()
+                        st.success(f"✅ Stored {len(fetched)} posts for '{live_district}'")
+                except Exception as e:
+                    st.error(f"⚠️ Error fetching Reddit posts: {e}")
 
-                        with col_wc2:
-                            st.markdown(f"### {district2}")
-                            text2 = " ".join(df2["title"])
-                            if text2.strip():
-                                wc2 = WordCloud(width=500, height=300, background_color="black", colormap="plasma").generate(text2)
-                                st.image(wc2.to_array(), use_container_width=True)
+    # one instrumentation report per page render (ADS509_INSTRUMENT=1)
+    with instrumentation.run("app:district_comparison"):
+        index = artefact_index()
+        if len(index) < 2:
+            st.info("Two districts with precomputed data are needed. Run "
+                    "`python artefact_store.py build` or refresh districts above.")
+        else:
+            districts = list(index)
+            selected = st.multiselect("Districts", districts, default=districts)
+
+            if len(selected) < 2:
+                st.info("Select at least two districts to compare.")
+            else:
+                with instrumentation.timer("app.compare_districts"):
+                    comparison = load_comparison(
+                        tuple((d, index[d]["version"]) for d in selected))
+                summary = comparison["summary"]
+
+                # Display metrics
+                for start in range(0, len(selected), METRICS_PER_ROW):
+                    row = summary.iloc[start:start + METRICS_PER_ROW]
+                    for col, (_, district_row) in zip(st.columns(METRICS_PER_ROW), row.iterrows()):
+                        with col:
+                            st.metric(label=f"{district_row['District']} - Avg Sentiment",
+                                      value=district_row["Avg Sentiment"])
+
+                st.subheader("📘 Reddit Posts")
+                posts = comparison["posts"]
+                st.dataframe(posts.style.map(color_sentiment, subset=["sentiment_label"]),
+                             hide_index=True)
+
+                # 📊 Sentiment Distribution Chart
+                st.subheader("📊 Sentiment Distribution by District")
+                st.bar_chart(comparison["label_counts"])
+
+                # 📋 Summary Table
+                st.subheader("📋 Sentiment Summary Table")
+                st.table(summary)
+
+                # 🔤 Tokens and top words / bigrams
+                if "token_stats" in comparison:
+                    st.subheader("🔤 Token Statistics")
+                    st.table(comparison["token_stats"])
+
+                    st.subheader("🏷️ Top Words and Bigrams")
+                    col_words, col_bigrams = st.columns(2)
+                    for col, key, term in [(col_words, "top_words", "word"),
+                                           (col_bigrams, "top_bigrams", "bigram")]:
+                        top = comparison[key]
+                        # one column per district: "word (count)" by rank
+                        cells = top[term] + " (" + top["count"].astype(str) + ")"
+                        with col:
+                            st.dataframe(top.assign(**{term: cells})
+                                         .pivot(index="rank", columns="District", values=term))
+
+                # ☁️ Word Clouds (rendered at build time)
+                st.subheader("☁️ Word Clouds by District")
+                for start in range(0, len(selected), WORDCLOUDS_PER_ROW):
+                    row = selected[start:start + WORDCLOUDS_PER_ROW]
+                    for col, district in zip(st.columns(WORDCLOUDS_PER_ROW), row):
+                        with col:
+                            st.markdown(f"### {district}")
+                            with instrumentation.timer("app.load_wordcloud"):
+                                image = load_artefact_wordcloud(district, index[district]["version"])
+                            if image is not None:
+                                st.image(image, use_container_width=True)
                             else:
                                 st.write("No text available.")
 
-                        # 📋 Summary Table
-                        st.subheader("📋 Sentiment Summary Table")
-                        summary_data = []
-                        for df, name in [(df1, district1), (df2, district2)]:
-                            summary_data.append({
-                                "District": name,
-                                "# Posts": len(df),
-                                "Avg Sentiment": round(df["sentiment_score"].mean(), 2),
-                                "% Positive": round((df["sentiment_label"] == "Positive").mean() * 100, 1),
-                                "% Negative": round((df["sentiment_label"] == "Negative").mean() * 100, 1),
-                            })
-                        summary_df = pd.DataFrame(summary_data)
-                        st.table(summary_df)
-
-                        # 💬 Insights
-                        st.subheader("💬 Key Insights")
-                        avg1 = df1["sentiment_score"].mean()
-                        avg2 = df2["sentiment_score"].mean()
-
-                        if avg1 > avg2:
-                            st.markdown(f"✨ **{district1}** discussions appear slightly more positive overall compared to **{district2}**.")
-                        elif avg2 > avg1:
-                            st.markdown(f"✨ **{district2}** discussions appear slightly more positive overall compared to **{district1}**.")
-                        else:
-                            st.markdown("😐 Both districts show a similar overall sentiment tone.")
-
-                        st.markdown("_These insights reflect the tone of recent Reddit discussions related to school topics._")
+                # 💬 Insights
+                st.subheader("💬 Key Insights")
+                ranked = summary.sort_values("Avg Sentiment", ascending=False)
+                best, worst = ranked.iloc[0], ranked.iloc[-1]
 
-                except Exception as e:
-                    st.error(f"⚠️ Error fetching Reddit posts: {e}")
+                if best["Avg Sentiment"] > worst["Avg Sentiment"]:
+                    st.markdown(f"✨ **{best['District']}** discussions appear the most positive overall "
+                                f"({best['Avg Sentiment']}), **{worst['District']}** the least "
+                                f"({worst['Avg Sentiment']}).")
+                else:
+                    st.markdown("😐 All selected districts show a similar overall sentiment tone.")
+
+                st.markdown("_These insights reflect the tone of recent Reddit discussions related to school topics._")
+
+# -----------------------------
+# Diagnostics Page
+# -----------------------------
+elif page == "🩺 Diagnostics":
+    st.title("🩺 Diagnostics")
+
+    if instrumentation.FEATURES:
+        st.success(f"Instrumentation is on: {', '.join(sorted(instrumentation.FEATURES))}")
+    else:
+        st.info("Instrumentation is off. Start the app, a pipeline run or a notebook with "
+                "`ADS509_INSTRUMENT=1` (or `profile`, `memory`, e.g. "
+                "`ADS509_INSTRUMENT=profile,memory`) to record timings.")
+
+    runs = instrumentation.load_runs(limit=50)
+    if not runs:
+        st.write(f"No runs recorded yet in `{instrumentation.INSTRUMENT_DIR}`.")
+    else:
+        labels = [
+            f"{time.strftime('%H:%M:%S', time.localtime(r['started_at']))} · {r['name']} "
+            f"· {r['seconds']:.2f}s" for r in runs
+        ]
+        choice = st.selectbox("Run (newest first)", range(len(runs)), format_func=labels.__getitem__)
+        report = runs[choice]
+        counters = report["counters"]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total time", f"{report['seconds']:.2f} s")
+        col2.metric("Reddit API calls", counters.get("reddit.api_calls", 0))
+        col3.metric("Comments cleaned", counters.get("clean.comments", 0))
+        if report.get("error"):
+            st.error(report["error"])
+
+        st.subheader("⏱️ Timers")
+        if report["timers"]:
+            timers = pd.DataFrame.from_dict(report["timers"], orient="index")
+            timers["% of run"] = (100 * timers["seconds"] / max(report["seconds"], 1e-9)).round(1)
+            st.dataframe(timers.sort_values("seconds", ascending=False))
+        else:
+            st.write("No timers recorded.")
+
+        st.subheader("🔢 Counters")
+        if counters:
+            st.table(pd.DataFrame({"value": counters}))
+        else:
+            st.write("No counters recorded.")
+
+        if report.get("profile"):
+            st.subheader("🔬 Profile (top functions by cumulative time)")
+            st.dataframe(pd.DataFrame(report["profile"]))
+        if report.get("memory"):
+            st.subheader(f"🧠 Memory (peak {report['memory']['peak_mb']:.1f} MB traced)")
+            st.dataframe(pd.DataFrame(report["memory"]["top"]))
+
+        st.subheader("🕑 Recent Runs")
+        st.dataframe(pd.DataFrame([
+            {"started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["started_at"])),
+             "run": r["name"], "seconds": r["seconds"], "error": r.get("error")}
+            for r in runs
+        ]))
 
 # -----------------------------
 # About Page
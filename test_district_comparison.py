@@ -0,0 +1,83 @@
+"""Tests for district_comparison.py: parity with per-district runs and plain groupbys."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from district_comparison import (
+    SENTIMENT_LABELS,
+    combine,
+    label_counts,
+    sentiment_summary,
+    top_ngrams,
+    topic_shares,
+    tokenize,
+)
+from token_corpus import bigram_counts, word_counts
+
+WORDS = ["school", "teacher", "board", "homework", "bus", "budget", "parent", "test"]
+
+
+def district_frame(seed, n_posts):
+    rng = np.random.default_rng(seed)
+    comments = [
+        [" ".join(rng.choice(WORDS, size=rng.integers(1, 8))) for _ in range(rng.integers(0, 4))]
+        for _ in range(n_posts)
+    ]
+    scores = rng.uniform(-1, 1, n_posts).round(3)
+    labels = np.where(scores >= 0.05, "Positive", np.where(scores <= -0.05, "Negative", "Neutral"))
+    return pd.DataFrame({"cleaned_comments": comments, "sentiment_score": scores,
+                         "sentiment_label": labels,
+                         "dominant_topic": rng.integers(0, 3, n_posts)})
+
+
+@pytest.fixture
+def frames():
+    return {"Palo Alto": district_frame(0, 25), "Oklahoma City": district_frame(1, 40),
+            "Fresno": district_frame(2, 12)}
+
+
+@pytest.mark.parametrize("n, reference, column", [(1, word_counts, "word"),
+                                                  (2, bigram_counts, "bigram")])
+def test_top_ngrams_match_each_district_alone(frames, n, reference, column):
+    long = combine(frames)
+    result = top_ngrams(long, n=n, top_n=15)
+
+    for district, df in frames.items():
+        expected = reference(tokenize(df), top_n=15)
+        got = result[result["District"] == district]
+        assert got[column].tolist() == expected[column].tolist()
+        assert got["count"].tolist() == expected["count"].tolist()
+        assert got["rank"].tolist() == list(range(1, len(expected) + 1))
+
+
+def test_label_counts_and_summary_match_groupby(frames):
+    long = combine(frames)
+    grouped = long.groupby("district", observed=False)
+
+    expected = (grouped["sentiment_label"].value_counts().unstack(fill_value=0)
+                .reindex(columns=list(SENTIMENT_LABELS), fill_value=0))
+    counts = label_counts(long)
+    assert counts.to_numpy().tolist() == expected.to_numpy().tolist()
+    assert list(counts.index) == list(frames)
+
+    summary = sentiment_summary(long, counts=counts).set_index("District")
+    scores = grouped["sentiment_score"]
+    assert summary["# Posts"].tolist() == scores.size().tolist()
+    assert summary["Avg Sentiment"].tolist() == scores.mean().round(2).tolist()
+    assert summary["Std Sentiment"].tolist() == pytest.approx(
+        scores.std(ddof=0).round(2).tolist(), abs=0.011)
+    shares = expected.div(expected.sum(axis=1), axis=0) * 100
+    for label in SENTIMENT_LABELS:
+        assert summary[f"% {label}"].tolist() == shares[label].round(1).tolist()
+
+
+def test_topic_shares_rows_sum_to_one(frames):
+    long = combine(frames)
+
+    shares = topic_shares(long)
+    assert shares.shape == (3, 3)
+    assert shares.sum(axis=1).tolist() == pytest.approx([1.0] * 3)
+
+    doc_topic = np.random.default_rng(3).dirichlet(np.ones(4), size=len(long))
+    weighted = topic_shares(long, doc_topic=doc_topic)
+    assert weighted.sum(axis=1).tolist() == pytest.approx([1.0] * 3)
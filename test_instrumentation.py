@@ -0,0 +1,76 @@
+"""Tests for instrumentation.py: overlapping runs, per-thread stacks and memory tracing."""
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import instrumentation
+from instrumentation import bind_run, count, current_run, run, timer
+
+
+@pytest.fixture
+def memory_mode():
+    previous = ",".join(sorted(instrumentation.FEATURES))
+    instrumentation.configure("memory")
+    yield
+    instrumentation.configure(previous)
+
+
+def test_overlapping_memory_runs_share_tracemalloc(memory_mode):
+    assert not tracemalloc.is_tracing()
+    a = run("a").start()
+    b = run("b").start()
+
+    report_a = a.finish()
+    assert tracemalloc.is_tracing()  # b still needs it
+    report_b = b.finish()
+
+    assert not tracemalloc.is_tracing()
+    assert "peak_mb" in report_a["memory"] and "peak_mb" in report_b["memory"]
+
+
+def test_nested_memory_run_keeps_outer_peak(memory_mode):
+    with run("outer") as outer:
+        block = bytearray(8 * 2**20)
+        del block
+        with run("inner"):
+            pass
+    assert outer.report["memory"]["peak_mb"] >= 8
+
+
+def test_threads_report_into_their_own_runs(memory_mode):
+    barrier = threading.Barrier(2)
+    reports = {}
+
+    def session(name):
+        with run(name) as r:
+            barrier.wait()  # both runs are active at once
+            count(f"{name}.clicks")
+            barrier.wait()
+        reports[name] = r.report
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in ("one", "two")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert reports["one"]["counters"] == {"one.clicks": 1}
+    assert reports["two"]["counters"] == {"two.clicks": 1}
+
+
+def test_bind_run_carries_the_run_into_pool_threads(memory_mode):
+    def work():
+        with timer("work"):
+            return current_run()
+
+    with run("pool") as r:
+        outer = current_run()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            bound = [pool.submit(bind_run(work)) for _ in range(4)]
+            unbound = pool.submit(work)
+        assert all(f.result() is outer for f in bound)
+        assert unbound.result() is not outer
+
+    assert r.report["timers"]["work"]["calls"] == 4
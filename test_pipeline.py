@@ -0,0 +1,86 @@
+"""Tests for pipeline.py: shared near-duplicate index and output locations."""
+import random
+
+import pandas as pd
+import pytest
+
+import pipeline
+from dataset_store import load_dataset, save_dataset
+from near_duplicates import SIGNATURE_DIR, SignatureIndex
+from reddit_scraper import DATASET_COLUMNS
+
+WORDS = ("teachers school district homework students parents budget library "
+         "principal classes tests bus lunch sports music science").split()
+SHARED = "the district finally approved the new library budget after months of debate"
+
+
+def raw_dataset(district, seed):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(12):
+        comments = [" ".join(rng.choice(WORDS) for _ in range(25)) for _ in range(4)]
+        if i == 0:
+            comments.append(SHARED)  # cross-posted to both districts
+        rows.append({"source": "reddit", "query": f'"{district}" (schools)',
+                     "topic": f"{district} post {i}",
+                     "comments_nested": [[c] for c in comments], "comments_flat": comments,
+                     "submission_id": f"{seed}-{i}", "created_utc": 0.0,
+                     "comment_ids": [f"{seed}-{i}-{j}" for j in range(len(comments))]})
+    return pd.DataFrame(rows, columns=DATASET_COLUMNS)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    datasets = tmp_path / "datasets"
+    for seed, district in enumerate(["Palo Alto", "Oklahoma City"]):
+        save_dataset(raw_dataset(district, seed), pipeline._raw_stem(datasets, district))
+    return datasets
+
+
+def cleaned(folder, district):
+    stem = district.replace(" ", "_")
+    return load_dataset(folder / f"{stem}_cleaned_pipeline_reddit")
+
+
+def test_clean_dedupes_across_districts_with_persisted_index(folder):
+    districts = ["Palo Alto", "Oklahoma City"]
+    pipeline.run_pipeline(districts, stages=["clean"], n_jobs=1, folder=folder)
+
+    first, second = (cleaned(folder, d)["comments_flat"].map(list).tolist() for d in districts)
+    assert SHARED in first[0]
+    assert SHARED not in second[0]  # already kept for Palo Alto
+
+    index = SignatureIndex(folder / SIGNATURE_DIR.name)
+    assert set(index.entries["district"]) == set(districts)
+
+    # a forced re-run keeps what the index already holds
+    pipeline.run_pipeline(districts, stages=["clean"], force=["clean"], n_jobs=1, folder=folder)
+    assert cleaned(folder, "Oklahoma City")["comments_flat"].map(list).tolist() == second
+    assert cleaned(folder, "Palo Alto")["comments_flat"].map(list).tolist() == first
+
+
+def test_topic_model_follows_dataset_folder(folder):
+    pytest.importorskip("sklearn")
+    params = {"topics": {"n_components": 2, "passes": 1, "min_df": 1, "max_df": 1.0}}
+    rows = pipeline.run_pipeline(["Palo Alto"], stages=["topics"], params=params,
+                                 n_jobs=1, folder=folder)
+
+    model = folder.parent / "models" / "Palo_Alto_online_lda.joblib"
+    assert model.exists()
+    assert [(r["stage"], r["status"]) for r in rows] == [
+        ("scrape", "ran"), ("clean", "ran"), ("stats", "ran"), ("topics", "ran")]
+
+    rows = pipeline.run_pipeline(["Palo Alto"], stages=["topics"], params=params,
+                                 n_jobs=1, folder=folder)
+    assert {r["status"] for r in rows} == {"cached"}
+    assert [r["stage"] for r in rows] == ["scrape", "clean", "stats", "topics"]
+
+
+def test_sentiment_artefacts_follow_dataset_folder(folder):
+    from artefact_store import ARTEFACT_DIR, read_manifest
+
+    rows = pipeline.run_pipeline(["Palo Alto"], stages=["sentiment"], n_jobs=1, folder=folder)
+
+    assert rows[-1]["stage"] == "sentiment" and rows[-1]["status"] == "ran"
+    assert read_manifest("Palo Alto", folder.parent / "artefacts") is not None
+    assert read_manifest("Palo Alto", ARTEFACT_DIR) is None  # live store untouched
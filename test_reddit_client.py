@@ -0,0 +1,126 @@
+"""Tests for reddit_client.py: lazy creation, reset and one shared client."""
+import threading
+
+import pytest
+
+from reddit_client import RedditClientManager
+
+
+@pytest.fixture
+def praw_ini(tmp_path):
+    path = tmp_path / "praw.ini"
+    path.write_text(
+        "[default]\n"
+        "client_id = stub-id\n"
+        "client_secret = stub-secret\n"
+        "user_agent = ads509-tests\n"
+    )
+    return path
+
+
+class StubReddit:
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.thread = threading.get_ident()
+
+
+def test_client_is_created_lazily_and_reused(praw_ini):
+    calls = []
+    manager = RedditClientManager(
+        praw_ini, factory=lambda creds: calls.append(creds) or StubReddit(creds))
+    assert manager.created == 0 and not calls
+
+    client = manager.get()
+    assert manager.get() is client
+    assert manager.created == 1
+    assert calls == [{"client_id": "stub-id", "client_secret": "stub-secret",
+                      "user_agent": "ads509-tests"}]
+
+
+def test_reset_rereads_credentials_and_replaces_client(praw_ini):
+    manager = RedditClientManager(praw_ini, factory=StubReddit)
+    first = manager.get()
+
+    praw_ini.write_text(praw_ini.read_text().replace("stub-id", "new-id"))
+    assert manager.get() is first  # cached until reset
+    manager.reset()
+
+    second = manager.get()
+    assert second is not first
+    assert second.credentials["client_id"] == "new-id"
+    assert manager.created == 2
+
+
+def test_missing_credentials_file(tmp_path):
+    manager = RedditClientManager(tmp_path / "missing.ini", factory=StubReddit)
+    with pytest.raises(FileNotFoundError):
+        manager.get()
+
+
+def test_concurrent_get_shares_one_client(praw_ini):
+    manager = RedditClientManager(praw_ini, factory=StubReddit)
+    n_threads = 8
+    barrier = threading.Barrier(n_threads)
+    results = [None] * n_threads
+
+    def worker(i):
+        barrier.wait()  # all threads ask for a client at once
+        results[i] = manager.get()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in results}) == 1
+    assert manager.created == 1
+
+
+def test_session_serialises_use_of_the_shared_client(praw_ini):
+    manager = RedditClientManager(praw_ini, factory=StubReddit)
+    active, overlaps = [], []
+
+    def worker():
+        for _ in range(50):
+            with manager.session() as reddit:
+                active.append(reddit)
+                overlaps.append(len(active))
+                active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(overlaps) == 1
+    assert manager.created == 1
+
+
+def test_create_builds_unshared_clients(praw_ini):
+    manager = RedditClientManager(praw_ini, factory=StubReddit)
+    shared = manager.get()
+
+    extra = manager.create()
+    assert extra is not shared and extra is not manager.create()
+    assert manager.get() is shared
+    assert manager.created == 3
+
+
+def test_reset_bumps_generation(praw_ini):
+    manager = RedditClientManager(praw_ini, factory=StubReddit)
+    manager.get()
+    manager.reset()
+    assert manager.generation == 1
+
+
+def test_praw_client_points_at_stub_server(praw_ini):
+    pytest.importorskip("praw")
+    manager = RedditClientManager(praw_ini, oauth_url="http://127.0.0.1:9",
+                                  reddit_url="http://127.0.0.1:9")
+
+    reddit = manager.get()  # no request is made until the first API call
+    assert reddit.config.oauth_url == "http://127.0.0.1:9"
+    assert reddit.config.client_id == "stub-id"
+    assert manager.get() is reddit
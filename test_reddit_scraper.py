@@ -0,0 +1,148 @@
+"""Tests for reddit_scraper.py: FetchEngine with stub Reddit clients."""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from reddit_client import RedditClientManager
+from reddit_scraper import RATE_SAFETY, FetchEngine, TokenBucket, combine_limits
+
+BODY = "our district hired great teachers and the kids are happier " * 3
+
+
+class StubReddit:
+    """Minimal praw stand-in that fails if two live threads ever share it."""
+
+    def __init__(self, credentials, fail_query=None):
+        self.owner = threading.current_thread()
+        self.fail_query = fail_query
+        self.auth = SimpleNamespace(limits={})
+
+    def _check_thread(self):
+        current = threading.current_thread()
+        if not self.owner.is_alive():
+            self.owner = current  # handed on after its thread finished
+        assert current is self.owner, "client used from another thread"
+
+    def subreddit(self, name):
+        self._check_thread()
+        return self
+
+    def search(self, query, sort, time_filter, limit):
+        self._check_thread()
+        if self.fail_query and self.fail_query in query:
+            raise RuntimeError("search unavailable")
+        district = query.split('"')[1]
+        return iter([self.submission(id=f"{district}-{i}") for i in range(limit)])
+
+    def submission(self, id):
+        self._check_thread()
+        reddit = self
+
+        class Comments:
+            def replace_more(self, limit=0):
+                reddit._check_thread()
+
+            def list(self):
+                reddit._check_thread()
+                return [SimpleNamespace(id=f"{id}-c{j}", body=BODY, score=10)
+                        for j in range(3)]
+
+        return SimpleNamespace(id=id, title=f"Post {id}", created_utc=0.0,
+                               num_comments=3, comments=Comments())
+
+
+@pytest.fixture
+def praw_ini(tmp_path):
+    path = tmp_path / "praw.ini"
+    path.write_text("[default]\nclient_id = x\nclient_secret = y\nuser_agent = z\n")
+    return path
+
+
+def make_engine(praw_ini, fail_query=None, **kwargs):
+    manager = RedditClientManager(
+        praw_ini, factory=lambda creds: StubReddit(creds, fail_query))
+    limiter = TokenBucket(rate=1e6, capacity=10**6)
+    return FetchEngine(manager=manager, limiter=limiter, max_workers=4, **kwargs)
+
+
+def test_workers_use_their_own_clients(praw_ini):
+    engine = make_engine(praw_ini)
+    districts = ["Palo Alto", "Oklahoma City", "Fresno"]
+
+    frames = engine.fetch_districts(districts, options=["schools"], limit=5)
+
+    for district in districts:
+        df = frames[district]
+        assert list(df["submission_id"]) == [f"{district}-{i}" for i in range(5)]
+        assert all(len(comments) == 3 for comments in df["comments_flat"])
+    assert 1 < engine.manager.created <= engine.max_workers
+
+
+def test_failed_search_is_skipped(praw_ini, capsys):
+    engine = make_engine(praw_ini, fail_query="Fresno")
+
+    frames = engine.fetch_districts(["Palo Alto", "Fresno"], options=["schools"], limit=2)
+
+    assert len(frames["Palo Alto"]) == 2
+    assert frames["Fresno"].empty
+    assert engine.fetched["Fresno"] == {}
+    assert "Fresno: search failed" in capsys.readouterr().out
+
+
+def test_explicit_client_runs_serially(praw_ini):
+    reddit = StubReddit({})
+    engine = FetchEngine(reddit=reddit, max_workers=8,
+                         limiter=TokenBucket(rate=1e6, capacity=10**6))
+    assert engine.max_workers == 1
+    # the single worker thread is not the thread that built the client
+    reddit._check_thread = lambda: None
+
+    frames = engine.fetch_districts(["Palo Alto"], options=["schools"], limit=3)
+    assert len(frames["Palo Alto"]) == 3
+
+
+def test_worker_clients_are_reused_across_runs(praw_ini):
+    engine = make_engine(praw_ini)
+
+    for _ in range(3):
+        frames = engine.fetch_districts(["Palo Alto", "Fresno"], options=["schools"], limit=5)
+        assert len(frames["Fresno"]) == 5
+        assert not engine._in_use
+
+    # later runs take their clients from the idle list instead of building more
+    assert engine.manager.created <= engine.max_workers
+
+
+def test_combine_limits_takes_the_most_conservative_report():
+    now = 1000.0
+    reports = [
+        {"remaining": 900, "reset_timestamp": now + 300},
+        {"remaining": 100, "reset_timestamp": now + 100},
+        {"remaining": 5, "reset_timestamp": now - 1},  # window already reset
+        {"remaining": None},
+    ]
+    assert combine_limits(reports, now=now) == {"remaining": 100,
+                                                "reset_timestamp": now + 300}
+    assert combine_limits([{"remaining": None}], now=now)["remaining"] is None
+
+
+def test_limits_from_every_worker_client_tune_the_bucket(praw_ini):
+    engine = make_engine(praw_ini)
+    now = time.time()
+    reports = iter([{"remaining": 100, "reset_timestamp": now + 300},
+                    {"remaining": 900, "reset_timestamp": now + 100}])
+
+    def worker():
+        engine.reddit.auth.limits = next(reports)
+        engine.call(lambda: None)
+
+    for _ in range(2):  # one after the other, each with its own client
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+
+    assert engine.manager.created == 2
+    # 100 left until the later reset, not the last worker's 900 in 100 s
+    assert engine.limiter.rate == pytest.approx(100 * RATE_SAFETY / 300, rel=0.05)
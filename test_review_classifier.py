@@ -0,0 +1,124 @@
+"""Tests for review_classifier.py: the toy-fitted classifier and MicroBatcher."""
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+import review_classifier  # noqa: E402
+from review_classifier import MicroBatcher, SentimentClassifier  # noqa: E402
+
+POSITIVE = ["great teachers and a wonderful principal", "kids love this amazing school",
+            "excellent programs and caring staff", "wonderful district with great support"]
+NEGATIVE = ["terrible bullying and unsafe hallways", "awful overcrowded classrooms",
+            "horrible communication from the district", "unsafe campus and terrible food"]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    texts = (POSITIVE + NEGATIVE) * 3
+    labels = (["Positive"] * 4 + ["Negative"] * 4) * 3
+    return SentimentClassifier.fit(texts, labels, test_size=0)
+
+
+class RecordingClassifier:
+    """Wraps a classifier and records the size of every predict_many call."""
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self.batch_sizes = []
+
+    def predict_many(self, texts):
+        self.batch_sizes.append(len(texts))
+        return self.classifier.predict_many(texts)
+
+
+class FailingClassifier:
+    def __init__(self):
+        self.calls = 0
+
+    def predict_many(self, texts):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("model exploded")
+        return pd.DataFrame({"label": ["Positive"] * len(texts),
+                             "confidence": [1.0] * len(texts)})
+
+
+def test_toy_classifier_predicts_training_labels(classifier):
+    result = classifier.predict_many(["great caring teachers", "terrible unsafe campus"])
+    assert result["label"].tolist() == ["Positive", "Negative"]
+    assert result["confidence"].between(0.5, 1).all()
+    assert classifier.predict_many([]).empty
+    # small vectorisation batches give the same probabilities
+    texts = POSITIVE + NEGATIVE
+    assert (classifier.predict_proba(texts, batch_size=3)
+            == pytest.approx(classifier.predict_proba(texts)))
+
+
+def test_save_load_round_trip(classifier, tmp_path):
+    path = classifier.save(tmp_path / "model.joblib")
+    loaded = SentimentClassifier.load(path)
+    assert loaded.metadata["version"] == review_classifier.CLASSIFIER_VERSION
+    assert loaded.predict("great caring teachers") == classifier.predict("great caring teachers")
+
+
+def test_load_rejects_other_versions(classifier, tmp_path, monkeypatch):
+    path = classifier.save(tmp_path / "model.joblib")
+    monkeypatch.setattr(review_classifier, "CLASSIFIER_VERSION",
+                        review_classifier.CLASSIFIER_VERSION + 1)
+    with pytest.raises(ValueError, match="retrain"):
+        SentimentClassifier.load(path)
+
+
+def test_load_missing_model(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SentimentClassifier.load(tmp_path / "missing.joblib")
+
+
+def test_batcher_groups_requests(classifier):
+    recorder = RecordingClassifier(classifier)
+    batcher = MicroBatcher(recorder, max_batch=4, max_wait=0.5)
+    texts = (POSITIVE + NEGATIVE)[:7] + ["great teachers", "unsafe campus", "awful food"]
+    try:
+        results = batcher.predict_many(texts, timeout=10)
+    finally:
+        batcher.close()
+
+    assert [label for label, _ in results] == classifier.predict_many(texts)["label"].tolist()
+    assert recorder.batch_sizes == [4, 4, 2]
+    assert batcher.stats() == {"batches": 3, "requests": 10, "mean_batch": 10 / 3}
+
+
+def test_batcher_serves_concurrent_callers(classifier):
+    batcher = MicroBatcher(classifier, max_wait=0.05)
+    texts = POSITIVE + NEGATIVE
+    results = [None] * len(texts)
+
+    def caller(i):
+        results[i] = batcher.predict(texts[i], timeout=10)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert [label for label, _ in results] == classifier.predict_many(texts)["label"].tolist()
+    assert batcher.stats()["requests"] == len(texts)
+    assert batcher.stats()["batches"] < len(texts)
+
+
+def test_batch_error_reaches_every_waiting_caller():
+    batcher = MicroBatcher(FailingClassifier(), max_batch=8, max_wait=0.5)
+    futures = [batcher.submit(text) for text in ["a", "b", "c"]]
+    try:
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model exploded"):
+                future.result(timeout=10)
+        # the background thread survives and serves the next batch
+        assert batcher.predict("d", timeout=10) == ("Positive", 1.0)
+    finally:
+        batcher.close()
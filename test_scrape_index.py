@@ -0,0 +1,77 @@
+"""Tests for scrape_index.py: delta ordering and the incremental pipeline scrape."""
+import os
+
+import pandas as pd
+
+import pipeline
+import reddit_scraper
+from dataset_store import load_dataset
+from reddit_scraper import DATASET_COLUMNS
+from scrape_index import delta_paths, load_incremental
+
+
+def frame(rows):
+    """Dataset frame from (submission_id, [comment_id, ...]) pairs."""
+    return pd.DataFrame([
+        {"source": "reddit", "query": "q", "topic": f"Post {sid}",
+         "comments_nested": [[f"text {cid}"] for cid in cids],
+         "comments_flat": [f"text {cid}" for cid in cids],
+         "submission_id": sid, "created_utc": 0.0, "comment_ids": list(cids)}
+        for sid, cids in rows
+    ], columns=DATASET_COLUMNS)
+
+
+def test_deltas_are_ordered_by_file_name_timestamp(tmp_path):
+    names = [
+        "Palo_Alto_delta_20250102_090000_reddit.pkl",
+        "Palo_Alto_delta_20250101_120000_reddit.pkl",
+        "Palo_Alto_delta_20250101_120000_1_reddit.pkl",
+        "Palo_Alto_delta_20241231_235959_reddit.pkl",
+    ]
+    for age, name in enumerate(names):
+        frame([("s1", [name])]).to_pickle(tmp_path / name)
+        # modification times in the opposite order of the timestamps
+        os.utime(tmp_path / name, (1e9 - age, 1e9 - age))
+    (tmp_path / "Palo_Alto_delta_notes_reddit.pkl").write_text("not a delta")
+
+    assert [p.name for p in delta_paths(tmp_path, "Palo Alto")] == [
+        "Palo_Alto_delta_20241231_235959_reddit.pkl",
+        "Palo_Alto_delta_20250101_120000_reddit.pkl",
+        "Palo_Alto_delta_20250101_120000_1_reddit.pkl",
+        "Palo_Alto_delta_20250102_090000_reddit.pkl",
+    ]
+    merged = load_incremental(tmp_path, "Palo Alto")
+    assert merged.loc[0, "comment_ids"] == [p.name for p in delta_paths(tmp_path, "Palo Alto")]
+
+
+class FakeEngine:
+    """Returns the next canned batch of new rows on each fetch."""
+
+    batches = []
+
+    def __init__(self):
+        self.fetched = {}
+
+    def fetch_districts(self, districts, options, index=None, **kwargs):
+        rows = FakeEngine.batches.pop(0)
+        self.fetched = {d: {sid: len(cids) for sid, cids in rows} for d in districts}
+        return {d: frame(rows) for d in districts}
+
+
+def test_incremental_scrape_updates_pipeline_dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(reddit_scraper, "FetchEngine", FakeEngine)
+    FakeEngine.batches = [
+        [("s1", ["c1", "c2"])],
+        [("s1", ["c3"]), ("s2", ["c4"])],  # a new comment and a new post
+    ]
+    params = dict(pipeline.DEFAULT_PARAMS["scrape"])
+
+    pipeline.scrape_districts(["Palo Alto"], params, tmp_path, incremental=True)
+    first = load_dataset(tmp_path / "Palo_Alto_pipeline_reddit")
+    assert first["comment_ids"].map(list).tolist() == [["c1", "c2"]]
+
+    pipeline.scrape_districts(["Palo Alto"], params, tmp_path, incremental=True)
+    second = load_dataset(tmp_path / "Palo_Alto_pipeline_reddit")
+    assert second["submission_id"].tolist() == ["s1", "s2"]
+    assert second["comment_ids"].map(list).tolist() == [["c1", "c2", "c3"], ["c4"]]
+    assert second["num_comments"].tolist() == [3, 1]
@@ -0,0 +1,80 @@
+"""Tests for search_index.py: the query parser and queries over a small index."""
+import pandas as pd
+import pytest
+
+from dataset_store import save_dataset
+from search_index import build_index, parse_query
+from text_processing import clean_corpus
+
+
+@pytest.mark.parametrize("query, tree", [
+    ("", ("all",)),
+    ("schools", ("term", "schools")),
+    ('"Palo Alto"', ("phrase", "Palo Alto")),
+    ("schools teachers", ("and", ("term", "schools"), ("term", "teachers"))),
+    ("schools AND teachers", ("and", ("term", "schools"), ("term", "teachers"))),
+    ("schools OR teachers", ("or", ("term", "schools"), ("term", "teachers"))),
+    ("NOT homework", ("not", ("term", "homework"))),
+    ("-homework", ("not", ("term", "homework"))),
+    # AND binds tighter than OR, both associate to the left
+    ("a OR b c", ("or", ("term", "a"), ("and", ("term", "b"), ("term", "c")))),
+    ("a b OR c", ("or", ("and", ("term", "a"), ("term", "b")), ("term", "c"))),
+    ("a OR b OR c", ("or", ("or", ("term", "a"), ("term", "b")), ("term", "c"))),
+    ('"Palo Alto" (schools OR teachers) -homework',
+     ("and",
+      ("and", ("phrase", "Palo Alto"), ("or", ("term", "schools"), ("term", "teachers"))),
+      ("not", ("term", "homework")))),
+    ("NOT (a OR b)", ("not", ("or", ("term", "a"), ("term", "b")))),
+])
+def test_parse_query(query, tree):
+    assert parse_query(query) == tree
+
+
+@pytest.mark.parametrize("query", [
+    "(schools OR teachers", "schools)", "schools OR", "OR schools", "schools AND",
+    "NOT", "()",
+])
+def test_parse_query_rejects_malformed_queries(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("search")
+    posts = {
+        "topic": ["Palo Alto schools", "Homework load in Fresno"],
+        "comments_flat": [
+            ["The teachers in Palo Alto are great", "Too much homework for kids"],
+            ["Homework every night", "Great teachers, awful parking"],
+        ],
+    }
+    df = pd.DataFrame(posts)
+    df["cleaned_comments"] = [clean_corpus(c) for c in df["comments_flat"]]
+    path = save_dataset(df, folder / "Test_cleaned_pipeline_reddit")
+    return build_index({"Test": path}, folder=folder / "index")
+
+
+def matches(index, query):
+    """(post_id, comment_idx) pairs matching `query`; -1 is the post title."""
+    return list(index.search(query)[["post_id", "comment_idx"]].itertuples(index=False, name=None))
+
+
+def test_index_answers_queries(index):
+    assert index.n_docs == 6
+    assert matches(index, "teachers") == [(0, 0), (1, 1)]
+    assert matches(index, '"palo alto"') == [(0, -1), (0, 0)]
+    assert matches(index, '"alto palo"') == []
+    assert matches(index, "homework -kids") == [(1, -1), (1, 0)]
+    assert matches(index, "teachers OR parking") == [(0, 0), (1, 1)]
+    assert matches(index, "great AND (palo OR parking)") == [(0, 0), (1, 1)]
+    assert len(index.search("")) == index.n_docs
+    assert len(index.search("homework", limit=1)) == 1
+
+
+def test_words_that_clean_to_nothing_are_dropped(index):
+    assert matches(index, "teachers OR the") == matches(index, "teachers")
+    assert matches(index, "teachers the") == matches(index, "teachers")
+    assert matches(index, "homework -the") == matches(index, "homework")
+    assert len(index.search("NOT the")) == index.n_docs
+    assert len(index.search("the OR a")) == index.n_docs
@@ -0,0 +1,142 @@
+"""Tests for stream_ingest.py: checkpointed parts and resuming after a crash."""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import stream_ingest
+from dataset_store import load_dataset
+from reddit_scraper import FetchEngine, TokenBucket
+
+WORDS = ("the school teachers are great and the district budget is terrible "
+         "but kids love the new library").split()
+
+
+class Crash(BaseException):
+    """Stands in for a kill: not caught by the per-submission error handling."""
+
+
+class FakeSubmission:
+    def __init__(self, i, reddit):
+        self.id, self.title, self.created_utc = f"s{i}", f"Post {i}", 1.7e9 + i
+        self._i, self._reddit = i, reddit
+
+    @property
+    def comments(self):
+        self._reddit.comment_fetches.add(self.id)
+        if self._i == self._reddit.crash_at:
+            raise Crash(self.id)
+        rng = random.Random(self._i)
+        comments = [
+            SimpleNamespace(id=f"{self.id}_c{j}", score=rng.randint(0, 20),
+                            body=" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40))))
+            for j in range(rng.randint(0, 12))
+        ]
+        return SimpleNamespace(replace_more=lambda limit=0: None, list=lambda: comments)
+
+
+class FakeReddit:
+    auth = SimpleNamespace(limits={})
+
+    def __init__(self, n, crash_at=None):
+        self.n, self.crash_at = n, crash_at
+        self.comment_fetches = set()  # submissions whose comments were loaded
+
+    def subreddit(self, name):
+        return self
+
+    def search(self, query, sort, time_filter, limit):
+        return (FakeSubmission(i, self) for i in range(min(limit, self.n)))
+
+
+N_POSTS = 60
+PARAMS = dict(options=["schools"], limit=N_POSTS, batch_size=40, min_score=5,
+              min_words=10, cache=False)
+
+
+def run(folder, reddit, **overrides):
+    engine = FetchEngine(reddit=reddit, limiter=TokenBucket(rate=1e6, capacity=10**6))
+    return stream_ingest.ingest("Test Town", folder=folder, engine=engine,
+                                **{**PARAMS, **overrides})
+
+
+@pytest.fixture(scope="module")
+def reference(tmp_path_factory):
+    """An uninterrupted run to compare against."""
+    folder = tmp_path_factory.mktemp("reference")
+    checkpoint = run(folder, FakeReddit(N_POSTS))
+    return checkpoint, stream_ingest.load_stream(stream_ingest.stream_dir("Test Town", folder))
+
+
+def test_uninterrupted_run(reference):
+    checkpoint, df = reference
+    assert checkpoint["finished"]
+    assert len(checkpoint["parts"]) > 1
+    assert df["submission_id"].is_unique
+    assert len(df) == checkpoint["n_posts"]
+    assert df["num_comments"].sum() == checkpoint["n_comments"]
+    assert df["comment_labels"].map(len).tolist() == df["num_comments"].tolist()
+
+
+def test_resume_after_crash_matches_uninterrupted_run(tmp_path, reference):
+    crashed = FakeReddit(N_POSTS, crash_at=N_POSTS // 2)
+    with pytest.raises(Crash):
+        run(tmp_path, crashed)
+    folder = stream_ingest.stream_dir("Test Town", tmp_path)
+    partial = stream_ingest.read_checkpoint(folder)
+    assert not partial["finished"]
+    assert partial["parts"]  # progress before the crash was kept
+
+    resumed = FakeReddit(N_POSTS)
+    checkpoint = run(tmp_path, resumed)
+
+    assert checkpoint["finished"]
+    # finished submissions are skipped without fetching their comments
+    assert not resumed.comment_fetches & set(partial["submissions"])
+    df = stream_ingest.load_stream(folder)
+    _, expected = reference
+    got = df.set_index("submission_id").sort_index()
+    want = expected.set_index("submission_id").sort_index()
+    assert got.index.tolist() == want.index.tolist()
+    assert got["topic"].tolist() == want["topic"].tolist()
+    for col in ("comments_flat", "cleaned_comments", "comment_scores"):
+        assert got[col].map(list).tolist() == want[col].map(list).tolist(), col
+
+
+def test_finished_scrape_is_not_fetched_again(tmp_path):
+    run(tmp_path, FakeReddit(N_POSTS))
+    again = FakeReddit(N_POSTS)
+    checkpoint = run(tmp_path, again)
+    assert checkpoint["finished"]
+    assert not again.comment_fetches
+
+
+def test_unrecorded_part_is_discarded(tmp_path):
+    with pytest.raises(Crash):
+        run(tmp_path, FakeReddit(N_POSTS, crash_at=N_POSTS // 2))
+    folder = stream_ingest.stream_dir("Test Town", tmp_path)
+    checkpoint = stream_ingest.read_checkpoint(folder)
+    # a part written after the last checkpoint, e.g. by a kill mid-flush
+    stale = folder / f"part-{len(checkpoint['parts']):05d}.parquet"
+    stale.write_bytes((folder / checkpoint["parts"][0]).read_bytes())
+
+    writer = stream_ingest.StreamWriter(folder, params=checkpoint["params"])
+    assert not stale.exists()
+    assert writer.done == set(checkpoint["submissions"])
+
+
+def test_changed_parameters_start_over(tmp_path):
+    run(tmp_path, FakeReddit(N_POSTS))
+    again = FakeReddit(N_POSTS)
+    checkpoint = run(tmp_path, again, min_score=0)
+    assert checkpoint["finished"]
+    assert len(again.comment_fetches) == N_POSTS
+
+
+def test_finalize_writes_a_loadable_dataset(tmp_path, reference):
+    run(tmp_path, FakeReddit(N_POSTS))
+    path = stream_ingest.finalize("Test Town", tmp_path)
+    df = load_dataset(path)
+    _, expected = reference
+    assert df["submission_id"].tolist() == expected["submission_id"].tolist()
+    assert df["num_comments"].tolist() == expected["num_comments"].tolist()
@@ -0,0 +1,66 @@
+"""Tests for notebooks/text_processing.py n-gram counting."""
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from text_processing import NgramCounter, count_ngrams
+
+CORPUS = Path(__file__).resolve().parent / "datasets" / "Oklahoma_City_cleaned_pipeline_reddit.pkl"
+
+
+@pytest.fixture(scope="module")
+def comments():
+    if not CORPUS.exists():
+        pytest.skip(f"{CORPUS.name} not available")
+    df = pd.read_pickle(CORPUS)
+    return [comment for post in df["cleaned_comments"] for comment in post]
+
+
+def assert_bounds(approx, exact, top_n):
+    """Every reported count is an upper bound within its error of the true count."""
+    for gram, upper in approx.most_common(top_n):
+        assert upper - approx.error(gram) <= exact.counts[gram] <= upper, gram
+        assert approx.error(gram) <= approx.error_bound
+
+
+@pytest.mark.parametrize("n", [1, 2])
+@pytest.mark.parametrize("max_terms", [50, 500])
+def test_bounded_counts_bracket_exact_counts(comments, n, max_terms):
+    exact = count_ngrams(comments, n=n)
+    approx = count_ngrams(comments, n=n, max_terms=max_terms)
+
+    assert approx.total == exact.total
+    assert len(approx.counts) <= max_terms
+    assert_bounds(approx, exact, top_n=max_terms)
+    # every n-gram more frequent than the error bound is kept
+    heavy = [gram for gram, c in exact.counts.items() if c > approx.error_bound]
+    assert all(gram in approx.counts for gram in heavy)
+
+
+def test_bounded_top_words_match_exact(comments):
+    exact = count_ngrams(comments).most_common(10)
+    approx = count_ngrams(comments, max_terms=2000).most_common(10)
+    assert [gram for gram, _ in approx] == [gram for gram, _ in exact]
+
+
+def test_merge_of_bounded_shards(comments):
+    half = len(comments) // 2
+    exact = count_ngrams(comments)
+    merged = (count_ngrams(comments[:half], max_terms=500)
+              .merge(count_ngrams(comments[half:], max_terms=500)))
+    assert merged.total == exact.total
+    assert_bounds(merged, exact, top_n=100)
+
+
+def test_exact_counter_without_max_terms():
+    counter = NgramCounter(n=2).update(["great school district", "school district funding"])
+    assert counter.most_common(1) == [("school district", 2)]
+    assert counter.error("school district") == 0
+    assert list(counter.to_frame(1).columns) == ["bigram", "count"]
+
+
+def test_small_input_stays_exact():
+    counter = count_ngrams(["a b c", "a b", "a"], max_terms=5)
+    assert counter.most_common() == [("a", 3), ("b", 2), ("c", 1)]
+    assert counter.error_bound == 0
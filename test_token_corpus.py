@@ -0,0 +1,47 @@
+"""Tests for notebooks/token_corpus.py: document_term_matrix against CountVectorizer."""
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from text_processing import TokenizedPosts
+from token_corpus import document_term_matrix
+
+POSTS = [
+    ["great teachers in the district", "homework every night"],
+    ["teachers and parents", "school board meeting"],
+    ["homework for the kids", "great school"],
+    [],
+]
+
+
+@pytest.fixture
+def tokens():
+    return TokenizedPosts.from_posts(POSTS)
+
+
+def texts():
+    return [" ".join(comments) for comments in POSTS]
+
+
+def test_matches_count_vectorizer(tokens):
+    dtm, features = document_term_matrix(tokens, min_df=2, stop_words="english")
+    vectorizer = CountVectorizer(min_df=2, stop_words="english")
+    expected = vectorizer.fit_transform(texts())
+
+    assert features.tolist() == vectorizer.get_feature_names_out().tolist()
+    assert (dtm != expected).nnz == 0
+
+
+@pytest.mark.parametrize("params", [
+    {"min_df": 3, "max_df": 2},          # max_df as a count below min_df
+    {"min_df": 0.5, "max_df": 0.25},     # same, as proportions
+    {"min_df": 4},                       # no term is in enough documents
+    {"stop_words": ["great", "teachers", "in", "the", "district", "homework", "every",
+                    "night", "and", "parents", "school", "board", "meeting", "for",
+                    "kids"]},            # only stop words
+])
+def test_raises_like_count_vectorizer(tokens, params):
+    with pytest.raises(ValueError) as expected:
+        CountVectorizer(**params).fit_transform(texts())
+    with pytest.raises(ValueError) as got:
+        document_term_matrix(tokens, **params)
+    assert str(got.value) == str(expected.value)